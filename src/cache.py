@@ -0,0 +1,153 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Generic,
+    Hashable,
+    Optional,
+    Set,
+    TYPE_CHECKING,
+    Tuple,
+    TypeVar,
+    cast,
+)
+
+from .logger import get_logger
+from .metrics import cache_hits_counter, cache_misses_counter, cache_stale_counter
+
+if TYPE_CHECKING:
+    from .warm_state import WarmStateStore
+
+logger = get_logger()
+
+T = TypeVar("T")
+
+HIT, STALE, MISS = "hit", "stale", "miss"
+
+
+class TTLCache(Generic[T]):
+    """
+    Bounded LRU cache with per-entry TTL and stale-while-revalidate.
+
+    An entry is fresh for `ttl` seconds and may then be served stale for a further
+    `stale_ttl` seconds while a single background refresh replaces it. With a
+    `store`, entries are also written back to disk and the unexpired ones are
+    loaded again on construction.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = 256,
+        store: Optional["WarmStateStore"] = None,
+    ) -> None:
+        self.name = name
+        self.max_entries = max_entries
+        self.store = store
+        # key -> (value, fresh_until, stale_until)
+        self._entries: "OrderedDict[Hashable, Tuple[T, float, float]]" = OrderedDict()
+        self._refreshing: Set[Hashable] = set()
+        self._tasks: Set["asyncio.Task[None]"] = set()
+        if store is not None:
+            self._load(store)
+
+    def _load(self, store: "WarmStateStore") -> None:
+        offset = time.monotonic() - time.time()
+        rows = store.load(self.name)[-self.max_entries :]
+        for key, value, fresh_until, stale_until in rows:
+            self._entries[key] = (value, fresh_until + offset, stale_until + offset)
+        if rows:
+            logger.info(f"Restored {len(rows)} {self.name} cache entries")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[T]:
+        """Return the fresh value for `key`, or None."""
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() >= entry[1]:
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def set(self, key: Hashable, value: T, ttl: float, stale_ttl: float = 0) -> None:
+        now = time.monotonic()
+        self._entries[key] = (value, now + ttl, now + ttl + stale_ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        if self.store is not None:
+            wall = time.time()
+            self.store.put(self.name, key, value, wall + ttl, wall + ttl + stale_ttl)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def lookup(self, key: Hashable, endpoint: Optional[str] = None) -> Tuple[str, Any]:
+        """
+        Return ("hit" | "stale" | "miss", value) for `key` and count the outcome.
+        Stale values are still usable but should be revalidated by the caller.
+        """
+        label = endpoint or self.name
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is not None and now < entry[2]:
+            self._entries.move_to_end(key)
+            if now < entry[1]:
+                cache_hits_counter.labels(endpoint=label).inc()
+                return HIT, entry[0]
+            cache_stale_counter.labels(endpoint=label).inc()
+            return STALE, entry[0]
+        cache_misses_counter.labels(endpoint=label).inc()
+        return MISS, None
+
+    async def get_or_fetch(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[T]],
+        ttl: float,
+        stale_ttl: float = 0,
+        endpoint: Optional[str] = None,
+    ) -> T:
+        """
+        Return the cached value for `key`, calling `fetch` on a miss.
+        Errors raised by `fetch` on a miss propagate and are never cached.
+        """
+        state, value = self.lookup(key, endpoint)
+        if state == HIT:
+            return cast(T, value)
+        if state == STALE:
+
+            async def refresh() -> None:
+                self.set(key, await fetch(), ttl, stale_ttl)
+
+            self.refresh_in_background(key, refresh)
+            return cast(T, value)
+        fetched = await fetch()
+        self.set(key, fetched, ttl, stale_ttl)
+        return fetched
+
+    def refresh_in_background(
+        self, key: Hashable, refresh: Callable[[], Awaitable[None]]
+    ) -> None:
+        """Run `refresh` as a task unless a refresh for `key` is already running."""
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        task = asyncio.get_running_loop().create_task(self._refresh(key, refresh))
+        # Keep a reference so the task is not garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refresh(
+        self, key: Hashable, refresh: Callable[[], Awaitable[None]]
+    ) -> None:
+        try:
+            await refresh()
+        except Exception as e:
+            logger.warning(f"Background refresh of {self.name} cache {key} failed: {e}")
+        finally:
+            self._refreshing.discard(key)
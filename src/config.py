@@ -1,26 +1,40 @@
 import os
-from typing import Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
 from dotenv import load_dotenv
+from .metrics import secret_fetch_latency
 
 # Load environment variables for non-sensitive config
 load_dotenv()
 
-# Import secret manager only if in production and available, and not in testing
+# Secret Manager is only used in production, never in testing
 IS_TESTING = os.getenv("PYTEST_CURRENT_TEST") is not None or "pytest" in os.environ.get(
     "_", ""
 )
 
-try:
-    if not IS_TESTING and os.getenv("GOOGLE_CLOUD_PROJECT"):
-        from google.cloud import secretmanager
+_secret_client: Optional[Any] = None
+_secret_client_lock = threading.Lock()
 
-        secret_client: Optional[secretmanager.SecretManagerServiceClient] = (
-            secretmanager.SecretManagerServiceClient()
-        )
-    else:
-        secret_client = None
-except ImportError:
-    secret_client = None
+
+def get_secret_client() -> Optional[Any]:
+    """
+    Secret Manager client, imported and built on first use so that importing
+    config stays cheap. None in development, in tests, or if the library is missing.
+    """
+    global _secret_client
+    if IS_TESTING or not os.getenv("GOOGLE_CLOUD_PROJECT"):
+        return None
+    with _secret_client_lock:
+        if _secret_client is None:
+            try:
+                from google.cloud import secretmanager
+
+                _secret_client = secretmanager.SecretManagerServiceClient()
+            except ImportError:
+                return None
+        return _secret_client
 
 
 def get_secret(
@@ -32,11 +46,13 @@ def get_secret(
     Returns None if secret is not available (for graceful startup).
     """
     try:
-        if secret_client and os.getenv("GOOGLE_CLOUD_PROJECT"):
+        secret_client = get_secret_client()
+        if secret_client:
             # Production: Fetch from Secret Manager
             name = f"projects/{project_id}/secrets/{secret_name}/versions/latest"
             response = secret_client.access_secret_version(request={"name": name})
-            return response.payload.data.decode("UTF-8")
+            secret: str = response.payload.data.decode("UTF-8")
+            return secret
         else:
             # Development: Use environment variables
             return os.getenv(secret_name)
@@ -46,16 +62,213 @@ def get_secret(
         return None
 
 
+SECRET_NAMES = (
+    "twitter-client-id",
+    "twitter-client-secret",
+    "twitter-bearer-token",
+    "twitter-access-token",
+    "twitter-access-token-secret",
+    "coingecko-api-key",
+)
+
+
+class SecretStore:
+    """
+    In-memory copy of the Secret Manager secrets.
+    All secrets are fetched concurrently by prefetch(); reads are dict lookups and
+    an expired entry keeps being served while a background thread refreshes it.
+    In development (no Secret Manager) reads go straight to the environment.
+    """
+
+    def __init__(
+        self, secret_names: Iterable[str] = SECRET_NAMES, ttl: float = 3600
+    ) -> None:
+        self.secret_names = tuple(secret_names)
+        self.ttl = ttl
+        self._values: Dict[str, Tuple[Optional[str], float]] = {}
+        self._refreshing: Set[str] = set()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def enabled(self) -> bool:
+        return get_secret_client() is not None
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=len(self.secret_names) or 1,
+                    thread_name_prefix="secret-fetch",
+                )
+            return self._executor
+
+    def _fetch(self, name: str) -> Optional[str]:
+        start = time.perf_counter()
+        value = get_secret(name)
+        secret_fetch_latency.labels(secret=name).observe(time.perf_counter() - start)
+        with self._lock:
+            previous = self._values.get(name, (None, 0.0))[0]
+            # Keep serving the last good value if a refresh fails
+            if value is None and previous is not None:
+                value = previous
+            self._values[name] = (value, time.monotonic() + self.ttl)
+            self._refreshing.discard(name)
+        return value
+
+    def prefetch(self) -> float:
+        """Fetch every known secret concurrently; returns the elapsed seconds."""
+        start = time.perf_counter()
+        if self.enabled:
+            list(self._pool().map(self._fetch, self.secret_names))
+        return time.perf_counter() - start
+
+    def get(self, name: str) -> Optional[str]:
+        if not self.enabled:
+            return os.getenv(name)
+        entry = self._values.get(name)
+        if entry is None:
+            return self._fetch(name)
+        value, expires_at = entry
+        if time.monotonic() >= expires_at:
+            with self._lock:
+                stale = name not in self._refreshing
+                self._refreshing.add(name)
+            if stale:
+                self._pool().submit(self._fetch, name)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+            self._refreshing.clear()
+
+    def close(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+secret_store = SecretStore(ttl=float(os.getenv("SECRET_CACHE_TTL", 3600)))
+
+
 class Config:
     # Non-sensitive configuration from environment (loaded at startup)
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    # Fraction of INFO records kept per action, e.g. "engage_tweets=0.1"
+    LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
+    # Cloud Logging upload batch size and maximum delay (seconds)
+    LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", 50))
+    LOG_FLUSH_SECONDS = float(os.getenv("LOG_FLUSH_SECONDS", 5))
     RATE_LIMIT_PER_MINUTE = int(os.getenv("RATE_LIMIT_PER_MINUTE", 10))
+    # Per-endpoint overrides, e.g. "like=50/900,search=180/900"
+    RATE_LIMITS = os.getenv("RATE_LIMITS", "")
+    # How long a job waits for a rate limit token before giving up
+    RATE_LIMIT_WAIT_SECONDS = float(os.getenv("RATE_LIMIT_WAIT_SECONDS", 30))
     SPAM_THRESHOLD = int(os.getenv("SPAM_THRESHOLD", 5))
+    # Hashed-feature spam model; the keyword rule is used when the file is missing.
+    # Write it from labelled tweets with `python -m src.train_spam_model`
+    SPAM_MODEL_PATH = os.getenv("SPAM_MODEL_PATH", "models/spam_model.npz")
+    SPAM_MODEL_THRESHOLD = float(os.getenv("SPAM_MODEL_THRESHOLD", 0.5))
+    # Author reputation: verdict lifetime (seconds), size bound, clean verdicts
+    # before an author is trusted, and an optional SQLite file to persist it
+    REPUTATION_TTL = float(os.getenv("REPUTATION_TTL", 7 * 86400))
+    REPUTATION_MAX_ENTRIES = int(os.getenv("REPUTATION_MAX_ENTRIES", 10000))
+    REPUTATION_GOOD_AFTER = int(os.getenv("REPUTATION_GOOD_AFTER", 3))
+    REPUTATION_DB = os.getenv("REPUTATION_DB", "")
+
+    # Scheduler: worker threads for blocking jobs, random start delay, and how
+    # late a missed run may still start (seconds)
+    SCHEDULER_MAX_WORKERS = int(os.getenv("SCHEDULER_MAX_WORKERS", 4))
+    JOB_JITTER_SECONDS = int(os.getenv("JOB_JITTER_SECONDS", 30))
+    JOB_MISFIRE_GRACE_SECONDS = int(os.getenv("JOB_MISFIRE_GRACE_SECONDS", 300))
+
+    # Runs kept per job for the /status telemetry
+    TELEMETRY_RUNS = int(os.getenv("TELEMETRY_RUNS", 100))
+
+    # Outbound HTTP: total and connect timeouts (seconds) and pooled connections
+    HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", 10))
+    HTTP_CONNECT_TIMEOUT_SECONDS = float(os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", 5))
+    HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", 20))
+
+    # Hosts to open TLS connections to while the bot warms up (comma separated,
+    # empty to skip)
+    WARMUP_URLS = [
+        url.strip()
+        for url in os.getenv(
+            "WARMUP_URLS", "https://api.twitter.com,https://api.coingecko.com"
+        ).split(",")
+        if url.strip()
+    ]
+
+    # Resilience for X and CoinGecko calls: attempts per call, backoff base and
+    # cap (seconds, full jitter), overall deadline per call including retries,
+    # and the consecutive failures that open an upstream's circuit and how long
+    # it stays open before a probe
+    RETRY_ATTEMPTS = int(os.getenv("RETRY_ATTEMPTS", 3))
+    RETRY_BASE_SECONDS = float(os.getenv("RETRY_BASE_SECONDS", 0.5))
+    RETRY_MAX_SECONDS = float(os.getenv("RETRY_MAX_SECONDS", 8))
+    CALL_DEADLINE_SECONDS = float(os.getenv("CALL_DEADLINE_SECONDS", 30))
+    BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", 5))
+    BREAKER_RESET_SECONDS = float(os.getenv("BREAKER_RESET_SECONDS", 30))
+
+    # API base URLs; point them at a local stand-in (tests/load/fake_api.py) for
+    # load and fault testing
+    X_API_BASE_URL = os.getenv("X_API_BASE_URL", "https://api.twitter.com")
+    COINGECKO_BASE_URL = os.getenv(
+        "COINGECKO_BASE_URL", "https://api.coingecko.com/api/v3"
+    )
+
+    # Directory for persistent bot state (seen tweets, search cursors, ...)
+    STATE_DIR = os.getenv("STATE_DIR", "state")
+    # SQLite file restoring market data and limiter budgets after a restart
+    # (empty to disable), and how often queued writes reach it (seconds)
+    WARM_STATE_DB = os.getenv("WARM_STATE_DB", os.path.join(STATE_DIR, "warm_state.db"))
+    WARM_STATE_FLUSH_SECONDS = float(os.getenv("WARM_STATE_FLUSH_SECONDS", 5))
+
+    # Tweets engaged with in parallel by the async engagement job
+    ENGAGEMENT_CONCURRENCY = int(os.getenv("ENGAGEMENT_CONCURRENCY", 5))
+    # Upper bounds for one engagement run's paginated search
+    ENGAGEMENT_MAX_TWEETS = int(os.getenv("ENGAGEMENT_MAX_TWEETS", 50))
+    SEARCH_MAX_PAGES = int(os.getenv("SEARCH_MAX_PAGES", 5))
+
+    # Market data cache (seconds); stale values are served while revalidating
+    TRENDING_CACHE_TTL = float(os.getenv("TRENDING_CACHE_TTL", 600))
+    TRENDING_CACHE_STALE_TTL = float(os.getenv("TRENDING_CACHE_STALE_TTL", 1800))
+    PRICE_CACHE_TTL = float(os.getenv("PRICE_CACHE_TTL", 60))
+    PRICE_CACHE_STALE_TTL = float(os.getenv("PRICE_CACHE_STALE_TTL", 240))
+    MARKET_CACHE_MAX_ENTRIES = int(os.getenv("MARKET_CACHE_MAX_ENTRIES", 512))
+    # How long a trending coin's ticker symbol is remembered for exchange quotes
+    SYMBOL_CACHE_TTL = float(os.getenv("SYMBOL_CACHE_TTL", 7 * 86400))
+
+    # Price sources in order of preference before any latency is measured:
+    # "coingecko" and/or ccxt exchange ids (e.g. "coingecko,okx,gate"), quoted
+    # against PRICE_CCXT_QUOTE. Exchanges are opt-in.
+    # A backup source is also asked once the best one has taken
+    # PRICE_HEDGE_SECONDS (or twice its usual latency); 0 disables hedging
+    PRICE_SOURCES = [
+        name.strip()
+        for name in os.getenv("PRICE_SOURCES", "coingecko").split(",")
+        if name.strip()
+    ]
+    PRICE_CCXT_QUOTE = os.getenv("PRICE_CCXT_QUOTE", "USDT")
+    PRICE_HEDGE_SECONDS = float(os.getenv("PRICE_HEDGE_SECONDS", 1.0))
+
+    # Price history kept from fetches for trend figures: samples per coin, coins
+    # kept, minimum seconds between samples, and a snapshot file loaded on
+    # startup and written on shutdown (empty to disable)
+    PRICE_HISTORY_POINTS = int(os.getenv("PRICE_HISTORY_POINTS", 288))
+    PRICE_HISTORY_MAX_COINS = int(os.getenv("PRICE_HISTORY_MAX_COINS", 200))
+    PRICE_HISTORY_MIN_INTERVAL = float(os.getenv("PRICE_HISTORY_MIN_INTERVAL", 60))
+    PRICE_HISTORY_SNAPSHOT = os.getenv(
+        "PRICE_HISTORY_SNAPSHOT", os.path.join(STATE_DIR, "price_history.npz")
+    )
 
     # Twitter API credentials from Secret Manager (lazy loaded)
     @property
     def TWITTER_CLIENT_ID(self) -> str:
-        value = get_secret("twitter-client-id")
+        value = secret_store.get("twitter-client-id")
         if value is None:
             # Return a dummy value to allow startup, will fail when actually used
             return "dummy-client-id"
@@ -63,35 +276,35 @@ class Config:
 
     @property
     def TWITTER_CLIENT_SECRET(self) -> str:
-        value = get_secret("twitter-client-secret")
+        value = secret_store.get("twitter-client-secret")
         if value is None:
             return "dummy-client-secret"
         return value
 
     @property
     def TWITTER_BEARER_TOKEN(self) -> str:
-        value = get_secret("twitter-bearer-token")
+        value = secret_store.get("twitter-bearer-token")
         if value is None:
             return "dummy-bearer-token"
         return value
 
     @property
     def TWITTER_ACCESS_TOKEN(self) -> str:
-        value = get_secret("twitter-access-token")
+        value = secret_store.get("twitter-access-token")
         if value is None:
             return "dummy-access-token"
         return value
 
     @property
     def TWITTER_ACCESS_TOKEN_SECRET(self) -> str:
-        value = get_secret("twitter-access-token-secret")
+        value = secret_store.get("twitter-access-token-secret")
         if value is None:
             return "dummy-access-token-secret"
         return value
 
     @property
     def COINGECKO_API_KEY(self) -> Optional[str]:
-        value = get_secret("coingecko-api-key")
+        value = secret_store.get("coingecko-api-key")
         if value is None:
             return None  # CoinGecko API key is optional
         return value
@@ -1,42 +1,89 @@
-from .twitter_client import TwitterClient
+import asyncio
+from contextlib import closing
+from .twitter_client import AsyncTwitterClient, TwitterClient
 from .market_data import MarketData
-from .rate_limiter import RateLimiter
+from .price_history import HOUR
+from .rate_limiter import CREATE_TWEET, LIKE, RateLimiter
+from .seen_store import SeenTweetStore
 from .spam_detector import SpamDetector
+from .telemetry import RATE_LIMITED, count_action, fail_action
+from .config import config as Config
+from .instrumentation import timed_action
 from .logger import get_logger
 from .metrics import posts_counter, likes_counter, replies_counter, engagements_counter
 from . import bot_status
 from datetime import datetime
+from typing import (
+    Any,
+    AsyncGenerator,
+    Generator,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
 
 logger = get_logger()
 
+ENGAGEMENT_QUERY = 'wifDOG OR solwifDOG OR wifDOG OR memecoin OR crypto OR kukur OR tihar OR "dog festival" OR nepal'
+ENGAGEMENT_REPLY = "Fascinating cultural insight! Dogs hold a special place in many cultures. 🐕 #KukurTihar #CulturalHeritage"
+
+
+def format_changes(changes: Mapping[float, float]) -> str:
+    """ " (+2.5% 1h, -1.0% 24h)" for {window seconds: percent change}, or ""."""
+    if not changes:
+        return ""
+    parts = [
+        f"{change:+.1f}% {int(seconds // HOUR)}h"
+        for seconds, change in sorted(changes.items())
+    ]
+    return f" ({', '.join(parts)})"
+
 
 class EngagementBot:
-    def __init__(self) -> None:
-        self.twitter = TwitterClient()
-        self.market = MarketData()
-        self.rate_limiter = RateLimiter()
-        self.spam_detector = SpamDetector()
+    def __init__(
+        self,
+        twitter: Optional[TwitterClient] = None,
+        market: Optional[MarketData] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        spam_detector: Optional[SpamDetector] = None,
+        async_twitter: Optional[AsyncTwitterClient] = None,
+        seen: Optional[SeenTweetStore] = None,
+    ) -> None:
+        self.twitter = twitter or TwitterClient()
+        self.async_twitter = async_twitter or AsyncTwitterClient()
+        self.market = market or MarketData()
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.spam_detector = spam_detector or SpamDetector()
+        self.seen = seen if seen is not None else SeenTweetStore()
 
+    @timed_action("market_update")
     def post_market_update(self) -> None:
-        if not self.rate_limiter.can_request():
+        if not self.rate_limiter.can_request(timeout=Config.RATE_LIMIT_WAIT_SECONDS):
             logger.warning(
                 "Rate limit exceeded for market update",
                 extra={"action": "market_update", "rate_limited": True},
             )
+            fail_action("Rate limit exceeded for market update", RATE_LIMITED)
             return
         trending = self.market.get_trending_coins()
         if trending:
-            coin = trending[0]
-            price = self.market.get_coin_price(coin)
-            if price:
+            # Price the whole trending set in one request, post the first priced coin
+            prices = self.market.get_coin_prices(trending, ["usd"])
+            coin = next((c for c in trending if prices.get(c, {}).get("usd")), None)
+            if coin:
+                price = prices[coin]["usd"]
+                changes = self.market.get_price_changes(coin)
                 text = (
-                    f"Trending memecoin: {coin.capitalize()} at ${price} USD. "
-                    "#memecoin #crypto"
+                    f"Trending memecoin: {coin.capitalize()} at ${price} USD"
+                    f"{format_changes(changes)}. #memecoin #crypto"
                 )
                 tweet_id = self.twitter.post_tweet(text)
                 if tweet_id:
                     posts_counter.inc()
                     engagements_counter.inc()
+                    count_action("posts")
                     logger.info(
                         "Market update posted successfully",
                         extra={
@@ -57,12 +104,13 @@ class EngagementBot:
                             "success": False,
                         },
                     )
+                    fail_action("Failed to post market update")
             else:
                 logger.warning(
-                    "Could not fetch price for trending coin",
+                    "Could not fetch price for any trending coin",
                     extra={
                         "action": "market_update",
-                        "coin": coin,
+                        "coins": trending,
                         "price_fetched": False,
                     },
                 )
@@ -73,18 +121,208 @@ class EngagementBot:
             )
         bot_status.last_market_update = datetime.now()
 
-    def engage_with_tweets(
-        self,
-        query: str = 'wifDOG OR solwifDOG OR wifDOG OR memecoin OR crypto OR kukur OR tihar OR "dog festival" OR nepal',
-    ) -> None:
+    @timed_action("engagement")
+    def engage_with_tweets(self, query: str = ENGAGEMENT_QUERY) -> None:
         logger.info(
             "Starting tweet engagement",
             extra={"action": "engage_tweets", "query": query},
         )
-        tweets = self.twitter.search_tweets(query)
+        search = self.twitter.iter_search_pages(
+            query,
+            max_total=Config.ENGAGEMENT_MAX_TWEETS,
+            max_pages=Config.SEARCH_MAX_PAGES,
+            since_id=self.seen.get_since_id(query),
+        )
         engaged_count = 0
-        for tweet in tweets:
-            if self.spam_detector.is_spam(tweet.text):
+        # Tweets are handled as pages arrive; breaking out stops further page fetches
+        with closing(self._fresh(query, search)) as tweets:
+            for tweet, spam in tweets:
+                if spam:
+                    self.seen.mark_seen([tweet.id])
+                    continue
+                if not self.rate_limiter.can_request(
+                    timeout=Config.RATE_LIMIT_WAIT_SECONDS
+                ):
+                    logger.warning(
+                        "Rate limit reached during engagement",
+                        extra={
+                            "action": "engage_tweets",
+                            "engaged_count": engaged_count,
+                        },
+                    )
+                    fail_action("Rate limit reached during engagement", RATE_LIMITED)
+                    break
+                # Simple engagement: like and reply
+                self.twitter.like_tweet(tweet.id)
+                likes_counter.inc()
+                engagements_counter.inc()
+                count_action("likes")
+                tweet_id = self.twitter.reply_to_tweet(tweet.id, ENGAGEMENT_REPLY)
+                self.seen.mark_seen([tweet.id])
+                if self._record_reply(tweet, tweet_id):
+                    engaged_count += 1
+        logger.info(
+            "Tweet engagement completed",
+            extra={"action": "engage_tweets", "total_engaged": engaged_count},
+        )
+        bot_status.last_engagement = datetime.now()
+
+    @timed_action("engagement")
+    async def engage_with_tweets_async(self, query: str = ENGAGEMENT_QUERY) -> None:
+        """
+        Concurrent engage_with_tweets: each tweet's like and reply are sent together
+        and tweets are processed in parallel, bounded by a semaphore sized to what
+        is left of the like/create_tweet budgets.
+        """
+        logger.info(
+            "Starting tweet engagement",
+            extra={"action": "engage_tweets", "query": query, "mode": "async"},
+        )
+        search = self.async_twitter.iter_search_pages(
+            query,
+            max_total=Config.ENGAGEMENT_MAX_TWEETS,
+            max_pages=Config.SEARCH_MAX_PAGES,
+            since_id=await asyncio.to_thread(self.seen.get_since_id, query),
+        )
+        limits = self.async_twitter.limits
+        budget = min(limits.get(LIKE).available, limits.get(CREATE_TWEET).available)
+        semaphore = asyncio.Semaphore(
+            max(1, min(Config.ENGAGEMENT_CONCURRENCY, int(budget)))
+        )
+        # Handled ids are written in one off-loop commit per page, not per tweet
+        handled: List[Any] = []
+
+        async def flush() -> None:
+            if handled:
+                batch = handled[:]
+                del handled[:]
+                await asyncio.to_thread(self.seen.mark_seen, batch)
+
+        async def engage(tweet: Any) -> bool:
+            async with semaphore:
+                if not await self.rate_limiter.acquire(
+                    timeout=Config.RATE_LIMIT_WAIT_SECONDS
+                ):
+                    logger.warning(
+                        "Rate limit reached during engagement",
+                        extra={"action": "engage_tweets", "tweet_id": tweet.id},
+                    )
+                    fail_action("Rate limit reached during engagement", RATE_LIMITED)
+                    return False
+                liked, tweet_id = await asyncio.gather(
+                    self.async_twitter.like_tweet(tweet.id),
+                    self.async_twitter.reply_to_tweet(tweet.id, ENGAGEMENT_REPLY),
+                )
+                handled.append(tweet.id)
+                if liked:
+                    likes_counter.inc()
+                    engagements_counter.inc()
+                    count_action("likes")
+                return self._record_reply(tweet, tweet_id)
+
+        # Start engaging each tweet as soon as its page arrives
+        tasks = []
+        received: List[Any] = []
+        pages = self._fresh_async(search, received)
+        try:
+            async for page in pages:
+                for tweet, spam in page:
+                    if spam:
+                        handled.append(tweet.id)
+                    else:
+                        tasks.append(asyncio.ensure_future(engage(tweet)))
+                await flush()
+        finally:
+            await pages.aclose()
+        engaged_count = sum(await asyncio.gather(*tasks))
+        await flush()
+        await asyncio.to_thread(self._advance, query, received)
+        logger.info(
+            "Tweet engagement completed",
+            extra={"action": "engage_tweets", "total_engaged": engaged_count},
+        )
+        bot_status.last_engagement = datetime.now()
+
+    def _fresh(
+        self, query: str, pages: Iterable[List[Any]]
+    ) -> Generator[Tuple[Any, bool], None, None]:
+        """
+        Pass through (tweet, is_spam) for tweets not handled on earlier runs, each
+        page's new tweets spam-checked in one batch. Once the stream ends or is
+        closed, the query's since_id moves forward (see _advance).
+        """
+        ids: List[Any] = []
+        skipped = 0
+        try:
+            for page in pages:
+                fresh = self._unseen(page, ids)
+                skipped += len(page) - len(fresh)
+                for tweet, spam in zip(fresh, self._spam_flags(fresh)):
+                    ids.append(tweet.id)
+                    yield tweet, spam
+        finally:
+            self._log_skipped(skipped)
+            self._advance(query, ids)
+
+    async def _fresh_async(
+        self, pages: AsyncGenerator[List[Any], None], received: List[Any]
+    ) -> AsyncGenerator[List[Tuple[Any, bool]], None]:
+        """
+        Async counterpart of _fresh, yielding a page of pairs at a time and
+        closing the search stream it reads. Engagement outlives the stream, so
+        the ids received are collected for the caller to _advance once done.
+        """
+        skipped = 0
+        try:
+            async for page in pages:
+                fresh = self._unseen(page, received)
+                skipped += len(page) - len(fresh)
+                received += [tweet.id for tweet in fresh]
+                if fresh:
+                    yield list(zip(fresh, self._spam_flags(fresh)))
+        finally:
+            await pages.aclose()
+            self._log_skipped(skipped)
+
+    def _unseen(self, page: List[Any], ids: List[Any]) -> List[Any]:
+        """Tweets of `page` not handled before; the others' ids go to `ids`."""
+        fresh = []
+        for tweet in page:
+            if tweet.id in self.seen:
+                ids.append(tweet.id)
+            else:
+                fresh.append(tweet)
+        return fresh
+
+    def _advance(self, query: str, ids: List[Any]) -> None:
+        """
+        Move the query's since_id to the newest of `ids`, but only below the
+        oldest one left unhandled (e.g. out of budget), so the next run fetches
+        that tweet again instead of dropping it.
+        """
+        pending = [int(i) for i in map(str, ids) if i.isdigit() and i not in self.seen]
+        if pending:
+            oldest = min(pending)
+            ids = [i for i in ids if str(i).isdigit() and int(i) < oldest]
+        self.seen.advance_since_id(query, ids)
+
+    def _log_skipped(self, skipped: int) -> None:
+        if skipped:
+            logger.info(
+                "Skipped already handled tweets",
+                extra={"action": "engage_tweets", "skipped": skipped},
+            )
+
+    def _spam_flags(self, tweets: List[Any]) -> List[bool]:
+        """Spam verdict for each tweet, scored as one batch."""
+        if not tweets:
+            return []
+        flags = self.spam_detector.is_spam_batch(
+            [tweet.text for tweet in tweets],
+            [getattr(tweet, "author_id", None) for tweet in tweets],
+        )
+        for tweet, spam in zip(tweets, flags):
+            if spam:
                 logger.info(
                     "Skipped spam tweet",
                     extra={
@@ -93,53 +331,41 @@ class EngagementBot:
                         "reason": "spam",
                     },
                 )
-                continue
-            if not self.rate_limiter.can_request():
-                logger.warning(
-                    "Rate limit reached during engagement",
-                    extra={"action": "engage_tweets", "engaged_count": engaged_count},
-                )
-                break
-            # Simple engagement: like and reply
-            self.twitter.like_tweet(tweet.id)
-            likes_counter.inc()
+        return flags
+
+    def _record_reply(self, tweet: Any, tweet_id: Optional[str]) -> bool:
+        if tweet_id:
+            replies_counter.inc()
             engagements_counter.inc()
-            reply_text = "Fascinating cultural insight! Dogs hold a special place in many cultures. 🐕 #KukurTihar #CulturalHeritage"
-            tweet_id = self.twitter.reply_to_tweet(tweet.id, reply_text)
-            if tweet_id:
-                replies_counter.inc()
-                engagements_counter.inc()
-                logger.info(
-                    "Successfully engaged with tweet",
-                    extra={
-                        "action": "engage_tweets",
-                        "original_tweet_id": tweet.id,
-                        "reply_tweet_id": tweet_id,
-                        "engagement_type": "like_and_reply",
-                    },
-                )
-                engaged_count += 1
-            else:
-                logger.warning(
-                    "Failed to reply to tweet",
-                    extra={
-                        "action": "engage_tweets",
-                        "tweet_id": tweet.id,
-                        "engagement_type": "like_only",
-                    },
-                )
-        logger.info(
-            "Tweet engagement completed",
-            extra={"action": "engage_tweets", "total_engaged": engaged_count},
+            count_action("replies")
+            logger.info(
+                "Successfully engaged with tweet",
+                extra={
+                    "action": "engage_tweets",
+                    "original_tweet_id": tweet.id,
+                    "reply_tweet_id": tweet_id,
+                    "engagement_type": "like_and_reply",
+                },
+            )
+            return True
+        logger.warning(
+            "Failed to reply to tweet",
+            extra={
+                "action": "engage_tweets",
+                "tweet_id": tweet.id,
+                "engagement_type": "like_only",
+            },
         )
-        bot_status.last_engagement = datetime.now()
+        return False
 
+    @timed_action("promote_community")
     def promote_community(self) -> None:
-        if not self.rate_limiter.can_request():
+        if not self.rate_limiter.can_request(timeout=Config.RATE_LIMIT_WAIT_SECONDS):
             logger.warning(
                 "Rate limit exceeded for community promotion",
                 extra={"action": "promote_community", "rate_limited": True},
             )
+            fail_action("Rate limit exceeded for community promotion", RATE_LIMITED)
             return
 
         # Enhanced $wifDOG promotion messages with trending elements
@@ -160,6 +386,7 @@ class EngagementBot:
         if tweet_id:
             posts_counter.inc()
             engagements_counter.inc()
+            count_action("posts")
             logger.info(
                 "Community promotion posted successfully",
                 extra={
@@ -173,15 +400,18 @@ class EngagementBot:
                 "Failed to post community promotion",
                 extra={"action": "promote_community", "success": False},
             )
+            fail_action("Failed to post community promotion")
         bot_status.last_promotion = datetime.now()
 
+    @timed_action("promote_specific_post")
     def promote_specific_post(self) -> None:
         """Promote the specific $wifDOG post with groundbreaking SEO and trending elements"""
-        if not self.rate_limiter.can_request():
+        if not self.rate_limiter.can_request(timeout=Config.RATE_LIMIT_WAIT_SECONDS):
             logger.warning(
                 "Rate limit exceeded for specific post promotion",
                 extra={"action": "promote_specific_post", "rate_limited": True},
             )
+            fail_action("Rate limit exceeded for specific post promotion", RATE_LIMITED)
             return
 
         target_tweet_id = "1968073148789821487"  # The specific post to promote
@@ -204,6 +434,7 @@ class EngagementBot:
         if reply_id:
             replies_counter.inc()
             engagements_counter.inc()
+            count_action("replies")
             logger.info(
                 "Specific post promotion successful",
                 extra={
@@ -220,6 +451,7 @@ class EngagementBot:
             if tweet_id:
                 posts_counter.inc()
                 engagements_counter.inc()
+                count_action("posts")
                 logger.info(
                     "Specific post promotion (standalone) successful",
                     extra={
@@ -238,5 +470,6 @@ class EngagementBot:
                         "success": False,
                     },
                 )
+                fail_action("Failed to promote specific post")
 
         bot_status.last_specific_promotion = datetime.now()
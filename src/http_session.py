@@ -0,0 +1,128 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Coroutine, Iterable, Optional, TypeVar
+
+import aiohttp
+
+from .config import config as Config
+from .logger import get_logger
+
+logger = get_logger()
+
+T = TypeVar("T")
+
+_session: Optional[aiohttp.ClientSession] = None
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_thread: Optional[threading.Thread] = None
+_lock = threading.Lock()
+
+
+def bind_loop(loop: asyncio.AbstractEventLoop) -> None:
+    """Make `loop` the owner of the shared session (called by the app on startup)."""
+    global _loop
+    with _lock:
+        _loop = loop
+
+
+def _ensure_loop() -> asyncio.AbstractEventLoop:
+    """Return the owning loop, starting a private I/O thread when there is none."""
+    global _loop, _loop_thread
+    with _lock:
+        if _loop is not None and _loop.is_running():
+            return _loop
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(
+            target=loop.run_forever, name="http-session-loop", daemon=True
+        )
+        thread.start()
+        ready = threading.Event()
+        loop.call_soon_threadsafe(ready.set)
+        ready.wait()
+        _loop, _loop_thread = loop, thread
+        return loop
+
+
+async def get_session() -> aiohttp.ClientSession:
+    """Return the process-wide pooled session, opening it on first use."""
+    global _session, _session_loop
+    loop = asyncio.get_running_loop()
+    if _session is not None and _session_loop is not loop:
+        if _session_loop is not None and _session_loop.is_running():
+            raise RuntimeError(
+                "Shared HTTP session belongs to another event loop; use run_sync()"
+            )
+        # The owning loop is gone (e.g. a finished test loop); start over
+        _session = None
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=Config.HTTP_POOL_SIZE, ttl_dns_cache=300, keepalive_timeout=60
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=Config.HTTP_TIMEOUT_SECONDS,
+            connect=Config.HTTP_CONNECT_TIMEOUT_SECONDS,
+        )
+        _session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        _session_loop = loop
+        if _loop is None or not _loop.is_running():
+            bind_loop(loop)
+        logger.info("Opened shared HTTP session")
+    return _session
+
+
+async def prewarm(urls: Iterable[str]) -> None:
+    """
+    Open a pooled TLS connection to each URL's host (DNS, TCP and handshake) so
+    the first real request can reuse it. Failures are logged and ignored.
+    """
+    session = await get_session()
+
+    async def touch(url: str) -> None:
+        try:
+            async with session.head(url, allow_redirects=False):
+                pass
+        except Exception as e:
+            logger.warning(f"Could not pre-warm connection to {url}: {e}")
+
+    await asyncio.gather(*(touch(url) for url in urls))
+
+
+async def close_session() -> None:
+    global _session, _session_loop
+    if _session is not None and not _session.closed:
+        await _session.close()
+        logger.info("Closed shared HTTP session")
+    _session, _session_loop = None, None
+
+
+def run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    Run `coro` on the loop that owns the shared session and wait for the result.
+    Lets blocking callers (scheduler worker threads, scripts) reuse the pool.
+    """
+    loop = _ensure_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_sync() called from the event loop; await instead")
+    future: "Future[T]" = asyncio.run_coroutine_threadsafe(coro, loop)
+    return future.result()
+
+
+def shutdown() -> None:
+    """Close the session and stop the private I/O thread, if one was started."""
+    global _loop, _loop_thread
+    if _loop_thread is None or _loop is None:
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(close_session(), _loop).result(timeout=5)
+    except Exception as e:
+        logger.error(f"Error closing shared HTTP session: {e}")
+    _loop.call_soon_threadsafe(_loop.stop)
+    _loop_thread.join(timeout=5)
+    _loop.close()
+    _loop, _loop_thread = None, None
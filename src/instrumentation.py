@@ -0,0 +1,157 @@
+import asyncio
+import functools
+import inspect
+import time
+from types import TracebackType
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Optional,
+    Type,
+    TypeVar,
+    Union,
+    cast,
+)
+from .metrics import (
+    bot_action_latency,
+    bot_actions_in_flight,
+    external_call_latency,
+    external_calls_in_flight,
+)
+from .telemetry import telemetry
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+OK, ERROR, TOO_MANY_REQUESTS, TIMEOUT = "ok", "error", "429", "timeout"
+
+
+def status_of(error: BaseException) -> Optional[int]:
+    """HTTP status carried by a tweepy, aiohttp or requests error, if any."""
+    response = getattr(error, "response", None)
+    status = getattr(error, "status", None) or getattr(
+        response, "status_code", getattr(response, "status", None)
+    )
+    return status if isinstance(status, int) else None
+
+
+def is_timeout(error: BaseException) -> bool:
+    return (
+        isinstance(error, (TimeoutError, asyncio.TimeoutError))
+        or "Timeout" in type(error).__name__
+    )
+
+
+def outcome_of(error: Optional[BaseException]) -> str:
+    """Map an exception (tweepy, aiohttp, requests or builtin) to an outcome label."""
+    if error is None:
+        return OK
+    if is_timeout(error):
+        return TIMEOUT
+    if status_of(error) == 429:
+        return TOO_MANY_REQUESTS
+    return ERROR
+
+
+class track_call:
+    """
+    Context manager timing one external call into external_call_seconds, labelled
+    by outcome, and counting it in external_calls_in_flight while it runs.
+    """
+
+    def __init__(self, service: str, endpoint: str) -> None:
+        self.service = service
+        self.endpoint = endpoint
+        self._start = 0.0
+
+    def __enter__(self) -> "track_call":
+        external_calls_in_flight.labels(service=self.service).inc()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        external_calls_in_flight.labels(service=self.service).dec()
+        external_call_latency.labels(
+            service=self.service, endpoint=self.endpoint, outcome=outcome_of(exc)
+        ).observe(time.perf_counter() - self._start)
+
+
+class track_action:
+    """
+    Context manager timing a bot action into bot_action_seconds, by outcome, and
+    recording the run (with its count_action() tallies and any fail_action()
+    report) in the job telemetry.
+    """
+
+    def __init__(self, action: str) -> None:
+        self.action = action
+        self._start = 0.0
+        self._started = 0.0
+        self._token: Any = None
+
+    def __enter__(self) -> "track_action":
+        bot_actions_in_flight.labels(action=self.action).inc()
+        self._token = telemetry.start()
+        self._started = time.time()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        duration = time.perf_counter() - self._start
+        bot_actions_in_flight.labels(action=self.action).dec()
+        run = telemetry.finish(
+            self.action, self._token, self._started, duration, ERROR if exc else OK, exc
+        )
+        bot_action_latency.labels(action=self.action, outcome=run.outcome).observe(
+            duration
+        )
+
+
+def _wrap(func: F, tracker: Callable[[Any, Any], ContextManager[Any]]) -> F:
+    """Run sync or async `func` inside the context manager built by `tracker`."""
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            with tracker(args, kwargs):
+                return await func(*args, **kwargs)
+
+        return cast(F, async_wrapper)
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with tracker(args, kwargs):
+            return func(*args, **kwargs)
+
+    return cast(F, wrapper)
+
+
+def instrumented(
+    service: str, endpoint: Union[str, Callable[..., str]]
+) -> Callable[[F], F]:
+    """
+    Decorator form of track_call for sync and async functions. `endpoint` may be
+    a function of the call's arguments; it must return one of a fixed set of
+    values to keep label cardinality bounded.
+    """
+
+    def tracker(args: Any, kwargs: Any) -> track_call:
+        label = endpoint(*args, **kwargs) if callable(endpoint) else endpoint
+        return track_call(service, label)
+
+    return lambda func: _wrap(func, tracker)
+
+
+def timed_action(action: str) -> Callable[[F], F]:
+    """Decorator form of track_action for sync and async bot methods."""
+    return lambda func: _wrap(func, lambda args, kwargs: track_action(action))
@@ -1,25 +1,239 @@
+import atexit
+import json
 import os
-from typing import Any
+import queue
+import sys
+import threading
+import time
+import zlib
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
 from loguru import logger
 from .config import config as Config
 
-# Configure Google Cloud Logging if in production
-if os.getenv("GOOGLE_CLOUD_PROJECT"):
+if TYPE_CHECKING:
+    from loguru import Record
+
+INFO_LEVEL = logger.level("INFO").no
+_STOP = object()
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """Parse "action=rate,..." (e.g. "engage_tweets=0.1"); bad entries are skipped."""
+    rates = {}
+    for item in spec.split(","):
+        action, _, rate = item.partition("=")
+        try:
+            rates[action.strip()] = min(1.0, max(0.0, float(rate)))
+        except ValueError:
+            continue
+    return rates
+
+
+def record_fields(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Structured fields of a record: bound extras plus the `extra=` kwarg."""
+    fields = {key: value for key, value in record["extra"].items() if key != "extra"}
+    fields.update(record["extra"].get("extra") or {})
+    return fields
+
+
+def structured(record: Dict[str, Any]) -> Dict[str, Any]:
+    entry = {
+        "severity": record["level"].name,
+        "message": record["message"],
+        "time": record["time"].isoformat(),
+        "logger": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+    }
+    entry.update(record_fields(record))
+    return entry
+
+
+class LogSampler:
+    """
+    Loguru filter keeping only a fraction of INFO-and-below records per `action`
+    field. The verdict is derived from the record itself, so every sink keeps or
+    drops the same records.
+    """
+
+    def __init__(self, rates: Dict[str, float]) -> None:
+        self.rates = rates
+
+    def __call__(self, record: "Record") -> bool:
+        if not self.rates or record["level"].no > INFO_LEVEL:
+            return True
+        action = (record["extra"].get("extra") or {}).get("action")
+        rate = self.rates.get(action) if isinstance(action, str) else None
+        if rate is None:
+            return True
+        key = f"{record['time'].timestamp()}:{record['message']}".encode()
+        return zlib.crc32(key) / 2**32 < rate
+
+
+class BackgroundSink:
+    """
+    Loguru sink that hands messages to a daemon writer thread, so the logging
+    call only pays for a queue put. When the queue is full, messages are dropped
+    and counted rather than blocking the caller. `flush` runs on the writer
+    thread after `flush_interval` seconds of idleness and on stop.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[Any], None],
+        flush: Optional[Callable[[], None]] = None,
+        flush_interval: Optional[float] = None,
+        max_queue: int = 10000,
+    ) -> None:
+        # Private on purpose: loguru treats a sink with a `write` method as a
+        # stream and would call it directly on the logging thread
+        self._write = write
+        self._flush = flush
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue(max_queue)
+        self._thread = threading.Thread(
+            target=self._run, name="log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def __call__(self, message: Any) -> None:
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            try:
+                message = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._safely(self._flush)
+                continue
+            try:
+                if message is _STOP:
+                    self._safely(self._flush)
+                    return
+                self._safely(self._write, message)
+            finally:
+                self._queue.task_done()
+
+    @staticmethod
+    def _safely(func: Optional[Callable[..., None]], *args: Any) -> None:
+        if func is None:
+            return
+        try:
+            func(*args)
+        except Exception as e:
+            print(f"Log writer error: {e}", file=sys.stderr)
+
+    def join(self) -> None:
+        """Wait until every queued message has been written."""
+        self._queue.join()
+
+    def stop(self, timeout: float = 5) -> None:
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+
+class CloudLoggingBatcher:
+    """
+    Buffers structured entries and uploads them with one Cloud Logging batch.
+    `connect` builds the Cloud logger on the first upload, off the startup path.
+    """
+
+    def __init__(
+        self, connect: Callable[[], Any], batch_size: int, interval: float
+    ) -> None:
+        self.connect = connect
+        self.cloud_logger: Optional[Any] = None
+        self.batch_size = batch_size
+        self.interval = interval
+        self._pending: List[Dict[str, Any]] = []
+        self._last_flush = time.monotonic()
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        self._pending.append(entry)
+        if (
+            len(self._pending) >= self.batch_size
+            or time.monotonic() - self._last_flush >= self.interval
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        if self.cloud_logger is None:
+            self.cloud_logger = self.connect()
+        batch = self.cloud_logger.batch()
+        for entry in pending:
+            batch.log_struct(entry, severity=entry["severity"])
+        batch.commit()
+
+
+def structured_writer(
+    stream: Any, cloud: Optional[CloudLoggingBatcher] = None
+) -> Callable[[Any], None]:
+    """Write each record as one JSON line, serialized once, and queue it for Cloud."""
+
+    def write(message: Any) -> None:
+        entry = structured(message.record)
+        stream.write(json.dumps(entry, default=str) + "\n")
+        if cloud is not None:
+            cloud.add(entry)
+
+    return write
+
+
+sampler = LogSampler(parse_sample_rates(Config.LOG_SAMPLE_RATES))
+_background_sinks: List[BackgroundSink] = []
+
+
+def cloud_logger() -> Any:
     import google.cloud.logging
-    from google.cloud.logging.handlers import CloudLoggingHandler
 
-    # Initialize Google Cloud Logging
-    client = google.cloud.logging.Client()
-    handler = CloudLoggingHandler(client, name="x-bot")
-    logger.add(handler, format="{level} {message}", level=Config.LOG_LEVEL)
+    return google.cloud.logging.Client().logger("x-bot")
+
+
+# Replace loguru's default stderr handler, or every record is printed twice
+logger.remove()
+
+# Configure Google Cloud Logging if in production
+if os.getenv("GOOGLE_CLOUD_PROJECT"):
+    cloud = CloudLoggingBatcher(
+        cloud_logger, Config.LOG_BATCH_SIZE, Config.LOG_FLUSH_SECONDS
+    )
+    # One JSON serialization per record feeds both stdout and the Cloud batch
+    sink = BackgroundSink(
+        structured_writer(sys.stdout, cloud),
+        flush=cloud.flush,
+        flush_interval=Config.LOG_FLUSH_SECONDS,
+    )
+    _background_sinks.append(sink)
+    logger.add(sink, format="{message}", level=Config.LOG_LEVEL, filter=sampler)
 else:
     # Local development logging
     logger.add(
-        "logs/bot.log", rotation="1 day", retention="7 days", level=Config.LOG_LEVEL
+        "logs/bot.log",
+        rotation="1 day",
+        retention="7 days",
+        level=Config.LOG_LEVEL,
+        filter=sampler,
+        enqueue=True,
     )
+    # Also add console logging
+    sink = BackgroundSink(lambda msg: print(msg, end=""))
+    _background_sinks.append(sink)
+    logger.add(sink, level=Config.LOG_LEVEL, filter=sampler)
+
 
-# Also add console logging for all environments
-logger.add(lambda msg: print(msg, end=""), level=Config.LOG_LEVEL)
+@atexit.register
+def _shutdown_logging() -> None:
+    for sink in _background_sinks:
+        sink.stop()
+    logger.complete()
 
 
 def get_logger() -> Any:
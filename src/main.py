@@ -1,19 +1,184 @@
 import asyncio
-from fastapi import FastAPI, Response
-from .scheduler import Scheduler
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import TYPE_CHECKING, AsyncIterator, Optional
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
+from .config import config as Config, secret_store
 from .logger import get_logger
-from .bot_status import last_market_update, last_engagement, last_promotion
+from .metrics import posts_counter, engagements_counter
+from .telemetry import telemetry
+from . import bot_status
 from prometheus_client import generate_latest
 
-app = FastAPI()
+# The bot, its clients (tweepy, aiohttp, numpy) and the scheduler are imported
+# when the container is built, so the app can answer /health while it warms up
+if TYPE_CHECKING:
+    from .engagement import EngagementBot
+    from .rate_limiter import RateLimiter
+    from .twitter_client import TwitterClient
+
 logger = get_logger()
 
 
-@app.on_event("startup")
-async def startup_event() -> None:
-    scheduler = Scheduler()
-    scheduler.start()
-    logger.info("Scheduler started")
+class BotContainer:
+    """Process-wide bot, clients and limiter shared by the scheduler and endpoints"""
+
+    def __init__(self) -> None:
+        from .engagement import EngagementBot
+        from .scheduler import Scheduler
+
+        self.bot: "EngagementBot" = EngagementBot()
+        self.twitter: "TwitterClient" = self.bot.twitter
+        self.rate_limiter: "RateLimiter" = self.bot.rate_limiter
+        self.scheduler = Scheduler(self.bot)
+
+    @classmethod
+    async def open(cls) -> "BotContainer":
+        """Bind the HTTP pool to this loop, warm secrets, then build and start"""
+        from .http_session import bind_loop
+
+        bind_loop(asyncio.get_running_loop())
+        elapsed = await asyncio.to_thread(secret_store.prefetch)
+        logger.info(f"Secrets prefetched in {elapsed:.3f}s")
+        restored = await asyncio.to_thread(_restore_rate_limits)
+        if restored:
+            logger.info(f"Restored {restored} rate limit budgets from warm state")
+        # Building the bot imports its heavy dependencies; keep that off the loop
+        container = await asyncio.to_thread(cls)
+        container.scheduler.start()
+        return container
+
+    async def warm_connections(self) -> None:
+        """Pre-open TLS connections to the APIs in both HTTP pools"""
+        from .http_session import prewarm
+
+        if not Config.WARMUP_URLS:
+            return
+        session = getattr(getattr(self.twitter, "client", None), "session", None)
+        await asyncio.gather(
+            prewarm(Config.WARMUP_URLS),
+            asyncio.to_thread(_prewarm_requests, session, Config.WARMUP_URLS[0]),
+        )
+
+    async def close(self) -> None:
+        from .http_session import close_session
+
+        try:
+            self.scheduler.stop()
+        except Exception as e:
+            logger.error(f"Error stopping scheduler: {e}")
+        try:
+            await self.bot.market.close()
+        except Exception as e:
+            logger.error(f"Error closing price sources: {e}")
+        await close_session()
+        secret_store.close()
+        await asyncio.to_thread(self.bot.market.save_history)
+        await asyncio.to_thread(_close_warm_state)
+
+
+def _restore_rate_limits() -> int:
+    """Resume limiter budgets saved by the previous instance, if any"""
+    from .rate_limiter import rate_limits
+    from .warm_state import get_warm_state
+
+    store = get_warm_state()
+    return store.track_limits(rate_limits) if store is not None else 0
+
+
+def _close_warm_state() -> None:
+    from .warm_state import close_warm_state
+
+    try:
+        close_warm_state()
+    except Exception as e:
+        logger.error(f"Error writing warm state: {e}")
+
+
+def _prewarm_requests(session: object, url: str) -> None:
+    """Open a keep-alive connection in tweepy's requests session"""
+    head = getattr(session, "head", None)
+    if head is None:
+        return
+    try:
+        head(url, allow_redirects=False, timeout=5)
+    except Exception as e:
+        logger.warning(f"Could not pre-warm connection to {url}: {e}")
+
+
+async def warm_up(app: FastAPI) -> BotContainer:
+    """Build the container in the background and publish it once it is ready"""
+    container = await BotContainer.open()
+    app.state.container = container
+    logger.info("Bot warmed up")
+    await container.warm_connections()
+    return container
+
+
+def _log_warmup_failure(task: "asyncio.Task[BotContainer]") -> None:
+    # Report a failed warm-up as it happens rather than at shutdown
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Bot warm-up failed: {task.exception()}")
+
+
+def warmup_failed(app: FastAPI) -> bool:
+    warmup: Optional["asyncio.Task[BotContainer]"] = getattr(app.state, "warmup", None)
+    return (
+        warmup is not None
+        and warmup.done()
+        and not warmup.cancelled()
+        and warmup.exception() is not None
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Serve /health straight away; endpoints needing the bot answer 503 until
+    # the warm-up task has published the container
+    app.state.container = None
+    app.state.warmup = asyncio.create_task(warm_up(app))
+    app.state.warmup.add_done_callback(_log_warmup_failure)
+    try:
+        yield
+    finally:
+        warmup = app.state.warmup
+        if not warmup.done():
+            warmup.cancel()
+        try:
+            await warmup
+        except (asyncio.CancelledError, Exception):
+            # Already logged by _log_warmup_failure
+            pass
+        container = app.state.container
+        if container is not None:
+            await container.close()
+        app.state.container = None
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+def get_container(request: Request) -> BotContainer:
+    container: Optional[BotContainer] = getattr(request.app.state, "container", None)
+    if container is None:
+        if warmup_failed(request.app):
+            raise HTTPException(status_code=503, detail="Bot warm-up failed")
+        raise HTTPException(status_code=503, detail="Bot is warming up")
+    return container
+
+
+def get_bot(container: BotContainer = Depends(get_container)) -> "EngagementBot":
+    return container.bot
+
+
+def get_twitter(container: BotContainer = Depends(get_container)) -> "TwitterClient":
+    return container.twitter
+
+
+def get_rate_limiter(
+    container: BotContainer = Depends(get_container),
+) -> "RateLimiter":
+    return container.rate_limiter
 
 
 @app.get("/")
@@ -21,15 +186,21 @@ async def root() -> dict:
     return {"message": "X Bot is running"}
 
 
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
 @app.get("/status")
 async def status() -> dict:
+    # Read through the module so the jobs' latest assignments are visible; the
+    # telemetry snapshot copies each ring buffer without blocking the writers
     return {
         "status": "running",
-        "last_market_update": last_market_update.isoformat()
-        if last_market_update
-        else None,
-        "last_engagement": last_engagement.isoformat() if last_engagement else None,
-        "last_promotion": last_promotion.isoformat() if last_promotion else None,
+        "last_market_update": _isoformat(bot_status.last_market_update),
+        "last_engagement": _isoformat(bot_status.last_engagement),
+        "last_promotion": _isoformat(bot_status.last_promotion),
+        "last_specific_promotion": _isoformat(bot_status.last_specific_promotion),
+        "jobs": telemetry.summary(),
     }
 
 
@@ -39,18 +210,19 @@ async def metrics() -> Response:
 
 
 @app.get("/health")
-async def health() -> dict:
-    return {"status": "healthy"}
+async def health(request: Request) -> dict:
+    # Fail the probes so the platform restarts an instance that can never serve
+    if warmup_failed(request.app):
+        raise HTTPException(status_code=503, detail="Bot warm-up failed")
+    ready = getattr(request.app.state, "container", None) is not None
+    return {"status": "healthy", "ready": ready}
 
 
 @app.post("/trigger-promotion")
-async def trigger_promotion() -> dict:
+async def trigger_promotion(bot: "EngagementBot" = Depends(get_bot)) -> dict:
     """Manually trigger a community promotion post for testing"""
     try:
-        from .engagement import EngagementBot
-
-        bot = EngagementBot()
-        success = bot.promote_community()
+        success = await asyncio.to_thread(bot.promote_community)
         return {
             "status": "success" if success else "failed",
             "message": "Manual promotion triggered",
@@ -60,17 +232,8 @@ async def trigger_promotion() -> dict:
         return {"status": "error", "message": str(e)}
 
 
-@app.post("/test-post")
-async def test_post() -> dict:
-    """Post a simple test message to make the account visible"""
+async def _post_test_message(client: "TwitterClient", limiter: "RateLimiter") -> dict:
     try:
-        from .twitter_client import TwitterClient
-        from .rate_limiter import RateLimiter
-        from .metrics import posts_counter, engagements_counter
-
-        client = TwitterClient()
-        limiter = RateLimiter()
-
         if not limiter.can_request():
             return {
                 "status": "rate_limited",
@@ -78,7 +241,7 @@ async def test_post() -> dict:
             }
 
         test_message = "🐕 $wifDOG Community Bot is now active! Join the heavenly revolution! 🌟 #wifDOG #memecoin"
-        tweet_id = client.post_tweet(test_message)
+        tweet_id = await asyncio.to_thread(client.post_tweet, test_message)
 
         if tweet_id:
             posts_counter.inc()
@@ -95,49 +258,32 @@ async def test_post() -> dict:
         return {"status": "error", "message": str(e)}
 
 
-@app.get("/test-post")
-async def test_post_get() -> dict:
-    """GET version of test post for browser access"""
-    try:
-        from .twitter_client import TwitterClient
-        from .rate_limiter import RateLimiter
-        from .metrics import posts_counter, engagements_counter
-
-        client = TwitterClient()
-        limiter = RateLimiter()
-
-        if not limiter.can_request():
-            return {
-                "status": "rate_limited",
-                "message": "Rate limit exceeded, try again later",
-            }
+@app.post("/test-post")
+async def test_post(
+    client: "TwitterClient" = Depends(get_twitter),
+    limiter: "RateLimiter" = Depends(get_rate_limiter),
+) -> dict:
+    """Post a simple test message to make the account visible"""
+    return await _post_test_message(client, limiter)
 
-        test_message = "🐕 $wifDOG Community Bot is now active! Join the heavenly revolution! 🌟 #wifDOG #memecoin"
-        tweet_id = client.post_tweet(test_message)
 
-        if tweet_id:
-            posts_counter.inc()
-            engagements_counter.inc()
-            return {
-                "status": "success",
-                "message": f"Test post successful! Tweet ID: {tweet_id}",
-                "url": f"https://x.com/bishalkunw8/status/{tweet_id}",
-            }
-        else:
-            return {"status": "failed", "message": "Failed to post test message"}
-    except Exception as e:
-        logger.error(f"Failed to post test message: {e}")
-        return {"status": "error", "message": str(e)}
+@app.get("/test-post")
+async def test_post_get(
+    client: "TwitterClient" = Depends(get_twitter),
+    limiter: "RateLimiter" = Depends(get_rate_limiter),
+) -> dict:
+    """GET version of test post for browser access"""
+    return await _post_test_message(client, limiter)
 
 
 async def main() -> None:
     # For local running
-    scheduler = Scheduler()
-    scheduler.start()
+    container = await BotContainer.open()
+    await container.warm_connections()
     try:
         await asyncio.sleep(float("inf"))  # Run forever
-    except KeyboardInterrupt:
-        scheduler.stop()
+    finally:
+        await container.close()
 
 
 if __name__ == "__main__":
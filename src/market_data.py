@@ -1,42 +1,249 @@
-import requests
-from typing import List, Optional
+import os
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+from .cache import MISS, STALE, TTLCache
 from .config import config as Config
+from .http_session import get_session, run_sync
+from .instrumentation import instrumented
 from .logger import get_logger
+from .price_history import DAY, HOUR, PriceHistory
+from .price_sources import PriceEngine, build_sources
+from .rate_limiter import COINGECKO, rate_limits
+from .resilience import CircuitOpenError, Resilience, resilience_for
+from .singleflight import AsyncSingleFlight, request_key
+from .telemetry import fail_action
+from .warm_state import get_warm_state
 
 logger = get_logger()
 
 
+Prices = Dict[str, Dict[str, float]]
+
+
+def chunk_ids(
+    ids: Sequence[str], max_ids: int = 100, max_chars: int = 1500
+) -> List[List[str]]:
+    """Split ids so each comma-joined `ids` query value stays within URL limits."""
+    chunks: List[List[str]] = []
+    current: List[str] = []
+    length = 0
+    for coin_id in ids:
+        extra = len(coin_id) + (1 if current else 0)
+        if current and (len(current) >= max_ids or length + extra > max_chars):
+            chunks.append(current)
+            current, length, extra = [], 0, len(coin_id)
+        current.append(coin_id)
+        length += extra
+    if current:
+        chunks.append(current)
+    return chunks
+
+
 class MarketData:
-    BASE_URL = "https://api.coingecko.com/api/v3"
+    BASE_URL = Config.COINGECKO_BASE_URL
+    SIMPLE_PRICE_MAX_IDS = 100
+    SIMPLE_PRICE_MAX_CHARS = 1500
 
-    def get_trending_coins(self) -> List[str]:
-        url = f"{self.BASE_URL}/search/trending"
-        headers = {"accept": "application/json"}
-        if Config.COINGECKO_API_KEY:
-            headers["x-cg-demo-api-key"] = Config.COINGECKO_API_KEY
+    def __init__(
+        self,
+        cache: Optional[TTLCache] = None,
+        resilience: Optional[Resilience] = None,
+        history: Optional[PriceHistory] = None,
+    ) -> None:
+        self.cache: TTLCache = (
+            cache
+            if cache is not None
+            else TTLCache(
+                "market_data",
+                max_entries=Config.MARKET_CACHE_MAX_ENTRIES,
+                store=get_warm_state(),
+            )
+        )
+        self.resilience = resilience or resilience_for("coingecko")
+        # Blocking wrappers run on the shared loop too, so this also coalesces
+        # calls made from scheduler and request worker threads
+        self._flights = AsyncSingleFlight("coingecko")
+        if history is None:
+            history = PriceHistory()
+            self._load_history(history, Config.PRICE_HISTORY_SNAPSHOT)
+        self.history = history
+        self.engine = PriceEngine(build_sources(self, Config.PRICE_SOURCES))
+
+    @staticmethod
+    def _load_history(history: PriceHistory, path: str) -> None:
+        if not path or not os.path.exists(path):
+            return
         try:
-            response = requests.get(url, headers=headers)
+            loaded = history.load(path)
+            logger.info(f"Loaded price history for {loaded} coins from {path}")
+        except Exception as e:
+            logger.error(f"Could not load price history from {path}: {e}")
+
+    def save_history(self) -> None:
+        """Snapshot the price history to PRICE_HISTORY_SNAPSHOT, if set."""
+        path = Config.PRICE_HISTORY_SNAPSHOT
+        if not path or not len(self.history):
+            return
+        try:
+            self.history.save(path)
+        except Exception as e:
+            logger.error(f"Could not save price history to {path}: {e}")
+
+    def _headers(self) -> Dict[str, str]:
+        headers = {"accept": "application/json"}
+        api_key = Config.COINGECKO_API_KEY
+        if api_key:
+            headers["x-cg-demo-api-key"] = api_key
+        return headers
+
+    async def _get_json(
+        self, path: str, params: Optional[Dict[str, str]] = None
+    ) -> Any:
+        """GET `path`, sharing the response with identical requests in flight."""
+        return await self._flights.do(
+            request_key(path, params=params or {}), self._fetch_json, path, params
+        )
+
+    async def _fetch_json(self, path: str, params: Optional[Dict[str, str]]) -> Any:
+        breaker = self.resilience.breaker
+        if not breaker.available():
+            # Fail fast without spending budget on an upstream that is down
+            raise CircuitOpenError(breaker.name, breaker.retry_in())
+        if not await rate_limits.acquire(
+            COINGECKO, timeout=Config.RATE_LIMIT_WAIT_SECONDS
+        ):
+            raise RuntimeError("CoinGecko rate limit budget exhausted")
+        return await self.resilience.acall(self._request, path, params)
+
+    @instrumented("coingecko", lambda self, path, params=None: path)
+    async def _request(self, path: str, params: Optional[Dict[str, str]]) -> Any:
+        session = await get_session()
+        async with session.get(
+            f"{self.BASE_URL}{path}", params=params, headers=self._headers()
+        ) as response:
             response.raise_for_status()
-            data = response.json()
-            coins = [coin["item"]["id"] for coin in data["coins"]]
+            return await response.json()
+
+    async def _fetch_trending(self) -> List[str]:
+        data = await self._get_json("/search/trending")
+        for coin in data["coins"]:
+            # Exchange price sources find coins by their ticker symbol
+            if coin["item"].get("symbol"):
+                self.cache.set(
+                    ("symbol", coin["item"]["id"]),
+                    coin["item"]["symbol"],
+                    ttl=Config.SYMBOL_CACHE_TTL,
+                )
+        return [coin["item"]["id"] for coin in data["coins"]]
+
+    def symbol_for(self, coin_id: str) -> Optional[str]:
+        """Ticker symbol CoinGecko reported for `coin_id`, if it was trending."""
+        return self.cache.get(("symbol", coin_id))
+
+    async def _fetch_prices(self, ids: List[str], currencies: List[str]) -> Prices:
+        prices = await self.engine.fetch(ids, currencies)
+        self.history.record(prices)
+        # Remember misses too, so unknown ids are not re-requested every call
+        for coin_id in ids:
+            for currency in currencies:
+                self.cache.set(
+                    ("price", coin_id, currency),
+                    prices.get(coin_id, {}).get(currency),
+                    ttl=Config.PRICE_CACHE_TTL,
+                    stale_ttl=Config.PRICE_CACHE_STALE_TTL,
+                )
+        return prices
+
+    async def get_trending_coins_async(self) -> List[str]:
+        try:
+            coins: List[str] = await self.cache.get_or_fetch(
+                "trending",
+                self._fetch_trending,
+                ttl=Config.TRENDING_CACHE_TTL,
+                stale_ttl=Config.TRENDING_CACHE_STALE_TTL,
+                endpoint="trending",
+            )
             logger.info(f"Trending coins: {coins}")
             return coins
         except Exception as e:
             logger.error(f"Error fetching trending coins: {e}")
+            fail_action(f"Error fetching trending coins: {e}")
             return []
 
+    async def get_coin_prices_async(
+        self, ids: Iterable[str], currencies: Iterable[str] = ("usd",)
+    ) -> Prices:
+        """
+        Price many coins in as few /simple/price requests as possible.
+        Returns {coin_id: {currency: price}}; coins without a quote are omitted.
+        """
+        id_list = list(dict.fromkeys(ids))
+        currency_list = [c.lower() for c in dict.fromkeys(currencies)]
+        prices: Prices = {}
+        missing: Set[str] = set()
+        stale: Set[str] = set()
+        for coin_id in id_list:
+            for currency in currency_list:
+                state, price = self.cache.lookup(
+                    ("price", coin_id, currency), endpoint="simple_price"
+                )
+                if state == MISS:
+                    missing.add(coin_id)
+                    continue
+                if state == STALE:
+                    stale.add(coin_id)
+                if price is not None:
+                    prices.setdefault(coin_id, {})[currency] = price
+        if stale - missing:
+            refresh_ids = sorted(stale - missing)
+
+            async def refresh() -> None:
+                await self._fetch_prices(refresh_ids, currency_list)
+
+            self.cache.refresh_in_background(
+                ("prices", tuple(refresh_ids), tuple(currency_list)), refresh
+            )
+        if missing:
+            try:
+                fetched = await self._fetch_prices(
+                    [i for i in id_list if i in missing], currency_list
+                )
+                for coin_id, quotes in fetched.items():
+                    prices.setdefault(coin_id, {}).update(quotes)
+            except Exception as e:
+                logger.error(f"Error fetching prices for {sorted(missing)}: {e}")
+                fail_action(f"Error fetching prices for {sorted(missing)}: {e}")
+        logger.info(f"Fetched prices for {len(prices)}/{len(id_list)} coins")
+        return prices
+
+    async def get_coin_price_async(self, coin_id: str) -> Optional[float]:
+        prices = await self.get_coin_prices_async([coin_id], ["usd"])
+        price = prices.get(coin_id, {}).get("usd")
+        logger.info(f"Price of {coin_id}: {price}")
+        return price
+
+    def get_price_changes(
+        self,
+        coin_id: str,
+        windows: Iterable[float] = (HOUR, DAY),
+        currency: str = "usd",
+    ) -> Dict[float, float]:
+        """
+        {window seconds: percent change} from the recorded price history, for the
+        windows it covers. Never calls CoinGecko.
+        """
+        return self.history.changes(coin_id, windows, currency)
+
+    async def close(self) -> None:
+        await self.engine.close()
+
+    # Blocking wrappers for callers that have not moved to the async API yet
+    def get_trending_coins(self) -> List[str]:
+        return run_sync(self.get_trending_coins_async())
+
     def get_coin_price(self, coin_id: str) -> Optional[float]:
-        url = f"{self.BASE_URL}/simple/price?ids={coin_id}&vs_currencies=usd"
-        headers = {"accept": "application/json"}
-        if Config.COINGECKO_API_KEY:
-            headers["x-cg-demo-api-key"] = Config.COINGECKO_API_KEY
-        try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            data = response.json()
-            price = data.get(coin_id, {}).get("usd")
-            logger.info(f"Price of {coin_id}: {price}")
-            return float(price) if price is not None else None
-        except Exception as e:
-            logger.error(f"Error fetching price for {coin_id}: {e}")
-            return None
+        return run_sync(self.get_coin_price_async(coin_id))
+
+    def get_coin_prices(
+        self, ids: Iterable[str], currencies: Iterable[str] = ("usd",)
+    ) -> Prices:
+        return run_sync(self.get_coin_prices_async(ids, currencies))
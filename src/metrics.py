@@ -1,4 +1,4 @@
-from prometheus_client import Counter
+from prometheus_client import Counter, Gauge, Histogram
 
 posts_counter = Counter("posts_total", "Total posts made")
 likes_counter = Counter("likes_total", "Total likes given")
@@ -7,3 +7,124 @@ retweets_counter = Counter("retweets_total", "Total retweets made")
 engagements_counter = Counter(
     "engagements_total", "Total engagements (likes + replies)"
 )
+
+cache_hits_counter = Counter(
+    "market_cache_hits_total", "Market data cache fresh hits", ["endpoint"]
+)
+cache_misses_counter = Counter(
+    "market_cache_misses_total", "Market data cache misses", ["endpoint"]
+)
+cache_stale_counter = Counter(
+    "market_cache_stale_total",
+    "Market data cache stale values served while revalidating",
+    ["endpoint"],
+)
+
+reputation_lookups_counter = Counter(
+    "author_reputation_lookups_total",
+    "Author reputation lookups by result (bad and good are cache hits)",
+    ["result"],
+)
+
+secret_fetch_latency = Histogram(
+    "secret_fetch_seconds", "Secret Manager fetch latency", ["secret"]
+)
+
+job_duration_histogram = Histogram(
+    "job_duration_seconds",
+    "Scheduled job wall time",
+    ["job"],
+    buckets=(0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800),
+)
+job_overruns_counter = Counter(
+    "job_overruns_total", "Job runs that took longer than their interval", ["job"]
+)
+job_failures_counter = Counter(
+    "job_failures_total", "Job runs that raised an exception", ["job"]
+)
+job_skipped_counter = Counter(
+    "job_skipped_total",
+    "Job runs skipped because the previous run was still going or was missed",
+    ["job"],
+)
+
+# Label values are fixed sets: service ("x", "coingecko"), endpoint (rate limiter
+# endpoint names or API paths), outcome ("ok", "error", "429", "timeout")
+external_call_latency = Histogram(
+    "external_call_seconds",
+    "Latency of calls to external APIs",
+    ["service", "endpoint", "outcome"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+external_calls_in_flight = Gauge(
+    "external_calls_in_flight", "External API calls in progress", ["service"]
+)
+bot_action_latency = Histogram(
+    "bot_action_seconds",
+    "Duration of bot actions, however they were triggered",
+    ["action", "outcome"],
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+)
+bot_actions_in_flight = Gauge(
+    "bot_actions_in_flight", "Bot actions in progress", ["action"]
+)
+rate_limit_wait_histogram = Histogram(
+    "rate_limit_wait_seconds",
+    "Time spent waiting for a rate limiter token",
+    ["endpoint"],
+    buckets=(0.01, 0.1, 0.5, 1, 5, 10, 30, 60),
+)
+rate_limit_rejections_counter = Counter(
+    "rate_limit_rejections_total",
+    "Requests refused by a rate limiter (empty bucket or wait timed out)",
+    ["endpoint"],
+)
+
+# Resilience layer, labelled by upstream ("x", "coingecko")
+circuit_breaker_state = Gauge(
+    "circuit_breaker_state",
+    "Circuit breaker state: 0 closed, 1 half-open, 2 open",
+    ["upstream"],
+)
+circuit_breaker_transitions_counter = Counter(
+    "circuit_breaker_transitions_total",
+    "Circuit breaker state changes, by the state entered",
+    ["upstream", "state"],
+)
+circuit_breaker_rejections_counter = Counter(
+    "circuit_breaker_rejections_total",
+    "Calls failed fast because the upstream's circuit was open",
+    ["upstream"],
+)
+retries_counter = Counter(
+    "upstream_retries_total",
+    "Retries of transient upstream failures",
+    ["upstream"],
+)
+
+coalesced_calls_counter = Counter(
+    "coalesced_calls_total",
+    "Calls that shared an identical in-flight request instead of sending their own",
+    ["call"],
+)
+
+price_source_latency = Gauge(
+    "price_source_latency_seconds",
+    "Moving average latency of each price source",
+    ["source"],
+)
+price_source_errors = Gauge(
+    "price_source_error_ratio",
+    "Moving average share of failed requests to each price source",
+    ["source"],
+)
+price_source_requests_counter = Counter(
+    "price_source_requests_total",
+    "Price source requests by outcome (ok, error, or cancelled after losing a hedge)",
+    ["source", "outcome"],
+)
+hedged_requests_counter = Counter(
+    "price_hedged_requests_total",
+    "Backup price requests started because the preferred source was slow",
+    ["source"],
+)
@@ -0,0 +1,200 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+import numpy as np
+from .config import config as Config
+from .logger import get_logger
+
+logger = get_logger()
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+
+class PriceSeries:
+    """
+    Fixed-size ring buffer of (epoch seconds, price) samples for one coin.
+    Appends are O(1) and overwrite the oldest sample once full; window queries
+    are vectorised over the samples in the window.
+    """
+
+    def __init__(self, capacity: int, min_interval: float = 0) -> None:
+        self.capacity = capacity
+        self.min_interval = min_interval
+        self._times = np.zeros(capacity, dtype=np.float64)
+        self._prices = np.zeros(capacity, dtype=np.float64)
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def nbytes(self) -> int:
+        return self._times.nbytes + self._prices.nbytes
+
+    def append(self, at: float, price: float) -> None:
+        """
+        Add a sample. Samples older than the newest are ignored and one within
+        `min_interval` of it replaces it, so bursts of fetches take one slot.
+        """
+        if self._count:
+            last = (self._next - 1) % self.capacity
+            if at < self._times[last]:
+                return
+            if at - self._times[last] < self.min_interval:
+                self._prices[last] = price
+                return
+        self._times[self._next] = at
+        self._prices[self._next] = price
+        self._next = (self._next + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def samples(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(times, prices) copies, oldest first."""
+        if self._count < self.capacity:
+            return self._times[: self._count].copy(), self._prices[: self._count].copy()
+        order = np.roll(np.arange(self.capacity), -self._next)
+        return self._times[order], self._prices[order]
+
+    def window(
+        self, seconds: float, now: Optional[float] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Samples of the last `seconds`, oldest first."""
+        times, prices = self.samples()
+        start = np.searchsorted(times, (now or time.time()) - seconds, side="left")
+        return times[start:], prices[start:]
+
+    def change(self, seconds: float, now: Optional[float] = None) -> Optional[float]:
+        """
+        Percent change over the last `seconds`, measured from the newest sample
+        at least that old; None until the series reaches that far back, or when
+        a gap leaves no sample within another `seconds` before that.
+        """
+        times, prices = self.samples()
+        if not len(times):
+            return None
+        cutoff = (now or time.time()) - seconds
+        before = np.searchsorted(times, cutoff, side="right") - 1
+        if before < 0 or times[before] < cutoff - seconds or not prices[before]:
+            return None
+        return float((prices[-1] / prices[before] - 1) * 100)
+
+    def low(self, seconds: float, now: Optional[float] = None) -> Optional[float]:
+        prices = self.window(seconds, now)[1]
+        return float(prices.min()) if len(prices) else None
+
+    def high(self, seconds: float, now: Optional[float] = None) -> Optional[float]:
+        prices = self.window(seconds, now)[1]
+        return float(prices.max()) if len(prices) else None
+
+    def moving_average(
+        self, seconds: float, now: Optional[float] = None
+    ) -> Optional[float]:
+        """Mean price over the last `seconds`."""
+        prices = self.window(seconds, now)[1]
+        return float(prices.mean()) if len(prices) else None
+
+
+class PriceHistory:
+    """
+    Per-coin PriceSeries filled from price fetches, so trends need no extra API
+    calls. Memory is bounded: `points` samples per series and at most
+    `max_coins` series, the least recently updated being dropped first.
+    """
+
+    def __init__(
+        self,
+        points: Optional[int] = None,
+        max_coins: Optional[int] = None,
+        min_interval: Optional[float] = None,
+    ) -> None:
+        self.points = points or Config.PRICE_HISTORY_POINTS
+        self.max_coins = max_coins or Config.PRICE_HISTORY_MAX_COINS
+        self.min_interval = (
+            min_interval
+            if min_interval is not None
+            else Config.PRICE_HISTORY_MIN_INTERVAL
+        )
+        # (coin id, currency) -> series
+        self._series: "OrderedDict[Tuple[str, str], PriceSeries]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(series.nbytes for series in self._series.values())
+
+    def _get(self, key: Tuple[str, str]) -> PriceSeries:
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = PriceSeries(self.points, self.min_interval)
+            while len(self._series) > self.max_coins:
+                self._series.popitem(last=False)
+        self._series.move_to_end(key)
+        return series
+
+    def record(
+        self, prices: Mapping[str, Mapping[str, float]], at: Optional[float] = None
+    ) -> None:
+        """Add one sample per coin and currency from {coin_id: {currency: price}}."""
+        at = at or time.time()
+        with self._lock:
+            for coin_id, quotes in prices.items():
+                for currency, price in quotes.items():
+                    if price is not None:
+                        self._get((coin_id, currency)).append(at, price)
+
+    def series(self, coin_id: str, currency: str = "usd") -> Optional[PriceSeries]:
+        return self._series.get((coin_id, currency))
+
+    def change(
+        self, coin_id: str, seconds: float, currency: str = "usd"
+    ) -> Optional[float]:
+        """Percent change of `coin_id` over the last `seconds`, if known."""
+        series = self.series(coin_id, currency)
+        if series is None:
+            return None
+        with self._lock:
+            return series.change(seconds)
+
+    def changes(
+        self,
+        coin_id: str,
+        windows: Iterable[float] = (HOUR, DAY),
+        currency: str = "usd",
+    ) -> Dict[float, float]:
+        """{window seconds: percent change} for the windows with enough history."""
+        result = {}
+        for seconds in windows:
+            change = self.change(coin_id, seconds, currency)
+            if change is not None:
+                result[seconds] = change
+        return result
+
+    def save(self, path: str) -> None:
+        """Snapshot every series to an .npz file (one samples array per series)."""
+        with self._lock:
+            arrays: Dict[str, Any] = {
+                f"{coin_id}|{currency}": np.stack(series.samples())
+                for (coin_id, currency), series in self._series.items()
+            }
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp, path)
+
+    def load(self, path: str) -> int:
+        """Add the samples of a snapshot written by `save`; returns series loaded."""
+        with np.load(path) as data, self._lock:
+            for name in data.files:
+                coin_id, currency = name.rsplit("|", 1)
+                series = self._get((coin_id, currency))
+                for at, price in data[name].T:
+                    series.append(float(at), float(price))
+            return len(data.files)
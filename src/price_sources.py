@@ -0,0 +1,400 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+from .config import config as Config
+from .http_session import get_session
+from .instrumentation import instrumented
+from .logger import get_logger
+from .metrics import (
+    hedged_requests_counter,
+    price_source_errors,
+    price_source_latency,
+    price_source_requests_counter,
+)
+from .resilience import HALF_OPEN, CircuitBreaker, CircuitOpenError, circuit_breakers
+
+if TYPE_CHECKING:
+    from .market_data import MarketData
+
+logger = get_logger()
+
+Prices = Dict[str, Dict[str, float]]
+
+COINGECKO = "coingecko"
+
+# Weight of the newest observation in the moving latency/error/coverage figures
+EWMA_ALPHA = 0.2
+# A source is hedged once it has taken this many times its usual latency
+HEDGE_LATENCY_FACTOR = 2.0
+# Seconds added to a source's score for an error rate of 1
+ERROR_PENALTY_SECONDS = 5.0
+
+
+class PriceSource(ABC):
+    """A provider of {coin_id: {currency: price}} quotes."""
+
+    name = "source"
+    currencies: Optional[Set[str]] = None  # None: any currency
+
+    def supports(self, currencies: Sequence[str]) -> bool:
+        return self.currencies is None or set(currencies) <= self.currencies
+
+    def healthy(self) -> bool:
+        return True
+
+    def coverable(self, ids: Sequence[str]) -> List[str]:
+        """The ids this source can attempt to price."""
+        return list(ids)
+
+    @abstractmethod
+    async def fetch(self, ids: Sequence[str], currencies: Sequence[str]) -> Prices:
+        """Quotes for the coins this source could price."""
+
+    async def close(self) -> None:
+        pass
+
+
+class CoinGeckoSource(PriceSource):
+    """/simple/price through MarketData's limiter, retries and request coalescing."""
+
+    name = COINGECKO
+
+    def __init__(self, market: "MarketData") -> None:
+        self.market = market
+
+    def healthy(self) -> bool:
+        return self.market.resilience.breaker.available()
+
+    async def fetch(self, ids: Sequence[str], currencies: Sequence[str]) -> Prices:
+        from .market_data import chunk_ids
+
+        chunks = chunk_ids(
+            ids, self.market.SIMPLE_PRICE_MAX_IDS, self.market.SIMPLE_PRICE_MAX_CHARS
+        )
+        responses = await asyncio.gather(
+            *(
+                self.market._get_json(
+                    "/simple/price",
+                    params={
+                        "ids": ",".join(chunk),
+                        "vs_currencies": ",".join(currencies),
+                    },
+                )
+                for chunk in chunks
+            )
+        )
+        prices: Prices = {}
+        for data in responses:
+            for coin_id, quotes in data.items():
+                prices[coin_id] = {
+                    currency: float(value)
+                    for currency, value in quotes.items()
+                    if currency in currencies and value is not None
+                }
+        return prices
+
+
+class CcxtSource(PriceSource):
+    """
+    Last trade prices from one exchange's public tickers via ccxt's async API,
+    priced against a USD stablecoin. Coins are matched by the ticker symbol
+    CoinGecko reported for them; coins without a known symbol or market on the
+    exchange are left out of the result.
+    """
+
+    currencies = {"usd"}
+
+    def __init__(
+        self,
+        exchange_id: str,
+        symbol_for: Callable[[str], Optional[str]],
+        quote: Optional[str] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ) -> None:
+        self.exchange_id = exchange_id
+        self.name = f"ccxt_{exchange_id}"
+        self.symbol_for = symbol_for
+        self.quote = (quote or Config.PRICE_CCXT_QUOTE).upper()
+        self.breaker = breaker or circuit_breakers.get(self.name)
+        self._exchange: Any = None
+
+    def healthy(self) -> bool:
+        return self.breaker.available()
+
+    async def _get_exchange(self) -> Any:
+        """The ccxt exchange for the running loop, on the shared HTTP session."""
+        loop = asyncio.get_running_loop()
+        session = await get_session()
+        if self._exchange is not None and self._exchange.asyncio_loop is not loop:
+            # Bound to a finished loop (e.g. a previous test); start over
+            self._exchange = None
+        if self._exchange is None:
+            import ccxt.async_support as ccxt_async
+
+            self._exchange = getattr(ccxt_async, self.exchange_id)(
+                {
+                    "enableRateLimit": True,
+                    "timeout": int(Config.HTTP_TIMEOUT_SECONDS * 1000),
+                    "session": session,
+                    "asyncio_loop": loop,
+                }
+            )
+        self._exchange.session = session
+        return self._exchange
+
+    def coverable(self, ids: Sequence[str]) -> List[str]:
+        return [coin_id for coin_id in ids if self.symbol_for(coin_id)]
+
+    def _symbols(self, ids: Sequence[str]) -> Dict[str, str]:
+        """{market symbol: coin_id} for the coins with a known ticker symbol."""
+        symbols = {}
+        for coin_id in ids:
+            symbol = self.symbol_for(coin_id)
+            if symbol:
+                symbols[f"{symbol.upper()}/{self.quote}"] = coin_id
+        return symbols
+
+    async def fetch(self, ids: Sequence[str], currencies: Sequence[str]) -> Prices:
+        wanted = self._symbols(ids)
+        if not wanted:
+            return {}
+        if not self.breaker.acquire():
+            raise CircuitOpenError(self.name, self.breaker.retry_in())
+        probe = self.breaker.state == HALF_OPEN
+        try:
+            tickers = await self._fetch_tickers(wanted)
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            # Cancelled, e.g. as a hedge loser: no verdict, but free the probe
+            if probe:
+                self.breaker.release()
+            raise
+        self.breaker.record_success()
+        prices: Prices = {}
+        for symbol, ticker in tickers.items():
+            price = ticker.get("last") or ticker.get("close")
+            if symbol in wanted and price:
+                prices[wanted[symbol]] = {"usd": float(price)}
+        return prices
+
+    @instrumented("ccxt", lambda self, wanted: self.exchange_id)
+    async def _fetch_tickers(self, wanted: Dict[str, str]) -> Dict[str, Any]:
+        exchange = await self._get_exchange()
+        markets = await exchange.load_markets()
+        symbols = [symbol for symbol in wanted if symbol in markets]
+        if not symbols:
+            return {}
+        if exchange.has.get("fetchTickers"):
+            bulk: Dict[str, Any] = await exchange.fetch_tickers(symbols)
+            return bulk
+        tickers = await asyncio.gather(*(exchange.fetch_ticker(s) for s in symbols))
+        return dict(zip(symbols, tickers))
+
+    async def close(self) -> None:
+        exchange, self._exchange = self._exchange, None
+        if exchange is not None:
+            # The shared session is not the exchange's to close
+            await exchange.close()
+
+
+class SourceStats:
+    """Moving latency, error and coverage figures used to rank one source."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.coverage = 1.0
+
+    def _update(self, attr: str, value: float) -> None:
+        current = getattr(self, attr)
+        if current is None:
+            setattr(self, attr, value)
+        else:
+            setattr(self, attr, current + EWMA_ALPHA * (value - current))
+
+    def record_success(self, latency: float, coverage: float) -> None:
+        self._update("latency", latency)
+        self._update("error_rate", 0.0)
+        self._update("coverage", coverage)
+        price_source_latency.labels(source=self.name).set(self.latency or 0.0)
+        price_source_errors.labels(source=self.name).set(self.error_rate)
+        price_source_requests_counter.labels(source=self.name, outcome="ok").inc()
+
+    def record_failure(self) -> None:
+        self._update("error_rate", 1.0)
+        price_source_errors.labels(source=self.name).set(self.error_rate)
+        price_source_requests_counter.labels(source=self.name, outcome="error").inc()
+
+    @property
+    def score(self) -> float:
+        """Expected cost of asking this source in seconds; 0 if never asked."""
+        latency = (self.latency or 0.0) / max(self.coverage, 0.1)
+        return latency + self.error_rate * ERROR_PENALTY_SECONDS
+
+
+class PriceEngine:
+    """
+    Prices coins from the best of several sources. Healthy sources are ranked
+    by moving latency, error rate and coverage; the best one is asked first and,
+    if it is slower than usual, the next one is asked too (a hedged request) and
+    the first good answer wins. Coins a source could not price are asked of
+    the remaining sources.
+    """
+
+    def __init__(
+        self, sources: Sequence[PriceSource], hedge_after: Optional[float] = None
+    ) -> None:
+        self.sources = list(sources)
+        self.hedge_after = (
+            hedge_after if hedge_after is not None else Config.PRICE_HEDGE_SECONDS
+        )
+        self.stats = {source.name: SourceStats(source.name) for source in sources}
+
+    def ranked(self, currencies: Sequence[str]) -> List[PriceSource]:
+        """
+        Sources able to quote `currencies`, best first: measured ones by score,
+        then unmeasured ones in configured order, then unhealthy ones.
+        """
+        candidates = [s for s in self.sources if s.supports(currencies)]
+        order = {source.name: i for i, source in enumerate(self.sources)}
+
+        def rank(source: PriceSource) -> Tuple[bool, bool, float, int]:
+            stats = self.stats[source.name]
+            return (
+                not source.healthy(),
+                stats.latency is None,
+                stats.score,
+                order[source.name],
+            )
+
+        return sorted(candidates, key=rank)
+
+    def _hedge_delay(self, source: PriceSource) -> Optional[float]:
+        if self.hedge_after <= 0:
+            return None
+        latency = self.stats[source.name].latency or 0.0
+        return max(self.hedge_after, HEDGE_LATENCY_FACTOR * latency)
+
+    async def _ask(
+        self, source: PriceSource, ids: Sequence[str], currencies: Sequence[str]
+    ) -> Prices:
+        start = time.monotonic()
+        try:
+            prices = await source.fetch(ids, currencies)
+        except asyncio.CancelledError:
+            price_source_requests_counter.labels(
+                source=source.name, outcome="cancelled"
+            ).inc()
+            raise
+        except Exception:
+            self.stats[source.name].record_failure()
+            raise
+        attempted = source.coverable(ids)
+        covered = sum(1 for coin_id in attempted if coin_id in prices)
+        self.stats[source.name].record_success(
+            time.monotonic() - start, covered / len(attempted) if attempted else 1.0
+        )
+        return prices
+
+    async def _hedged(
+        self, sources: List[PriceSource], ids: Sequence[str], currencies: Sequence[str]
+    ) -> Tuple[Prices, Set[str]]:
+        """
+        First successful answer from `sources`, starting the next one when the
+        current best is slow or fails. Returns it with the sources asked.
+        """
+        pending: Dict["asyncio.Task[Prices]", PriceSource] = {}
+        asked: Set[str] = set()
+        queue = list(sources)
+        last_error: Optional[BaseException] = None
+
+        def start_next(hedge: bool) -> None:
+            source = queue.pop(0)
+            asked.add(source.name)
+            if hedge:
+                hedged_requests_counter.labels(source=source.name).inc()
+            task = asyncio.ensure_future(self._ask(source, ids, currencies))
+            pending[task] = source
+
+        start_next(hedge=False)
+        try:
+            while pending:
+                leader = next(iter(pending.values()))
+                timeout = self._hedge_delay(leader) if queue else None
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    logger.info(f"Price source {leader.name} is slow, hedging")
+                    start_next(hedge=True)
+                    continue
+                for task in done:
+                    source = pending.pop(task)
+                    if task.exception() is None:
+                        return task.result(), asked
+                    last_error = task.exception()
+                    logger.warning(f"Price source {source.name} failed: {last_error}")
+                if not pending and queue:
+                    start_next(hedge=False)
+        finally:
+            for task in pending:
+                task.cancel()
+        raise last_error or RuntimeError("No price source available")
+
+    async def fetch(self, ids: Sequence[str], currencies: Sequence[str]) -> Prices:
+        """Prices for `ids`; coins no source could price are left out."""
+        prices: Prices = {}
+        missing = list(ids)
+        asked: Set[str] = set()
+        error: Optional[BaseException] = None
+        while missing:
+            sources = [
+                s
+                for s in self.ranked(currencies)
+                if s.name not in asked and s.coverable(missing)
+            ]
+            if not sources:
+                break
+            try:
+                found, used = await self._hedged(sources, missing, currencies)
+            except Exception as e:
+                error = e
+                break
+            asked |= used
+            prices.update(found)
+            missing = [coin_id for coin_id in missing if coin_id not in found]
+        if error is not None and not prices:
+            raise error
+        return prices
+
+    async def close(self) -> None:
+        for source in self.sources:
+            try:
+                await source.close()
+            except Exception as e:
+                logger.warning(f"Error closing price source {source.name}: {e}")
+
+
+def build_sources(market: "MarketData", names: Sequence[str]) -> List[PriceSource]:
+    """Sources named in PRICE_SOURCES: `coingecko` or a ccxt exchange id."""
+    sources: List[PriceSource] = []
+    for name in names:
+        if name == COINGECKO:
+            sources.append(CoinGeckoSource(market))
+        else:
+            sources.append(CcxtSource(name, market.symbol_for))
+    return sources
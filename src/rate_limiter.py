@@ -1,25 +1,250 @@
+import asyncio
+import threading
 import time
-from collections import deque
-from typing import Deque
+from typing import Dict, Optional, Tuple
 from .config import config as Config
 from .logger import get_logger
+from .metrics import rate_limit_rejections_counter, rate_limit_wait_histogram
 
 logger = get_logger()
 
+# Endpoint budgets as (requests, window seconds); see the X API v2 rate limit table
+# and the CoinGecko demo plan. Override with RATE_LIMITS="like=50/900,search=180/900".
+CREATE_TWEET = "create_tweet"
+LIKE = "like"
+RETWEET = "retweet"
+SEARCH = "search"
+COINGECKO = "coingecko"
+BOT = "bot"
+
+DEFAULT_LIMITS: Dict[str, Tuple[int, float]] = {
+    CREATE_TWEET: (200, 900),
+    LIKE: (50, 900),
+    RETWEET: (50, 900),
+    SEARCH: (180, 900),
+    COINGECKO: (30, 60),
+}
+
+
+def parse_limits(spec: str) -> Dict[str, Tuple[int, float]]:
+    """Parse "name=requests/seconds,..." into a limits mapping."""
+    limits: Dict[str, Tuple[int, float]] = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        try:
+            name, budget = item.split("=", 1)
+            requests, seconds = budget.split("/", 1)
+            limits[name.strip()] = (int(requests), float(seconds))
+        except ValueError:
+            logger.warning(f"Ignoring malformed rate limit entry: {item!r}")
+    return limits
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket holding up to `capacity` tokens, refilled evenly over
+    `period` seconds. Every operation is O(1).
+    """
+
+    def __init__(self, name: str, capacity: int, period: float) -> None:
+        self.name = name
+        self.capacity = float(capacity)
+        self.rate = capacity / period
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def _take(self, tokens: float) -> float:
+        """Take `tokens` if available and return 0, else return seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            self._refill(now)
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def update_from_server(self, remaining: int, reset_at: float) -> None:
+        """
+        Correct the local estimate with the server's view of this window.
+        `reset_at` is the epoch second the window resets; with nothing remaining
+        the bucket pauses until then instead of letting calls fail with 429.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens = min(self.capacity, float(max(remaining, 0)))
+            if remaining <= 0:
+                self._blocked_until = now + max(reset_at - time.time(), 0.0)
+            else:
+                self._blocked_until = 0.0
+
+    def snapshot(self) -> Tuple[float, float, float]:
+        """(tokens, saved at, blocked until or 0), times in epoch seconds."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            wall = time.time()
+            blocked = self._blocked_until - now
+            return self._tokens, wall, wall + blocked if blocked > 0 else 0.0
+
+    def restore(self, tokens: float, saved_at: float, blocked_until: float) -> None:
+        """Resume from a snapshot, refilling for the time since it was taken."""
+        with self._lock:
+            now = time.monotonic()
+            wall = time.time()
+            elapsed = max(wall - saved_at, 0.0)
+            self._tokens = min(self.capacity, max(tokens, 0.0) + elapsed * self.rate)
+            self._updated = now
+            blocked = blocked_until - wall
+            self._blocked_until = now + blocked if blocked > 0 else 0.0
+
+    @property
+    def available(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                return 0.0
+            self._refill(now)
+            return self._tokens
+
+    def _record(self, allowed: bool, waited: float = 0.0) -> bool:
+        if waited:
+            rate_limit_wait_histogram.labels(endpoint=self.name).observe(waited)
+        if not allowed:
+            rate_limit_rejections_counter.labels(endpoint=self.name).inc()
+        return allowed
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        return self._record(self._take(tokens) == 0.0)
+
+    async def acquire(self, tokens: float = 1, timeout: Optional[float] = None) -> bool:
+        """Wait until `tokens` are available; False if `timeout` elapses first."""
+        if tokens > self.capacity:
+            return self._record(False)
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        while True:
+            wait = self._take(tokens)
+            if wait == 0.0:
+                return self._record(True, time.monotonic() - start)
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining < wait:
+                    return self._record(False, time.monotonic() - start)
+            await asyncio.sleep(wait)
+
+    def acquire_blocking(
+        self, tokens: float = 1, timeout: Optional[float] = None
+    ) -> bool:
+        """Thread-blocking counterpart of acquire() for worker threads."""
+        if tokens > self.capacity:
+            return self._record(False)
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        while True:
+            wait = self._take(tokens)
+            if wait == 0.0:
+                return self._record(True, time.monotonic() - start)
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining < wait:
+                    return self._record(False, time.monotonic() - start)
+            time.sleep(wait)
+
+
+class RateLimiterRegistry:
+    """Process-wide set of named token buckets, one per upstream endpoint."""
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[int, float]]] = None) -> None:
+        self.limits = dict(DEFAULT_LIMITS if limits is None else limits)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls) -> "RateLimiterRegistry":
+        limits = dict(DEFAULT_LIMITS)
+        limits[BOT] = (Config.RATE_LIMIT_PER_MINUTE, 60)
+        limits.update(parse_limits(Config.RATE_LIMITS))
+        return cls(limits)
+
+    def configure(self, name: str, requests: int, period: float) -> TokenBucket:
+        with self._lock:
+            self.limits[name] = (requests, period)
+            bucket = self._buckets[name] = TokenBucket(name, requests, period)
+            return bucket
+
+    def get(self, name: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(name)
+            if bucket is None:
+                requests, period = self.limits.get(
+                    name, (Config.RATE_LIMIT_PER_MINUTE, 60)
+                )
+                bucket = self._buckets[name] = TokenBucket(name, requests, period)
+            return bucket
+
+    def snapshot(self) -> Dict[str, Tuple[float, float, float]]:
+        with self._lock:
+            buckets = list(self._buckets.values())
+        return {bucket.name: bucket.snapshot() for bucket in buckets}
+
+    def restore(self, states: Dict[str, Tuple[float, float, float]]) -> None:
+        """Resume buckets from snapshot() output, e.g. after a restart."""
+        for name, state in states.items():
+            self.get(name).restore(*state)
+
+    def try_acquire(self, name: str, tokens: float = 1) -> bool:
+        return self.get(name).try_acquire(tokens)
+
+    async def acquire(
+        self, name: str, tokens: float = 1, timeout: Optional[float] = None
+    ) -> bool:
+        return await self.get(name).acquire(tokens, timeout)
+
+    def acquire_blocking(
+        self, name: str, tokens: float = 1, timeout: Optional[float] = None
+    ) -> bool:
+        return self.get(name).acquire_blocking(tokens, timeout)
+
+
+rate_limits = RateLimiterRegistry.from_config()
+
 
 class RateLimiter:
-    def __init__(self) -> None:
-        self.requests: Deque[float] = deque()
+    """Named view onto a shared bucket; the default is the bot-wide action budget."""
+
+    def __init__(
+        self, name: str = BOT, registry: Optional[RateLimiterRegistry] = None
+    ) -> None:
+        self.name = name
+        self.registry = registry or rate_limits
         self.limit = Config.RATE_LIMIT_PER_MINUTE
 
-    def can_request(self) -> bool:
-        now = time.time()
-        # Remove old requests
-        while self.requests and now - self.requests[0] > 60:
-            self.requests.popleft()
-        if len(self.requests) < self.limit:
-            self.requests.append(now)
-            return True
+    @property
+    def bucket(self) -> TokenBucket:
+        return self.registry.get(self.name)
+
+    def can_request(self, timeout: float = 0) -> bool:
+        """Take a token, waiting up to `timeout` seconds for one to free up."""
+        if timeout > 0:
+            allowed = self.bucket.acquire_blocking(timeout=timeout)
         else:
+            allowed = self.bucket.try_acquire()
+        if not allowed:
+            logger.warning("Rate limit exceeded")
+        return allowed
+
+    async def acquire(self, timeout: Optional[float] = None) -> bool:
+        allowed = await self.bucket.acquire(timeout=timeout)
+        if not allowed:
             logger.warning("Rate limit exceeded")
-            return False
+        return allowed
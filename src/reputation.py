@@ -0,0 +1,101 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional, Tuple
+from .cache import TTLCache
+from .config import config as Config
+from .logger import get_logger
+from .metrics import reputation_lookups_counter
+
+logger = get_logger()
+
+BAD, GOOD, UNKNOWN = "bad", "good", "unknown"
+
+
+class AuthorReputation:
+    """
+    Spam verdict history per author id in a TTL/LRU cache, optionally written
+    through to SQLite so it survives restarts. An author with any spam verdict
+    is known bad; one with `good_after` clean verdicts and no spam is known good.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        good_after: Optional[int] = None,
+    ) -> None:
+        self.ttl = ttl if ttl is not None else Config.REPUTATION_TTL
+        self.good_after = good_after or Config.REPUTATION_GOOD_AFTER
+        # author_id -> (spam verdicts, clean verdicts)
+        self._cache: TTLCache[Tuple[int, int]] = TTLCache(
+            "author_reputation", max_entries or Config.REPUTATION_MAX_ENTRIES
+        )
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            self._open(path)
+
+    def _open(self, path: str) -> None:
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS author_reputation (author_id TEXT PRIMARY KEY,"
+            " spam INTEGER NOT NULL, clean INTEGER NOT NULL, updated_at REAL NOT NULL)"
+        )
+        now = time.time()
+        with self._db:
+            self._db.execute(
+                "DELETE FROM author_reputation WHERE updated_at < ?", (now - self.ttl,)
+            )
+        rows = self._db.execute(
+            "SELECT author_id, spam, clean, updated_at FROM author_reputation "
+            "ORDER BY updated_at"
+        ).fetchall()
+        for author_id, spam, clean, updated_at in rows:
+            self._cache.set(author_id, (spam, clean), self.ttl - (now - updated_at))
+        logger.info(f"Loaded {len(rows)} author reputations from {path}")
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def lookup(self, author_id: Any) -> str:
+        """BAD, GOOD or UNKNOWN for `author_id`, counted as a metric."""
+        if author_id is None:
+            return UNKNOWN
+        with self._lock:
+            entry = self._cache.get(str(author_id))
+        result = UNKNOWN
+        if entry is not None:
+            spam, clean = entry
+            if spam:
+                result = BAD
+            elif clean >= self.good_after:
+                result = GOOD
+        reputation_lookups_counter.labels(result=result).inc()
+        return result
+
+    def record(self, author_id: Any, is_spam: bool) -> None:
+        if author_id is None:
+            return
+        key = str(author_id)
+        with self._lock:
+            spam, clean = self._cache.get(key) or (0, 0)
+            entry = (spam + 1, clean) if is_spam else (spam, clean + 1)
+            self._cache.set(key, entry, self.ttl)
+            if self._db is not None:
+                with self._db:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO author_reputation VALUES (?, ?, ?, ?)",
+                        (key, entry[0], entry[1], time.time()),
+                    )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
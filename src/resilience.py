@@ -0,0 +1,319 @@
+import asyncio
+import random
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+import aiohttp
+import requests
+from urllib3.exceptions import NewConnectionError
+from .config import config as Config
+from .instrumentation import is_timeout, status_of
+from .logger import get_logger
+from .metrics import (
+    circuit_breaker_rejections_counter,
+    circuit_breaker_state,
+    circuit_breaker_transitions_counter,
+    retries_counter,
+)
+
+logger = get_logger()
+
+T = TypeVar("T")
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# Deadline (time.monotonic()) of the call running in this context, if any
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+    def __init__(self, upstream: str, retry_in: float) -> None:
+        super().__init__(f"Circuit for {upstream} is open; retry in {retry_in:.0f}s")
+        self.upstream = upstream
+        self.retry_in = retry_in
+
+
+def remaining_time(default: float) -> float:
+    """Time left before the current call's deadline, capped at `default`."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return default
+    return max(0.0, min(default, deadline - time.monotonic()))
+
+
+def never_sent(error: BaseException) -> bool:
+    """Whether the call failed while connecting, so the upstream never saw it."""
+    if isinstance(error, (ConnectionRefusedError, aiohttp.ClientConnectorError)):
+        return True
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(error, requests.ConnectionError) and isinstance(
+        reason, NewConnectionError
+    )
+
+
+def is_retryable(error: BaseException, idempotent: bool = True) -> bool:
+    """
+    Transient failures only: 5xx, timeouts and connection errors. 4xx answers
+    (duplicates, auth, 429s the limiter already handles) would fail again.
+    A non-idempotent call may already have taken effect after a timeout or
+    5xx, so it is only retried when the request was never sent.
+    """
+    if not idempotent:
+        return never_sent(error)
+    status = status_of(error)
+    if status is not None:
+        return status >= 500
+    return is_timeout(error) or isinstance(
+        error,
+        (ConnectionError, aiohttp.ClientConnectionError, requests.ConnectionError),
+    )
+
+
+class CircuitBreaker:
+    """
+    Per-upstream breaker. After `failure_threshold` consecutive transient
+    failures it opens and calls fail fast; after `reset_timeout` seconds one
+    probe is let through (half-open), which closes it on success or reopens it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        circuit_breaker_state.labels(upstream=name).set(STATE_VALUES[CLOSED])
+
+    def _transition(self, state: str) -> None:
+        self.state = state
+        if state == OPEN:
+            self.opened_at = self.clock()
+        circuit_breaker_state.labels(upstream=self.name).set(STATE_VALUES[state])
+        circuit_breaker_transitions_counter.labels(
+            upstream=self.name, state=state
+        ).inc()
+        logger.warning(
+            f"Circuit for {self.name} is now {state}",
+            extra={"upstream": self.name, "circuit": state},
+        )
+
+    def retry_in(self) -> float:
+        return max(0.0, self.opened_at + self.reset_timeout - self.clock())
+
+    def available(self) -> bool:
+        """Whether a call would be let through, without claiming the probe."""
+        if self.state == OPEN:
+            return self.retry_in() <= 0
+        return self.state == CLOSED or not self._probing
+
+    def acquire(self) -> bool:
+        """Claim permission for one call; counts a rejection when refused."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and self.retry_in() <= 0:
+                self._transition(HALF_OPEN)
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+        circuit_breaker_rejections_counter.labels(upstream=self.name).inc()
+        return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            if self.state != CLOSED:
+                self._transition(CLOSED)
+
+    def release(self) -> None:
+        """Give back the probe of a call that ended without a verdict (cancelled)."""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._probing = False
+            if self.state == HALF_OPEN:
+                self._transition(OPEN)
+                return
+            self.failures += 1
+            if self.state == CLOSED and self.failures >= self.failure_threshold:
+                self._transition(OPEN)
+
+
+class Resilience:
+    """
+    Runs calls to one upstream under an overall deadline, retrying transient
+    failures with full-jitter exponential backoff, behind its circuit breaker.
+    """
+
+    def __init__(
+        self,
+        breaker: CircuitBreaker,
+        attempts: Optional[int] = None,
+        base_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
+        deadline: Optional[float] = None,
+        rng: Callable[[], float] = random.random,
+    ) -> None:
+        self.breaker = breaker
+        self.attempts = attempts if attempts is not None else Config.RETRY_ATTEMPTS
+        self.base_delay = (
+            base_delay if base_delay is not None else Config.RETRY_BASE_SECONDS
+        )
+        self.max_delay = (
+            max_delay if max_delay is not None else Config.RETRY_MAX_SECONDS
+        )
+        self.deadline = (
+            deadline if deadline is not None else Config.CALL_DEADLINE_SECONDS
+        )
+        self.rng = rng
+
+    def _permit(self) -> bool:
+        """Claim one attempt; True when it is the half-open probe."""
+        if not self.breaker.acquire():
+            raise CircuitOpenError(self.breaker.name, self.breaker.retry_in())
+        return self.breaker.state == HALF_OPEN
+
+    def _backoff(
+        self, error: Exception, attempt: int, deadline: float, idempotent: bool
+    ) -> float:
+        """Record the failure; the delay before retrying, or -1 to give up."""
+        # Whether the upstream is failing is independent of whether a retry is safe
+        if is_retryable(error):
+            self.breaker.record_failure()
+        else:
+            # The upstream answered; only our request was at fault
+            self.breaker.record_success()
+        retryable = is_retryable(error, idempotent)
+        if not retryable or attempt >= self.attempts or not self.breaker.available():
+            return -1
+        delay: float = self.rng() * min(
+            self.max_delay, self.base_delay * 2 ** (attempt - 1)
+        )
+        if time.monotonic() + delay >= deadline:
+            return -1
+        retries_counter.labels(upstream=self.breaker.name).inc()
+        logger.warning(
+            f"Retrying {self.breaker.name} call in {delay:.2f}s after: {error}",
+            extra={"upstream": self.breaker.name, "attempt": attempt},
+        )
+        return delay
+
+    def call(
+        self,
+        func: Callable[..., T],
+        *args: Any,
+        idempotent: bool = True,
+        **kwargs: Any,
+    ) -> T:
+        """
+        Blocking variant. A running request cannot be interrupted, so HTTP
+        clients should size their timeouts with remaining_time(). Pass
+        idempotent=False for writes that must not be repeated.
+        """
+        deadline = time.monotonic() + self.deadline
+        token = _deadline.set(deadline)
+        try:
+            attempt = 0
+            while True:
+                attempt += 1
+                probe = self._permit()
+                try:
+                    result = func(*args, **kwargs)
+                except Exception as e:
+                    delay = self._backoff(e, attempt, deadline, idempotent)
+                    if delay < 0:
+                        raise
+                    time.sleep(delay)
+                    continue
+                except BaseException:
+                    if probe:
+                        self.breaker.release()
+                    raise
+                self.breaker.record_success()
+                return result
+        finally:
+            _deadline.reset(token)
+
+    async def acall(
+        self,
+        func: Callable[..., Awaitable[T]],
+        *args: Any,
+        idempotent: bool = True,
+        **kwargs: Any,
+    ) -> T:
+        """Async variant; each attempt is cancelled when the deadline passes."""
+        deadline = time.monotonic() + self.deadline
+        token = _deadline.set(deadline)
+        try:
+            attempt = 0
+            while True:
+                attempt += 1
+                probe = self._permit()
+                try:
+                    result = await asyncio.wait_for(
+                        func(*args, **kwargs), deadline - time.monotonic()
+                    )
+                except Exception as e:
+                    delay = self._backoff(e, attempt, deadline, idempotent)
+                    if delay < 0:
+                        raise
+                    await asyncio.sleep(delay)
+                    continue
+                except BaseException:
+                    # Cancelled (e.g. a hedge loser): free the probe for the next call
+                    if probe:
+                        self.breaker.release()
+                    raise
+                self.breaker.record_success()
+                return result
+        finally:
+            _deadline.reset(token)
+
+
+class BreakerRegistry:
+    """Process-wide circuit breakers, one per upstream."""
+
+    def __init__(self) -> None:
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, upstream: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(upstream)
+            if breaker is None:
+                breaker = self._breakers[upstream] = CircuitBreaker(
+                    upstream,
+                    Config.BREAKER_FAILURE_THRESHOLD,
+                    Config.BREAKER_RESET_SECONDS,
+                )
+            return breaker
+
+    def reset(self) -> None:
+        with self._lock:
+            self._breakers.clear()
+
+
+circuit_breakers = BreakerRegistry()
+
+
+def resilience_for(upstream: str) -> Resilience:
+    return Resilience(circuit_breakers.get(upstream))
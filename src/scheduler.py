@@ -1,27 +1,112 @@
+import asyncio
+import inspect
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+from apscheduler.events import EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED, JobEvent
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from .config import config as Config
 from .engagement import EngagementBot
 from .logger import get_logger
+from .metrics import (
+    job_duration_histogram,
+    job_failures_counter,
+    job_overruns_counter,
+    job_skipped_counter,
+)
 
 logger = get_logger()
 
 
 class Scheduler:
-    def __init__(self) -> None:
-        self.scheduler = AsyncIOScheduler()
-        self.bot = EngagementBot()
+    def __init__(
+        self,
+        bot: Optional[EngagementBot] = None,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        self.scheduler = AsyncIOScheduler(
+            job_defaults={
+                "coalesce": True,
+                "max_instances": 1,
+                "misfire_grace_time": Config.JOB_MISFIRE_GRACE_SECONDS,
+            }
+        )
+        self.bot = bot or EngagementBot()
+        # Blocking jobs run here, never on the event loop that serves FastAPI
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or Config.SCHEDULER_MAX_WORKERS,
+            thread_name_prefix="bot-job",
+        )
+        self.scheduler.add_listener(
+            self._on_job_skipped, EVENT_JOB_MAX_INSTANCES | EVENT_JOB_MISSED
+        )
+
+    def jobs(self) -> List[Tuple[str, Callable[[], Any], int]]:
+        """(name, callable, interval minutes) for every scheduled bot job"""
+        return [
+            ("market_update", self.bot.post_market_update, 30),
+            ("engagement", self.bot.engage_with_tweets_async, 15),
+            # More frequent general promotion
+            ("promote_community", self.bot.promote_community, 45),
+            # Specific post promotion
+            ("promote_specific_post", self.bot.promote_specific_post, 25),
+        ]
+
+    def wrap(
+        self, name: str, func: Callable[[], Any], interval: float
+    ) -> Callable[[], Awaitable[None]]:
+        """
+        Turn `func` into a coroutine job that awaits it (if async) or runs it on the
+        bounded executor, and records its duration and any interval overrun.
+        """
+
+        async def run_job() -> None:
+            start = time.perf_counter()
+            try:
+                if inspect.iscoroutinefunction(func):
+                    await func()
+                else:
+                    loop = asyncio.get_running_loop()
+                    await loop.run_in_executor(self.executor, func)
+            except Exception as e:
+                job_failures_counter.labels(job=name).inc()
+                logger.error(
+                    f"Job {name} failed: {e}", extra={"job": name, "success": False}
+                )
+            finally:
+                duration = time.perf_counter() - start
+                job_duration_histogram.labels(job=name).observe(duration)
+                if duration > interval:
+                    job_overruns_counter.labels(job=name).inc()
+                    logger.warning(
+                        f"Job {name} took {duration:.1f}s, longer than its interval",
+                        extra={"job": name, "duration": duration},
+                    )
+
+        run_job.__name__ = name
+        return run_job
+
+    def _on_job_skipped(self, event: JobEvent) -> None:
+        job_skipped_counter.labels(job=event.job_id).inc()
+        logger.warning(
+            f"Job {event.job_id} skipped (still running or missed its window)",
+            extra={"job": event.job_id},
+        )
 
     def start(self) -> None:
-        self.scheduler.add_job(self.bot.post_market_update, "interval", minutes=30)
-        self.scheduler.add_job(self.bot.engage_with_tweets, "interval", minutes=15)
-        self.scheduler.add_job(
-            self.bot.promote_community, "interval", minutes=45
-        )  # More frequent general promotion
-        self.scheduler.add_job(
-            self.bot.promote_specific_post, "interval", minutes=25
-        )  # Specific post promotion
+        for name, func, minutes in self.jobs():
+            self.scheduler.add_job(
+                self.wrap(name, func, minutes * 60),
+                "interval",
+                minutes=minutes,
+                id=name,
+                name=name,
+                jitter=Config.JOB_JITTER_SECONDS,
+            )
         self.scheduler.start()
         logger.info("Scheduler started")
 
     def stop(self) -> None:
-        self.scheduler.shutdown()
+        self.scheduler.shutdown(wait=False)
+        self.executor.shutdown(wait=False, cancel_futures=True)
         logger.info("Scheduler stopped")
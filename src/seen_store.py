@@ -0,0 +1,95 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Iterable, Optional, Set
+from .config import config as Config
+from .logger import get_logger
+
+logger = get_logger()
+
+SINCE_ID_MAX_AGE = 6 * 86400
+
+
+def max_tweet_id(ids: Iterable[Any]) -> Optional[str]:
+    """Highest numeric (snowflake) id in `ids`, ignoring anything non-numeric."""
+    numeric = [int(i) for i in map(str, ids) if i.isdigit()]
+    return str(max(numeric)) if numeric else None
+
+
+class SeenTweetStore:
+    """
+    Tweets the bot has already handled plus the newest tweet id seen per search
+    query, persisted in SQLite. Membership checks hit an in-memory set, so they
+    are O(1); entries older than `retention_days` are pruned on open.
+    """
+
+    def __init__(self, path: Optional[str] = None, retention_days: float = 7) -> None:
+        self.path = path or os.path.join(Config.STATE_DIR, "seen_tweets.db")
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS seen_tweets "
+            "(tweet_id TEXT PRIMARY KEY, seen_at REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS search_cursors "
+            "(query TEXT PRIMARY KEY, since_id TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        cutoff = time.time() - retention_days * 86400
+        with self._db:
+            self._db.execute("DELETE FROM seen_tweets WHERE seen_at < ?", (cutoff,))
+        self._seen: Set[str] = {
+            row[0] for row in self._db.execute("SELECT tweet_id FROM seen_tweets")
+        }
+        logger.info(f"Loaded {len(self._seen)} seen tweet ids from {self.path}")
+
+    def __contains__(self, tweet_id: Any) -> bool:
+        return str(tweet_id) in self._seen
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def mark_seen(self, tweet_ids: Iterable[Any]) -> None:
+        new = [str(i) for i in tweet_ids if str(i) not in self._seen]
+        if not new:
+            return
+        now = time.time()
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO seen_tweets VALUES (?, ?)",
+                [(tweet_id, now) for tweet_id in new],
+            )
+            self._seen.update(new)
+
+    def get_since_id(self, query: str) -> Optional[str]:
+        # Recent search rejects a since_id older than its 7 day window
+        cutoff = time.time() - SINCE_ID_MAX_AGE
+        with self._lock:
+            row = self._db.execute(
+                "SELECT since_id FROM search_cursors "
+                "WHERE query = ? AND updated_at > ?",
+                (query, cutoff),
+            ).fetchone()
+        return row[0] if row else None
+
+    def advance_since_id(self, query: str, tweet_ids: Iterable[Any]) -> None:
+        """Move the query's high-water mark forward to the newest of `tweet_ids`."""
+        newest = max_tweet_id(tweet_ids)
+        if newest is None:
+            return
+        current = self.get_since_id(query)
+        if current is not None and int(current) >= int(newest):
+            return
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO search_cursors VALUES (?, ?, ?)",
+                (query, newest, time.time()),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,105 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Mapping, Tuple, TypeVar
+
+from .metrics import coalesced_calls_counter
+
+T = TypeVar("T")
+
+# Parameters whose comma-separated values are unordered sets; any other value,
+# a search query or page token say, is compared verbatim
+SET_PARAMS = frozenset({"ids", "vs_currencies", "tweet_fields"})
+
+
+def request_key(*parts: Any, params: Mapping[str, Any]) -> Tuple[Hashable, ...]:
+    """
+    Normalized key for a request: parameters are order-insensitive, None values
+    are dropped and the lists in SET_PARAMS compare as sets.
+    """
+    normalized = []
+    for name, value in sorted(params.items()):
+        if value is None:
+            continue
+        if name in SET_PARAMS:
+            if isinstance(value, str):
+                value = value.split(",")
+            if isinstance(value, (list, tuple)):
+                value = ",".join(sorted(set(map(str, value))))
+        normalized.append((name, str(value)))
+    return (*parts, tuple(normalized))
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical blocking calls: the first caller for a key
+    runs the call and every caller that arrives while it is in flight shares
+    its result or error. Later callers start a new call.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._calls: Dict[Hashable, "Future[Any]"] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        with self._lock:
+            running = self._calls.get(key)
+            if running is None:
+                future: "Future[T]" = Future()
+                self._calls[key] = future
+        if running is not None:
+            coalesced_calls_counter.labels(call=self.name).inc()
+            shared: T = running.result()
+            return shared
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class AsyncSingleFlight:
+    """
+    Async counterpart of SingleFlight. The call runs as a task shielded from
+    its callers, so one caller being cancelled does not fail the others.
+    Calls are only shared between callers on the same event loop.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._calls: Dict[Hashable, "asyncio.Task[Any]"] = {}
+
+    async def do(
+        self,
+        key: Hashable,
+        func: Callable[..., Awaitable[T]],
+        *args: Any,
+        **kwargs: Any,
+    ) -> T:
+        loop = asyncio.get_running_loop()
+        task = self._calls.get(key)
+        if task is not None and task.get_loop() is loop:
+            coalesced_calls_counter.labels(call=self.name).inc()
+            return await asyncio.shield(task)
+
+        async def run() -> T:
+            return await func(*args, **kwargs)
+
+        task = loop.create_task(run())
+        self._calls[key] = task
+        task.add_done_callback(lambda done: self._done(key, done))
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the error retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
@@ -1,16 +1,146 @@
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
 from .config import config as Config
 from .logger import get_logger
+from .reputation import BAD, GOOD, AuthorReputation
+from .spam_model import SpamModel
 
 logger = get_logger()
 
 
+def trie_pattern(terms: Iterable[str]) -> str:
+    """
+    Regex alternation for `terms` factored into a character trie, so the engine
+    tries one branch per distinct next character instead of every term in turn.
+    A space in a term matches any run of whitespace.
+    """
+    trie: Dict[str, Any] = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, Any]) -> str:
+        branches = [
+            (r"\s+" if char == " " else re.escape(char)) + build(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Greedy optional: a term that is a prefix of a longer one loses to it
+        return "(?:" + body + ")?" if "" in node else body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """
+    Counts keyword occurrences in one pass with a regex compiled once from the
+    whole keyword set. `keywords` match anywhere (as the original substring
+    check did); `words` and multi-word `phrases` must not touch other word
+    characters. Matching is case-insensitive.
+    """
+
+    def __init__(
+        self,
+        keywords: Iterable[str] = (),
+        words: Iterable[str] = (),
+        phrases: Iterable[str] = (),
+    ) -> None:
+        keywords = {term.lower() for term in keywords if term}
+        bounded = {
+            " ".join(term.lower().split())
+            for term in list(words) + list(phrases)
+            if term.strip()
+        }
+        alternatives = []
+        # Bounded terms go first, so a phrase wins over a keyword it contains
+        if bounded:
+            alternatives.append(r"(?<!\w)(?:" + trie_pattern(bounded) + r")(?!\w)")
+        if keywords:
+            alternatives.append(trie_pattern(keywords))
+        self.terms: Set[str] = keywords | bounded
+        self._pattern: Optional["re.Pattern[str]"] = (
+            re.compile("|".join(alternatives)) if alternatives else None
+        )
+
+    def count(self, text: str) -> int:
+        """Number of non-overlapping keyword occurrences in `text`."""
+        if self._pattern is None:
+            return 0
+        return len(self._pattern.findall(text.lower()))
+
+
 class SpamDetector:
     SPAM_KEYWORDS = ["spam", "scam", "fake", "pump", "dump"]
+    # Whole-word terms and multi-word phrases, matched on word boundaries
+    SPAM_WORDS: List[str] = []
+    SPAM_PHRASES: List[str] = []
+
+    def __init__(
+        self,
+        keywords: Optional[Sequence[str]] = None,
+        words: Optional[Sequence[str]] = None,
+        phrases: Optional[Sequence[str]] = None,
+        threshold: Optional[int] = None,
+        model: Optional[SpamModel] = None,
+        reputation: Optional[AuthorReputation] = None,
+    ) -> None:
+        self.threshold = threshold if threshold is not None else Config.SPAM_THRESHOLD
+        self.matcher = KeywordMatcher(
+            self.SPAM_KEYWORDS if keywords is None else keywords,
+            self.SPAM_WORDS if words is None else words,
+            self.SPAM_PHRASES if phrases is None else phrases,
+        )
+        # Without a weights file the keyword rule is used on its own
+        self.model = model if model is not None else SpamModel.load_default()
+        self.reputation = (
+            reputation
+            if reputation is not None
+            else AuthorReputation(Config.REPUTATION_DB or None)
+        )
+
+    def score(self, text: str) -> int:
+        return self.matcher.count(text)
+
+    def is_spam(self, text: str, author_id: Any = None) -> bool:
+        return self.is_spam_batch([text], [author_id])[0]
+
+    def is_spam_batch(
+        self, texts: Iterable[str], author_ids: Optional[Iterable[Any]] = None
+    ) -> List[bool]:
+        """
+        Spam verdict for each text. Authors with a known reputation are decided
+        without scoring; the rest are scored and their verdicts recorded.
+        """
+        texts = list(texts)
+        authors = list(author_ids) if author_ids is not None else [None] * len(texts)
+        flags: List[Optional[bool]] = []
+        for author_id in authors:
+            known = self.reputation.lookup(author_id)
+            flags.append(True if known == BAD else False if known == GOOD else None)
+        pending = [i for i, flag in enumerate(flags) if flag is None]
+        scored = self._score_texts([texts[i] for i in pending])
+        for i, flag in zip(pending, scored):
+            flags[i] = flag
+            self.reputation.record(authors[i], flag)
+            if flag:
+                logger.warning(f"Detected spam: {texts[i]}")
+        return [bool(flag) for flag in flags]
 
-    def is_spam(self, text: str) -> bool:
-        text_lower = text.lower()
-        spam_count = sum(1 for word in self.SPAM_KEYWORDS if word in text_lower)
-        if spam_count >= Config.SPAM_THRESHOLD:
-            logger.warning(f"Detected spam: {text}")
-            return True
-        return False
+    def _score_texts(self, texts: List[str]) -> List[bool]:
+        """
+        With a model the batch is scored in one vectorized call against
+        SPAM_MODEL_THRESHOLD, otherwise each text's keyword count is compared
+        with the spam threshold.
+        """
+        if not texts:
+            return []
+        if self.model is not None:
+            scores = self.model.score_batch(texts)
+            flags: List[bool] = (scores >= Config.SPAM_MODEL_THRESHOLD).tolist()
+            return flags
+        return [self.score(text) >= self.threshold for text in texts]
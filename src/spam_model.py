@@ -0,0 +1,123 @@
+import os
+import re
+import zlib
+from typing import List, Optional, Sequence
+import numpy as np
+from .config import config as Config
+from .logger import get_logger
+
+logger = get_logger()
+
+N_FEATURES = 2**12
+
+# URLs first so their parts are not also counted as words
+TOKEN_PATTERN = re.compile(
+    r"(?P<url>https?://(?P<host>[^\s/]+)\S*)|(?P<cashtag>\$[a-z][a-z0-9_]*)"
+    r"|(?P<hashtag>#\w+)|(?P<word>\w+)"
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Namespaced tokens: `u:<host>`, `c:$tag`, `h:#tag` and `w:word`, lowercased."""
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(text.lower()):
+        kind = match.lastgroup or "word"
+        if kind == "url":
+            tokens += ["u:", "u:" + match.group("host")]
+        else:
+            tokens.append(kind[0] + ":" + match.group())
+    return tokens
+
+
+def hash_features(texts: Sequence[str], n_features: int = N_FEATURES) -> np.ndarray:
+    """
+    (len(texts), n_features) float32 matrix of log-scaled token counts, each token
+    hashed to a column with crc32 (stable across processes, unlike hash()).
+    """
+    flat = np.fromiter(
+        (
+            row * n_features + zlib.crc32(token.encode()) % n_features
+            for row, text in enumerate(texts)
+            for token in tokenize(text)
+        ),
+        dtype=np.int64,
+    )
+    cells, counts = np.unique(flat, return_counts=True)
+    features = np.zeros((len(texts), n_features), dtype=np.float32)
+    features.flat[cells] = np.log1p(counts)
+    return features
+
+
+class SpamModel:
+    """
+    Logistic regression over hashed features. The whole batch is featurised into
+    one matrix and scored with a single matrix-vector product.
+    """
+
+    def __init__(self, weights: np.ndarray, bias: float = 0.0) -> None:
+        self.weights = np.asarray(weights, dtype=np.float32).ravel()
+        self.bias = float(bias)
+        self.n_features = self.weights.shape[0]
+
+    @classmethod
+    def fit(
+        cls,
+        texts: Sequence[str],
+        labels: Sequence[int],
+        n_features: int = N_FEATURES,
+        epochs: int = 300,
+        learning_rate: float = 1.0,
+        l2: float = 1e-4,
+    ) -> "SpamModel":
+        """
+        Train on `texts` labelled 1 (spam) or 0 by full-batch gradient descent on
+        the log loss. Classes are weighted to count equally, since spam is rare.
+        """
+        features = hash_features(texts, n_features)
+        targets = np.asarray(labels, dtype=np.float32)
+        positives = max(float(targets.sum()), 1.0)
+        negatives = max(len(targets) - positives, 1.0)
+        sample_weights = np.where(targets > 0, 0.5 / positives, 0.5 / negatives).astype(
+            np.float32
+        )
+        weights = np.zeros(n_features, dtype=np.float32)
+        bias = 0.0
+        for _ in range(epochs):
+            scores = 1.0 / (1.0 + np.exp(-(features @ weights + bias)))
+            error = (scores - targets) * sample_weights
+            weights -= learning_rate * (features.T @ error + l2 * weights)
+            bias -= learning_rate * float(error.sum())
+        return cls(weights, bias)
+
+    @classmethod
+    def load(cls, path: str) -> "SpamModel":
+        """Load weights saved by `save` (an .npz with `weights` and `bias`)."""
+        with np.load(path) as data:
+            return cls(data["weights"], float(data["bias"]))
+
+    @classmethod
+    def load_default(cls) -> Optional["SpamModel"]:
+        """The model at Config.SPAM_MODEL_PATH, or None if there is none to load."""
+        path = Config.SPAM_MODEL_PATH
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            model = cls.load(path)
+            logger.info(f"Loaded spam model from {path}")
+            return model
+        except Exception as e:
+            logger.error(f"Could not load spam model from {path}: {e}")
+            return None
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "wb") as f:
+            np.savez(f, weights=self.weights, bias=np.float32(self.bias))
+
+    def score_batch(self, texts: Sequence[str]) -> np.ndarray:
+        """Spam probability of each text, in input order."""
+        if not texts:
+            return np.zeros(0, dtype=np.float32)
+        logits = hash_features(texts, self.n_features) @ self.weights + self.bias
+        scores: np.ndarray = 1.0 / (1.0 + np.exp(-logits))
+        return scores
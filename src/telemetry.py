@@ -0,0 +1,166 @@
+import itertools
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+from .config import config as Config
+
+# Outcomes a run can report through fail_action()
+ERROR, RATE_LIMITED = "error", "rate_limited"
+
+
+class RunState:
+    """Action counts and reported failure of the run in progress."""
+
+    def __init__(self) -> None:
+        self.actions: Dict[str, int] = {}
+        self.outcome: Optional[str] = None
+        self.error: Optional[str] = None
+
+
+# State of the run executing in the current context (thread or task)
+_current_run: ContextVar[Optional[RunState]] = ContextVar("current_run", default=None)
+
+
+class JobRun(NamedTuple):
+    started: float  # wall clock (epoch seconds)
+    ended: float
+    duration: float
+    outcome: str
+    actions: Dict[str, int]
+    error: Optional[str] = None
+
+
+def count_action(action: str, n: int = 1) -> None:
+    """Add to the current run's action counts; a no-op outside a tracked run."""
+    run = _current_run.get()
+    if run is not None:
+        run.actions[action] = run.actions.get(action, 0) + n
+
+
+def fail_action(reason: str, outcome: str = ERROR) -> None:
+    """
+    Mark the current run as failed (or rate limited) for errors its code handles
+    instead of raising; a no-op outside a tracked run. The first failure is kept
+    as the cause, though an error replaces an earlier rate limit.
+    """
+    run = _current_run.get()
+    if run is None:
+        return
+    if run.outcome is None or (run.outcome == RATE_LIMITED and outcome == ERROR):
+        run.outcome = outcome
+        run.error = reason
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of an ascending sequence, None when empty."""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class JobHistory:
+    """
+    Fixed-size ring buffer of a job's last runs. A write is one slot assignment
+    and readers copy the slot list, so neither side takes a lock: under the GIL
+    each of those is atomic, and a reader sees every run as either old or new.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._slots: List[Optional[JobRun]] = [None] * size
+        self._sequence = itertools.count()
+        self.last_error: Optional[JobRun] = None
+
+    def add(self, run: JobRun) -> None:
+        self._slots[next(self._sequence) % self.size] = run
+        if run.error is not None:
+            self.last_error = run
+
+    def runs(self) -> List[JobRun]:
+        """Runs still in the buffer, oldest first."""
+        return sorted(
+            (run for run in list(self._slots) if run is not None),
+            key=lambda run: run.started,
+        )
+
+    def summary(self) -> Dict[str, Any]:
+        runs = self.runs()
+        durations = sorted(run.duration for run in runs)
+        actions: Dict[str, int] = {}
+        for run in runs:
+            for action, n in run.actions.items():
+                actions[action] = actions.get(action, 0) + n
+        last = runs[-1] if runs else None
+        last_error = self.last_error
+        return {
+            "runs": len(runs),
+            "last_started": _iso(last.started) if last else None,
+            "last_ended": _iso(last.ended) if last else None,
+            "last_outcome": last.outcome if last else None,
+            "errors": sum(run.error is not None for run in runs),
+            "duration_p50": percentile(durations, 50),
+            "duration_p95": percentile(durations, 95),
+            "duration_p99": percentile(durations, 99),
+            "actions": actions,
+            "last_error": (
+                {"at": _iso(last_error.ended), "message": last_error.error}
+                if last_error
+                else None
+            ),
+        }
+
+
+def _iso(timestamp: float) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(timestamp))
+
+
+class JobTelemetry:
+    """Process-wide registry of job histories, keyed by job name."""
+
+    def __init__(self, size: int = 100) -> None:
+        self.size = size
+        self._jobs: Dict[str, JobHistory] = {}
+
+    def history(self, job: str) -> JobHistory:
+        history = self._jobs.get(job)
+        if history is None:
+            # setdefault is atomic, so racing writers still share one buffer
+            history = self._jobs.setdefault(job, JobHistory(self.size))
+        return history
+
+    def start(self) -> Any:
+        """Begin collecting action counts and failures for a run in this context."""
+        return _current_run.set(RunState())
+
+    def finish(
+        self,
+        job: str,
+        token: Any,
+        started: float,
+        duration: float,
+        outcome: str,
+        error: Optional[BaseException] = None,
+    ) -> JobRun:
+        """Record the run; a failure it reported applies unless an error escaped."""
+        state = _current_run.get() or RunState()
+        _current_run.reset(token)
+        message = f"{type(error).__name__}: {error}" if error is not None else None
+        if error is None and state.outcome is not None:
+            outcome, message = state.outcome, state.error
+        run = JobRun(
+            started=started,
+            ended=started + duration,
+            duration=duration,
+            outcome=outcome,
+            actions=state.actions,
+            error=message,
+        )
+        self.history(job).add(run)
+        return run
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        return {job: history.summary() for job, history in list(self._jobs.items())}
+
+
+telemetry = JobTelemetry(Config.TELEMETRY_RUNS)
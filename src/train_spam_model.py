@@ -0,0 +1,79 @@
+"""
+Train the spam model on labelled tweets and write the weights file the bot loads.
+
+    python -m src.train_spam_model labelled.csv --out models/spam_model.npz
+
+The CSV needs a `text` and a `label` column; a label of 1 or "spam" marks spam,
+anything else not spam. A share of the rows is held out to report precision and
+recall at SPAM_MODEL_THRESHOLD before the model is trained on every row.
+"""
+
+import argparse
+import csv
+import random
+import sys
+from typing import List, Optional, Sequence, Tuple
+from .config import config as Config
+from .spam_model import SpamModel
+
+SPAM_LABELS = {"1", "spam", "true", "yes"}
+
+
+def read_labelled(path: str) -> Tuple[List[str], List[int]]:
+    """(texts, labels) from a CSV with `text` and `label` columns."""
+    texts, labels = [], []
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            texts.append(row["text"])
+            labels.append(int(row["label"].strip().lower() in SPAM_LABELS))
+    return texts, labels
+
+
+def evaluate(
+    model: SpamModel, texts: Sequence[str], labels: Sequence[int]
+) -> Tuple[float, float]:
+    """(precision, recall) of the model's spam verdicts on `texts`."""
+    flags = model.score_batch(texts) >= Config.SPAM_MODEL_THRESHOLD
+    true_positives = sum(1 for flag, label in zip(flags, labels) if flag and label)
+    precision = true_positives / max(int(flags.sum()), 1)
+    recall = true_positives / max(sum(labels), 1)
+    return precision, recall
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("data", help="CSV file with text and label columns")
+    parser.add_argument("--out", default=Config.SPAM_MODEL_PATH)
+    parser.add_argument("--holdout", type=float, default=0.2)
+    parser.add_argument("--epochs", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    texts, labels = read_labelled(args.data)
+    if not any(labels) or all(labels):
+        print("Need both spam and non-spam examples", file=sys.stderr)
+        return 1
+    rows = list(zip(texts, labels))
+    random.Random(args.seed).shuffle(rows)
+    split = int(len(rows) * (1 - args.holdout))
+    train, held = rows[:split], rows[split:]
+    if held:
+        model = SpamModel.fit(
+            [text for text, _ in train],
+            [label for _, label in train],
+            epochs=args.epochs,
+        )
+        precision, recall = evaluate(
+            model, [text for text, _ in held], [label for _, label in held]
+        )
+        print(
+            f"Held out {len(held)} of {len(rows)} tweets: "
+            f"precision {precision:.2f}, recall {recall:.2f}"
+        )
+    SpamModel.fit(texts, labels, epochs=args.epochs).save(args.out)
+    print(f"Trained on {len(rows)} tweets ({sum(labels)} spam), wrote {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,154 @@
+import re
+import aiohttp
 import tweepy
-from typing import Optional, List, Any
+from tweepy.asynchronous import AsyncClient
+from datetime import datetime
+from typing import (
+    Any,
+    AsyncGenerator,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Union,
+)
+from yarl import URL
 from .config import config as Config
+from .http_session import get_session
+from .instrumentation import instrumented
 from .logger import get_logger
+from .resilience import Resilience, remaining_time, resilience_for
+from .singleflight import AsyncSingleFlight, SingleFlight, request_key
+from .telemetry import RATE_LIMITED, fail_action
+from .rate_limiter import (
+    CREATE_TWEET,
+    LIKE,
+    RETWEET,
+    SEARCH,
+    RateLimiterRegistry,
+    rate_limits,
+)
 
 logger = get_logger()
 
+# tweepy hardcodes the API host; requests are sent to Config.X_API_BASE_URL
+# instead when it points elsewhere (e.g. the local fake API)
+X_API_HOST = "https://api.twitter.com"
+
+# (method, path) of the X API v2 routes we call -> rate limiter endpoint name
+ENDPOINT_ROUTES = [
+    ("POST", re.compile(r"/2/tweets$"), CREATE_TWEET),
+    ("POST", re.compile(r"/2/users/[^/]+/likes$"), LIKE),
+    ("POST", re.compile(r"/2/users/[^/]+/retweets$"), RETWEET),
+    ("GET", re.compile(r"/2/tweets/search/recent$"), SEARCH),
+]
+
+# max_results bounds of GET /2/tweets/search/recent
+SEARCH_PAGE_MIN, SEARCH_PAGE_MAX = 10, 100
+# Tweet fields requested on search; author_id feeds the spam reputation cache
+SEARCH_TWEET_FIELDS = ["author_id"]
+
+
+def endpoint_for(method: str, url: str) -> Optional[str]:
+    path = url.split("?", 1)[0]
+    for route_method, pattern, endpoint in ENDPOINT_ROUTES:
+        if method == route_method and pattern.search(path):
+            return endpoint
+    return None
+
+
+def rebase_url(url: Any, base: str) -> Any:
+    """`url` on `base` instead of the production X API host; others unchanged"""
+    text = str(url)
+    if not text.startswith(X_API_HOST):
+        return url
+    rebased = base.rstrip("/") + text[len(X_API_HOST) :]
+    return URL(rebased, encoded=True) if isinstance(url, URL) else rebased
+
+
+def rebased(request: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a session's request(method, url, ...) to honour X_API_BASE_URL"""
+
+    def rebased_request(method: str, url: Any, *args: Any, **kwargs: Any) -> Any:
+        return request(method, rebase_url(url, Config.X_API_BASE_URL), *args, **kwargs)
+
+    return rebased_request
+
+
+def with_deadline(request: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Wrap a requests session's request() so tweepy's blocking calls, which set
+    no timeout, give up by the current call's deadline
+    """
+
+    def timed_request(method: str, url: Any, *args: Any, **kwargs: Any) -> Any:
+        kwargs.setdefault(
+            "timeout",
+            (
+                Config.HTTP_CONNECT_TIMEOUT_SECONDS,
+                max(0.001, remaining_time(Config.HTTP_TIMEOUT_SECONDS)),
+            ),
+        )
+        return request(method, url, *args, **kwargs)
+
+    return timed_request
+
+
+def route_label(method: str, route: str, *args: Any, **kwargs: Any) -> str:
+    """Bounded `endpoint` metric label for a tweepy request"""
+    return endpoint_for(method, route) or "other"
+
+
+def search_page_params(
+    query: str,
+    remaining: int,
+    page_size: int,
+    since_id: Optional[str],
+    start_time: Optional[Union[datetime, str]],
+    next_token: Optional[str],
+) -> Dict[str, Any]:
+    """Arguments for one search_recent_tweets page, sized to what is still wanted."""
+    params: Dict[str, Any] = {
+        "query": query,
+        "max_results": max(SEARCH_PAGE_MIN, min(SEARCH_PAGE_MAX, page_size, remaining)),
+        "tweet_fields": SEARCH_TWEET_FIELDS,
+    }
+    if since_id:
+        params["since_id"] = since_id
+    if start_time:
+        params["start_time"] = start_time
+    if next_token:
+        params["next_token"] = next_token
+    return params
+
+
+def apply_rate_limit_headers(
+    limits: RateLimiterRegistry, endpoint: str, headers: Mapping[str, str]
+) -> None:
+    """Feed x-rate-limit-remaining / x-rate-limit-reset into the limiter."""
+    remaining = headers.get("x-rate-limit-remaining")
+    reset = headers.get("x-rate-limit-reset")
+    if remaining is None or reset is None:
+        return
+    limits.get(endpoint).update_from_server(int(remaining), float(reset))
+    if int(remaining) <= 0:
+        logger.warning(
+            f"X API budget for {endpoint} exhausted until {reset}",
+            extra={"endpoint": endpoint, "reset": reset},
+        )
+
 
 class TwitterClient:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        limits: Optional[RateLimiterRegistry] = None,
+        resilience: Optional[Resilience] = None,
+    ) -> None:
+        self.limits = limits or rate_limits
+        self.resilience = resilience or resilience_for("x")
+        self._searches = SingleFlight("x_search")
         self.client = tweepy.Client(
             bearer_token=Config.TWITTER_BEARER_TOKEN,
             consumer_key=Config.TWITTER_CLIENT_ID,
@@ -15,47 +156,377 @@ class TwitterClient:
             access_token=Config.TWITTER_ACCESS_TOKEN,
             access_token_secret=Config.TWITTER_ACCESS_TOKEN_SECRET,
         )
+        # Every tweepy call goes through this requests session; hook its responses
+        # so the limiter learns the server-side budget, including on 429s.
+        hooks = getattr(getattr(self.client, "session", None), "hooks", None)
+        if isinstance(hooks, dict):
+            hooks.setdefault("response", []).append(self._on_response)
+        # Every call also goes through Client.request; time it there
+        self.client.request = instrumented("x", route_label)(self.client.request)
+        self.client.session.request = with_deadline(self.client.session.request)
+        if Config.X_API_BASE_URL != X_API_HOST:
+            self.client.session.request = rebased(self.client.session.request)
+
+    def _on_response(self, response: Any, *args: Any, **kwargs: Any) -> Any:
+        try:
+            endpoint = endpoint_for(response.request.method, response.url)
+            if endpoint:
+                self.update_rate_limit(endpoint, response.headers)
+        except Exception as e:
+            logger.debug(f"Could not read rate limit headers: {e}")
+        return response
+
+    def update_rate_limit(self, endpoint: str, headers: Mapping[str, str]) -> None:
+        apply_rate_limit_headers(self.limits, endpoint, headers)
+
+    def _wait_for(self, endpoint: str) -> bool:
+        """Wait for a token from the endpoint's budget instead of spending a 429."""
+        if not self.resilience.breaker.available():
+            # Fail fast without spending budget on an upstream that is down
+            logger.warning(f"X circuit open, skipping {endpoint}")
+            fail_action(f"X circuit open, skipped {endpoint}")
+            return False
+        if self.limits.acquire_blocking(
+            endpoint, timeout=Config.RATE_LIMIT_WAIT_SECONDS
+        ):
+            return True
+        logger.warning(f"Rate limit budget exhausted for {endpoint}")
+        fail_action(f"Rate limit budget exhausted for {endpoint}", RATE_LIMITED)
+        return False
 
     def post_tweet(self, text: str) -> Optional[str]:
+        if not self._wait_for(CREATE_TWEET):
+            return None
         try:
-            response = self.client.create_tweet(text=text)
+            response = self.resilience.call(
+                self.client.create_tweet, text=text, idempotent=False
+            )
             logger.info(f"Posted tweet: {response.data['id']}")
             return str(response.data["id"])
         except Exception as e:
             logger.error(f"Error posting tweet: {e}")
+            fail_action(f"Error posting tweet: {e}")
             return None
 
     def reply_to_tweet(self, tweet_id: str, text: str) -> Optional[str]:
+        if not self._wait_for(CREATE_TWEET):
+            return None
         try:
-            response = self.client.create_tweet(
-                text=text, in_reply_to_tweet_id=tweet_id
+            response = self.resilience.call(
+                self.client.create_tweet,
+                text=text,
+                in_reply_to_tweet_id=tweet_id,
+                idempotent=False,
             )
             logger.info(f"Replied to tweet {tweet_id}: {response.data['id']}")
             return str(response.data["id"])
         except Exception as e:
             logger.error(f"Error replying to tweet: {e}")
+            fail_action(f"Error replying to tweet: {e}")
             return None
 
     def like_tweet(self, tweet_id: str) -> None:
+        if not self._wait_for(LIKE):
+            return
         try:
-            self.client.like(tweet_id)
+            self.resilience.call(self.client.like, tweet_id)
             logger.info(f"Liked tweet: {tweet_id}")
         except Exception as e:
             logger.error(f"Error liking tweet: {e}")
+            fail_action(f"Error liking tweet: {e}")
 
     def retweet(self, tweet_id: str) -> None:
+        if not self._wait_for(RETWEET):
+            return
         try:
-            self.client.retweet(tweet_id)
+            self.resilience.call(self.client.retweet, tweet_id)
             logger.info(f"Retweeted tweet: {tweet_id}")
         except Exception as e:
             logger.error(f"Error retweeting tweet: {e}")
+            fail_action(f"Error retweeting tweet: {e}")
+
+    def search_tweets(
+        self, query: str, max_results: int = 10, since_id: Optional[str] = None
+    ) -> List[Any]:
+        return list(
+            self.iter_search_tweets(
+                query, max_total=max_results, max_pages=1, since_id=since_id
+            )
+        )
+
+    def iter_search_tweets(
+        self,
+        query: str,
+        max_total: int = 100,
+        max_pages: int = 5,
+        page_size: int = SEARCH_PAGE_MAX,
+        since_id: Optional[str] = None,
+        start_time: Optional[Union[datetime, str]] = None,
+    ) -> Iterator[Any]:
+        """
+        Yield matching tweets page by page, following next_token until `max_total`
+        tweets or `max_pages` pages. A page is only requested when the consumer
+        asks for more, so stopping early never pays for unused pages.
+        """
+        for page in self.iter_search_pages(
+            query, max_total, max_pages, page_size, since_id, start_time
+        ):
+            yield from page
+
+    def iter_search_pages(
+        self,
+        query: str,
+        max_total: int = 100,
+        max_pages: int = 5,
+        page_size: int = SEARCH_PAGE_MAX,
+        since_id: Optional[str] = None,
+        start_time: Optional[Union[datetime, str]] = None,
+    ) -> Iterator[List[Any]]:
+        """iter_search_tweets one page at a time, for callers that batch work."""
+        yielded, pages, next_token = 0, 0, None
+        while yielded < max_total and pages < max_pages:
+            params = search_page_params(
+                query, max_total - yielded, page_size, since_id, start_time, next_token
+            )
+            try:
+                response = self._searches.do(
+                    request_key("search", params=params), self._search_page, params
+                )
+            except Exception as e:
+                logger.error(f"Error searching tweets: {e}")
+                fail_action(f"Error searching tweets: {e}")
+                return
+            if response is None:
+                return
+            pages += 1
+            page = list(response.data or [])[: max_total - yielded]
+            if page:
+                yield page
+            yielded += len(page)
+            next_token = (response.meta or {}).get("next_token")
+            if not next_token:
+                return
+
+    def _search_page(self, params: Dict[str, Any]) -> Any:
+        """
+        One search page, or None without budget. Concurrent identical page
+        requests share one call and its budget token.
+        """
+        if not self._wait_for(SEARCH):
+            return None
+        return self.resilience.call(self.client.search_recent_tweets, **params)
+
+
+class _HeaderAwareAsyncClient(AsyncClient):
+    """AsyncClient that reports rate limit headers of every response, 429s included"""
+
+    # The shared pool, or a _RebasedSession view of it when X_API_BASE_URL is set
+    session: Union[aiohttp.ClientSession, "_RebasedSession", None]
 
-    def search_tweets(self, query: str, max_results: int = 10) -> List[Any]:
+    def __init__(self, limits: RateLimiterRegistry, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.limits = limits
+
+    def _observe(self, method: str, route: str, headers: Mapping[str, str]) -> None:
+        try:
+            endpoint = endpoint_for(method, route)
+            if endpoint:
+                apply_rate_limit_headers(self.limits, endpoint, headers)
+        except Exception as e:
+            logger.debug(f"Could not read rate limit headers: {e}")
+
+    @instrumented(
+        "x", lambda self, method, route, *args, **kwargs: route_label(method, route)
+    )
+    async def request(
+        self,
+        method: str,
+        route: str,
+        params: Any = None,
+        json: Any = None,
+        user_auth: bool = False,
+    ) -> Any:
         try:
-            tweets = self.client.search_recent_tweets(
-                query=query, max_results=max_results
+            response = await super().request(method, route, params, json, user_auth)
+        except tweepy.HTTPException as e:
+            self._observe(method, route, e.response.headers)
+            raise
+        self._observe(method, route, response.headers)
+        return response
+
+
+class _RebasedSession:
+    """View of the shared aiohttp session that sends X calls to X_API_BASE_URL"""
+
+    def __init__(self, session: Any) -> None:
+        self._session = session
+        self.request = rebased(session.request)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._session, name)
+
+
+class AsyncTwitterClient:
+    """
+    Async counterpart of TwitterClient on tweepy's AsyncClient. Requests go
+    through the shared pooled aiohttp session, so concurrent calls reuse
+    connections, and each call awaits its endpoint's token bucket.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[RateLimiterRegistry] = None,
+        resilience: Optional[Resilience] = None,
+    ) -> None:
+        self.limits = limits or rate_limits
+        self.resilience = resilience or resilience_for("x")
+        self._searches = AsyncSingleFlight("x_search")
+        self.client = _HeaderAwareAsyncClient(
+            self.limits,
+            bearer_token=Config.TWITTER_BEARER_TOKEN,
+            consumer_key=Config.TWITTER_CLIENT_ID,
+            consumer_secret=Config.TWITTER_CLIENT_SECRET,
+            access_token=Config.TWITTER_ACCESS_TOKEN,
+            access_token_secret=Config.TWITTER_ACCESS_TOKEN_SECRET,
+        )
+
+    async def _wait_for(self, endpoint: str) -> bool:
+        if not self.resilience.breaker.available():
+            logger.warning(f"X circuit open, skipping {endpoint}")
+            fail_action(f"X circuit open, skipped {endpoint}")
+            return False
+        if await self.limits.acquire(endpoint, timeout=Config.RATE_LIMIT_WAIT_SECONDS):
+            session: Union[aiohttp.ClientSession, _RebasedSession]
+            session = await get_session()
+            if Config.X_API_BASE_URL != X_API_HOST:
+                session = _RebasedSession(session)
+            self.client.session = session
+            return True
+        logger.warning(f"Rate limit budget exhausted for {endpoint}")
+        fail_action(f"Rate limit budget exhausted for {endpoint}", RATE_LIMITED)
+        return False
+
+    async def post_tweet(self, text: str) -> Optional[str]:
+        if not await self._wait_for(CREATE_TWEET):
+            return None
+        try:
+            response = await self.resilience.acall(
+                self.client.create_tweet, text=text, idempotent=False
             )
-            return list(tweets.data) if tweets.data else []
+            logger.info(f"Posted tweet: {response.data['id']}")
+            return str(response.data["id"])
         except Exception as e:
-            logger.error(f"Error searching tweets: {e}")
-            return []
+            logger.error(f"Error posting tweet: {e}")
+            fail_action(f"Error posting tweet: {e}")
+            return None
+
+    async def reply_to_tweet(self, tweet_id: str, text: str) -> Optional[str]:
+        if not await self._wait_for(CREATE_TWEET):
+            return None
+        try:
+            response = await self.resilience.acall(
+                self.client.create_tweet,
+                text=text,
+                in_reply_to_tweet_id=tweet_id,
+                idempotent=False,
+            )
+            logger.info(f"Replied to tweet {tweet_id}: {response.data['id']}")
+            return str(response.data["id"])
+        except Exception as e:
+            logger.error(f"Error replying to tweet: {e}")
+            fail_action(f"Error replying to tweet: {e}")
+            return None
+
+    async def like_tweet(self, tweet_id: str) -> bool:
+        if not await self._wait_for(LIKE):
+            return False
+        try:
+            await self.resilience.acall(self.client.like, tweet_id)
+            logger.info(f"Liked tweet: {tweet_id}")
+            return True
+        except Exception as e:
+            logger.error(f"Error liking tweet: {e}")
+            fail_action(f"Error liking tweet: {e}")
+            return False
+
+    async def retweet(self, tweet_id: str) -> bool:
+        if not await self._wait_for(RETWEET):
+            return False
+        try:
+            await self.resilience.acall(self.client.retweet, tweet_id)
+            logger.info(f"Retweeted tweet: {tweet_id}")
+            return True
+        except Exception as e:
+            logger.error(f"Error retweeting tweet: {e}")
+            fail_action(f"Error retweeting tweet: {e}")
+            return False
+
+    async def search_tweets(
+        self, query: str, max_results: int = 10, since_id: Optional[str] = None
+    ) -> List[Any]:
+        return [
+            tweet
+            async for tweet in self.iter_search_tweets(
+                query, max_total=max_results, max_pages=1, since_id=since_id
+            )
+        ]
+
+    async def iter_search_tweets(
+        self,
+        query: str,
+        max_total: int = 100,
+        max_pages: int = 5,
+        page_size: int = SEARCH_PAGE_MAX,
+        since_id: Optional[str] = None,
+        start_time: Optional[Union[datetime, str]] = None,
+    ) -> AsyncGenerator[Any, None]:
+        """Async counterpart of TwitterClient.iter_search_tweets."""
+        pages = self.iter_search_pages(
+            query, max_total, max_pages, page_size, since_id, start_time
+        )
+        try:
+            async for page in pages:
+                for tweet in page:
+                    yield tweet
+        finally:
+            await pages.aclose()
+
+    async def iter_search_pages(
+        self,
+        query: str,
+        max_total: int = 100,
+        max_pages: int = 5,
+        page_size: int = SEARCH_PAGE_MAX,
+        since_id: Optional[str] = None,
+        start_time: Optional[Union[datetime, str]] = None,
+    ) -> AsyncGenerator[List[Any], None]:
+        """Async counterpart of TwitterClient.iter_search_pages."""
+        yielded, pages, next_token = 0, 0, None
+        while yielded < max_total and pages < max_pages:
+            params = search_page_params(
+                query, max_total - yielded, page_size, since_id, start_time, next_token
+            )
+            try:
+                response = await self._searches.do(
+                    request_key("search", params=params), self._search_page, params
+                )
+            except Exception as e:
+                logger.error(f"Error searching tweets: {e}")
+                fail_action(f"Error searching tweets: {e}")
+                return
+            if response is None:
+                return
+            pages += 1
+            page = list(response.data or [])[: max_total - yielded]
+            if page:
+                yield page
+            yielded += len(page)
+            next_token = (response.meta or {}).get("next_token")
+            if not next_token:
+                return
+
+    async def _search_page(self, params: Dict[str, Any]) -> Any:
+        """Async counterpart of TwitterClient._search_page."""
+        if not await self._wait_for(SEARCH):
+            return None
+        return await self.resilience.acall(self.client.search_recent_tweets, **params)
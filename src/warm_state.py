@@ -0,0 +1,191 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, Hashable, List, Optional, Tuple
+from .config import config as Config
+from .logger import get_logger
+
+if TYPE_CHECKING:
+    from .rate_limiter import RateLimiterRegistry
+
+logger = get_logger()
+
+# (key, value, fresh_until, stale_until), times in epoch seconds
+CacheRow = Tuple[Hashable, Any, float, float]
+
+
+def _encode_key(key: Hashable) -> str:
+    return json.dumps(key)
+
+
+def _decode_key(text: str) -> Hashable:
+    key = json.loads(text)
+    return tuple(key) if isinstance(key, list) else key
+
+
+class WarmStateStore:
+    """
+    State worth keeping across restarts (cache entries and rate limiter budgets)
+    in a small SQLite file, stamped with wall-clock times so a new instance can
+    tell what is still within its TTL. Writes are queued in memory and flushed
+    by a background thread every `flush_interval` seconds, so callers never
+    wait on disk; repeated writes of a key between flushes are coalesced.
+    """
+
+    def __init__(self, path: str, flush_interval: Optional[float] = None) -> None:
+        self.path = path
+        self.flush_interval = (
+            flush_interval
+            if flush_interval is not None
+            else Config.WARM_STATE_FLUSH_SECONDS
+        )
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS warm_cache (namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL, value TEXT NOT NULL, fresh_until REAL NOT NULL,"
+            " stale_until REAL NOT NULL, PRIMARY KEY (namespace, key))"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS limiter_state (name TEXT PRIMARY KEY,"
+            " tokens REAL NOT NULL, saved_at REAL NOT NULL,"
+            " blocked_until REAL NOT NULL)"
+        )
+        with self._db:
+            self._db.execute(
+                "DELETE FROM warm_cache WHERE stale_until < ?", (time.time(),)
+            )
+        self._db_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[str, str], Tuple[str, float, float]] = {}
+        self._limits: Optional["RateLimiterRegistry"] = None
+        self._wake = threading.Event()
+        self._closed = False
+        self._writer: Optional[threading.Thread] = None
+
+    def _start(self) -> None:
+        if self._writer is None and not self._closed:
+            self._writer = threading.Thread(
+                target=self._run, name="warm-state-writer", daemon=True
+            )
+            self._writer.start()
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"Could not write warm state to {self.path}: {e}")
+
+    def put(
+        self,
+        namespace: str,
+        key: Hashable,
+        value: Any,
+        fresh_until: float,
+        stale_until: float,
+    ) -> None:
+        """Queue a cache entry for the next flush; values must be JSON."""
+        try:
+            row = (json.dumps(value), fresh_until, stale_until)
+            encoded = _encode_key(key)
+        except (TypeError, ValueError) as e:
+            logger.debug(f"Not persisting {namespace} cache entry {key!r}: {e}")
+            return
+        with self._lock:
+            self._pending[(namespace, encoded)] = row
+            self._start()
+
+    def load(self, namespace: str) -> List[CacheRow]:
+        """Unexpired entries of `namespace`, oldest first."""
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT key, value, fresh_until, stale_until FROM warm_cache "
+                "WHERE namespace = ? AND stale_until > ? ORDER BY fresh_until",
+                (namespace, time.time()),
+            ).fetchall()
+        return [
+            (_decode_key(key), json.loads(value), fresh_until, stale_until)
+            for key, value, fresh_until, stale_until in rows
+        ]
+
+    def track_limits(self, limits: "RateLimiterRegistry") -> int:
+        """
+        Restore `limits` from the last saved budgets and save them on every
+        flush from now on. Returns the number of buckets restored.
+        """
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT name, tokens, saved_at, blocked_until FROM limiter_state"
+            ).fetchall()
+        limits.restore({name: tuple(state) for name, *state in rows})
+        with self._lock:
+            self._limits = limits
+            self._start()
+        return len(rows)
+
+    def flush(self) -> None:
+        """Write queued entries and limiter budgets now."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            limits = self._limits
+        snapshot = limits.snapshot() if limits is not None else {}
+        if not pending and not snapshot:
+            return
+        with self._db_lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO warm_cache VALUES (?, ?, ?, ?, ?)",
+                [(ns, key, *row) for (ns, key), row in pending.items()],
+            )
+            self._db.executemany(
+                "INSERT OR REPLACE INTO limiter_state VALUES (?, ?, ?, ?)",
+                [(name, *state) for name, state in snapshot.items()],
+            )
+            self._db.execute(
+                "DELETE FROM warm_cache WHERE stale_until < ?", (time.time(),)
+            )
+
+    def close(self) -> None:
+        """Stop the writer, flush what is left and close the file."""
+        self._closed = True
+        self._wake.set()
+        if self._writer is not None:
+            self._writer.join(timeout=5)
+        try:
+            self.flush()
+        finally:
+            with self._db_lock:
+                self._db.close()
+
+
+_store: Optional[WarmStateStore] = None
+_store_lock = threading.Lock()
+
+
+def get_warm_state() -> Optional[WarmStateStore]:
+    """The process-wide store, opened on first use; None when disabled."""
+    global _store
+    if not Config.WARM_STATE_DB:
+        return None
+    with _store_lock:
+        if _store is None:
+            try:
+                _store = WarmStateStore(Config.WARM_STATE_DB)
+            except sqlite3.Error as e:
+                logger.warning(f"Warm state disabled, cannot open database: {e}")
+                return None
+        return _store
+
+
+def close_warm_state() -> None:
+    global _store
+    with _store_lock:
+        store, _store = _store, None
+    if store is not None:
+        store.close()
@@ -0,0 +1,283 @@
+"""
+CPU-path micro-benchmarks for the bot's hot functions, with no network: spam
+checks, the rate limiter, promotion message selection and the engagement loop
+against in-process fake clients, over synthetic corpora of 10 to 100k tweets.
+
+Reports ops/sec plus, from one tracemalloc-traced pass over at most 1,000
+tweets, the peak bytes allocated and the blocks still held per op. Results can
+be saved as a baseline and later runs compared against it:
+
+    python -m tests.benchmarks.bench_hot_paths --save tests/benchmarks/baseline.json
+    python -m tests.benchmarks.bench_hot_paths --compare tests/benchmarks/baseline.json
+"""
+
+import argparse
+import gc
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+import numpy as np
+from loguru import logger
+from src.engagement import EngagementBot
+from src.rate_limiter import BOT, RateLimiter, RateLimiterRegistry
+from src.reputation import AuthorReputation
+from src.seen_store import SeenTweetStore
+from src.spam_detector import SpamDetector
+from src.spam_model import N_FEATURES, SpamModel
+from tests.benchmarks.corpus import make_tweets
+
+DEFAULT_BASELINE = "tests/benchmarks/baseline.json"
+PAGE_SIZE = 100
+# Tracing slows a pass several times over; allocations are per op, so a sample
+# of the corpus is enough
+ALLOC_SAMPLE = 1000
+
+# A case builds fresh state for one pass and returns (run, ops in that pass);
+# only `run` is timed
+Case = Callable[[List], Tuple[Callable[[], None], int]]
+
+
+class FakeTwitter:
+    """Instant X client: every write succeeds, search returns the corpus."""
+
+    def __init__(self, tweets: List) -> None:
+        self.tweets = tweets
+
+    def iter_search_pages(self, query, **kwargs):
+        return iter(pages(self.tweets))
+
+    def like_tweet(self, tweet_id):
+        return True
+
+    def reply_to_tweet(self, tweet_id, text):
+        return "1"
+
+    def post_tweet(self, text):
+        return "1"
+
+
+def unlimited() -> RateLimiter:
+    return RateLimiter(registry=RateLimiterRegistry({BOT: (10**12, 1)}))
+
+
+def make_bot(tweets: List) -> EngagementBot:
+    twitter = FakeTwitter(tweets)
+    return EngagementBot(
+        twitter=twitter,
+        market=object(),
+        rate_limiter=unlimited(),
+        spam_detector=SpamDetector(model=None, reputation=AuthorReputation()),
+        async_twitter=twitter,
+        seen=SeenTweetStore(":memory:"),
+    )
+
+
+def pages(tweets: List) -> List[List]:
+    return [tweets[i : i + PAGE_SIZE] for i in range(0, len(tweets), PAGE_SIZE)]
+
+
+def spam_is_spam(tweets):
+    detector = SpamDetector(model=None, reputation=AuthorReputation())
+    texts = [tweet.text for tweet in tweets]
+    return lambda: [detector.is_spam(text) for text in texts], len(texts)
+
+
+def spam_is_spam_batch(tweets):
+    detector = SpamDetector(model=None, reputation=AuthorReputation())
+    batches = [
+        ([t.text for t in page], [t.author_id for t in page]) for page in pages(tweets)
+    ]
+    return lambda: [detector.is_spam_batch(*batch) for batch in batches], len(tweets)
+
+
+def spam_model_batch(tweets):
+    rng = np.random.default_rng(0)
+    model = SpamModel(rng.normal(size=N_FEATURES).astype(np.float32), -1.0)
+    detector = SpamDetector(model=model, reputation=AuthorReputation())
+    batches = [[t.text for t in page] for page in pages(tweets)]
+    return lambda: [detector.is_spam_batch(batch) for batch in batches], len(tweets)
+
+
+def rate_limiter_can_request(tweets):
+    limiter = unlimited()
+    count = len(tweets)
+
+    def run():
+        for _ in range(count):
+            limiter.can_request()
+
+    return run, count
+
+
+def promote(method: str) -> Case:
+    def case(tweets):
+        action = getattr(make_bot([]), method)
+        count = len(tweets)
+        random.seed(0)
+
+        def run():
+            for _ in range(count):
+                action()
+
+        return run, count
+
+    case.__name__ = method
+    return case
+
+
+def engage_with_tweets(tweets):
+    bot = make_bot(tweets)
+    return bot.engage_with_tweets, len(tweets)
+
+
+CASES: Dict[str, Case] = {
+    "spam.is_spam": spam_is_spam,
+    "spam.is_spam_batch": spam_is_spam_batch,
+    "spam.model_batch": spam_model_batch,
+    "rate_limiter.can_request": rate_limiter_can_request,
+    "bot.promote_community": promote("promote_community"),
+    "bot.promote_specific_post": promote("promote_specific_post"),
+    "bot.engage_with_tweets": engage_with_tweets,
+}
+
+
+def ops_per_sec(
+    case: Case, tweets: List, repeat: int, min_time: float, max_time: float
+) -> float:
+    """
+    Best of up to `repeat` rounds, each running fresh passes for at least
+    `min_time`; no new round starts once `max_time` has been spent.
+    """
+    best, total = 0.0, 0.0
+    for _ in range(repeat):
+        elapsed, ops = 0.0, 0
+        while elapsed < min_time:
+            run, count = case(tweets)
+            start = time.perf_counter()
+            run()
+            elapsed += time.perf_counter() - start
+            ops += count
+        best = max(best, ops / elapsed)
+        total += elapsed
+        if total >= max_time:
+            break
+    return best
+
+
+def allocations(case: Case, tweets: List) -> Tuple[float, float]:
+    """(peak bytes allocated, blocks still held) per op over one traced pass"""
+    run, count = case(tweets)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    held = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    return (peak - base) / count, held / count
+
+
+def run_suite(
+    sizes: List[int], names: List[str], repeat: int, min_time: float, max_time: float
+) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for size in sizes:
+        tweets = make_tweets(size)
+        for name in names:
+            case = CASES[name]
+            peak, held = allocations(case, tweets[:ALLOC_SAMPLE])
+            results[f"{name}[{size}]"] = {
+                "ops_per_sec": ops_per_sec(case, tweets, repeat, min_time, max_time),
+                "peak_bytes_per_op": peak,
+                "held_blocks_per_op": held,
+            }
+            print(format_row(f"{name}[{size}]", results[f"{name}[{size}]"]))
+    return results
+
+
+def format_row(key: str, result: Dict[str, float]) -> str:
+    return (
+        f"{key:<38} {result['ops_per_sec']:>12,.0f} "
+        f"{result['peak_bytes_per_op']:>12,.0f} "
+        f"{result['held_blocks_per_op']:>9.2f}"
+    )
+
+
+def compare(
+    results: Dict[str, Dict[str, float]], baseline_path: str, tolerance: float
+) -> List[str]:
+    """Keys whose ops/sec fell more than `tolerance` below the baseline"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+    print(
+        f"\n{'vs ' + baseline_path:<38} {'ops/sec':>12} {'baseline':>12} {'ratio':>9}"
+    )
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        ratio = result["ops_per_sec"] / baseline[key]["ops_per_sec"]
+        flag = "  REGRESSION" if ratio < 1 - tolerance else ""
+        if flag:
+            regressions.append(key)
+        print(
+            f"{key:<38} {result['ops_per_sec']:>12,.0f} "
+            f"{baseline[key]['ops_per_sec']:>12,.0f} {ratio:>8.2f}x{flag}"
+        )
+    return regressions
+
+
+def save(results: Dict[str, Dict[str, float]], path: str) -> None:
+    document = {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"\nSaved {len(results)} results to {path}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="10,1000,100000")
+    parser.add_argument("--only", default="", help="comma separated case names")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--max-time", type=float, default=3.0)
+    parser.add_argument("--save", metavar="PATH")
+    parser.add_argument("--compare", metavar="PATH", nargs="?", const=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    # Keep record building in the measurement but write nothing
+    logger.remove()
+    logger.add(lambda message: None, level="INFO")
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    names = [name for name in args.only.split(",") if name] or list(CASES)
+    print(f"{'case[tweets]':<38} {'ops/sec':>12} {'peak B/op':>12} {'held/op':>9}")
+    results = run_suite(sizes, names, args.repeat, args.min_time, args.max_time)
+    if args.save:
+        save(results, args.save)
+    if args.compare:
+        return 1 if compare(results, args.compare, args.tolerance) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
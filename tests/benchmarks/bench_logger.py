@@ -0,0 +1,57 @@
+"""
+Per-log overhead seen by the caller: synchronous sinks vs the background writer.
+
+    python -m tests.benchmarks.bench_logger
+"""
+
+import json
+import os
+import time
+import timeit
+from loguru import logger
+from src.logger import BackgroundSink, structured
+
+
+DEVNULL = open(os.devnull, "w")
+# Simulated blocking I/O per record, e.g. a synchronous Cloud Logging upload
+IO_WAIT = 0.0002
+
+
+def slow_write(message):
+    """A sink doing the work our real sinks do: serialize, write and wait on I/O"""
+    DEVNULL.write(json.dumps(structured(message.record), default=str) + "\n")
+    time.sleep(IO_WAIT)
+
+
+def measure(sink, number):
+    # Like src.logger, the sink under test is the only handler
+    logger.remove()
+    logger.add(sink, format="{message}")
+    per_call = min(
+        timeit.repeat(
+            lambda: logger.info(
+                "Successfully engaged with tweet",
+                extra={"action": "engage_tweets", "tweet_id": "1", "reply": "2"},
+            ),
+            number=number,
+            repeat=5,
+        )
+    )
+    return per_call / number * 1e6
+
+
+def main():
+    number = 1000
+    baseline = measure(lambda message: None, number)
+    sync = measure(slow_write, number)
+    background = BackgroundSink(slow_write, max_queue=number * 10)
+    queued = measure(background, number)
+    background.join()
+    background.stop()
+    print(f"no-op sink:       {baseline:7.1f} us/log")
+    print(f"synchronous sink: {sync:7.1f} us/log")
+    print(f"background sink:  {queued:7.1f} us/log")
+
+
+if __name__ == "__main__":
+    main()
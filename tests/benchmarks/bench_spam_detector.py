@@ -0,0 +1,64 @@
+"""
+Micro-benchmark: compiled KeywordMatcher vs the original per-keyword `in` scan.
+
+    python -m tests.benchmarks.bench_spam_detector
+"""
+
+import random
+import string
+import timeit
+from src.spam_detector import KeywordMatcher
+
+
+def legacy_count(keywords, text):
+    """The original SpamDetector scan: one lowercase + one `in` per keyword"""
+    text_lower = text.lower()
+    return sum(1 for word in keywords if word in text_lower)
+
+
+def make_keywords(count, rng):
+    return [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10)))
+        for _ in range(count)
+    ]
+
+
+def make_texts(count, keywords, rng):
+    vocabulary = ["crypto", "moon", "gm", "wifDOG", "solana", "#memecoin", "$WIF"]
+    texts = []
+    for _ in range(count):
+        words = rng.choices(vocabulary, k=rng.randint(10, 40))
+        words += rng.sample(keywords, k=2)
+        rng.shuffle(words)
+        texts.append(" ".join(words))
+    return texts
+
+
+def main():
+    rng = random.Random(0)
+    texts_count, repeat = 500, 5
+    print(f"{'keywords':>8} {'legacy ms':>10} {'matcher ms':>11} {'speedup':>8}")
+    for keyword_count in (5, 50, 200, 500):
+        keywords = make_keywords(keyword_count, rng)
+        texts = make_texts(texts_count, keywords, rng)
+        matcher = KeywordMatcher(keywords)
+        legacy = min(
+            timeit.repeat(
+                lambda: [legacy_count(keywords, t) for t in texts],
+                number=1,
+                repeat=repeat,
+            )
+        )
+        compiled = min(
+            timeit.repeat(
+                lambda: [matcher.count(t) for t in texts], number=1, repeat=repeat
+            )
+        )
+        print(
+            f"{keyword_count:>8} {legacy * 1000:>10.2f} {compiled * 1000:>11.2f} "
+            f"{legacy / compiled:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
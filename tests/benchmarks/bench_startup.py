@@ -0,0 +1,82 @@
+"""
+Cold start: import time per module and time to the first healthy /health response.
+
+    python -m tests.benchmarks.bench_startup
+"""
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+
+def import_times(module="src.main", top=15):
+    """(cumulative ms, module) for the slowest imports, from -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        rows.append((int(cumulative) / 1000, name.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_health(timeout=30.0):
+    """Seconds from process start to the first /health 200 and to ready=true"""
+    port = free_port()
+    env = dict(os.environ, WARMUP_URLS="")
+    env.pop("GOOGLE_CLOUD_PROJECT", None)
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(port)],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    healthy = ready = None
+    try:
+        while time.perf_counter() - start < timeout and ready is None:
+            try:
+                with urllib.request.urlopen(
+                    f"http://127.0.0.1:{port}/health", timeout=1
+                ) as response:
+                    body = json.load(response)
+                elapsed = time.perf_counter() - start
+                healthy = healthy or elapsed
+                if body.get("ready"):
+                    ready = elapsed
+            except OSError:
+                pass
+            time.sleep(0.01)
+    finally:
+        server.terminate()
+        server.wait()
+    return healthy, ready
+
+
+def main():
+    print("Slowest imports of src.main (cumulative ms):")
+    for cumulative, name in import_times():
+        print(f"  {cumulative:8.1f}  {name}")
+    healthy, ready = time_to_health()
+    print(f"first healthy /health: {healthy or float('nan'):.3f}s")
+    print(f"bot ready:             {ready or float('nan'):.3f}s")
+
+
+if __name__ == "__main__":
+    main()
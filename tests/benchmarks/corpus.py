@@ -0,0 +1,64 @@
+"""
+Synthetic tweet corpora shaped like the bot's search results: crypto chatter with
+mentions, cashtags, hashtags, links and emoji, a share of spam, and authors that
+post repeatedly.
+"""
+
+import random
+from types import SimpleNamespace
+from typing import List
+
+OPENERS = ["gm", "Just bought more", "Thoughts on", "Why is nobody talking about"]
+SUBJECTS = ["$wifDOG", "$WIF", "$BONK", "$SOL", "wifDOG", "the dog festival"]
+BODIES = [
+    "community is growing fast",
+    "chart looks ready to break out",
+    "Kukur Tihar celebrates dogs in Nepal",
+    "holding through the dip, fundamentals are strong",
+    "best memecoin team on Solana",
+    "listing rumours again, do your own research",
+]
+SPAM_BODIES = [
+    "100x pump incoming, dump your bags now",
+    "free airdrop scam alert? no, real giveaway",
+    "fake volume but pump it anyway",
+    "DM me to join the pump group, guaranteed profit spam",
+]
+HASHTAGS = ["#wifDOG", "#memecoin", "#crypto", "#Solana", "#KukurTihar", "#nepal"]
+HOSTS = ["x.com", "dexscreener.com", "coingecko.com", "bit.ly", "t.me"]
+EMOJI = ["🐕", "🚀", "🌙", "🔥", "✨", "💎"]
+
+
+def make_text(rng: random.Random, spam: bool) -> str:
+    parts = [rng.choice(OPENERS), rng.choice(SUBJECTS)]
+    parts.append(rng.choice(SPAM_BODIES if spam else BODIES))
+    if rng.random() < 0.4:
+        parts.insert(0, f"@user{rng.randrange(10000)}")
+    if rng.random() < 0.5:
+        parts.append(f"https://{rng.choice(HOSTS)}/{rng.randrange(10**6):x}")
+    parts += rng.sample(HASHTAGS, k=rng.randint(0, 4))
+    parts += rng.choices(EMOJI, k=rng.randint(0, 3))
+    return " ".join(parts)
+
+
+def make_tweets(
+    count: int,
+    seed: int = 0,
+    spam_ratio: float = 0.1,
+    authors: int = 5000,
+    first_id: int = 1_970_000_000_000_000_000,
+) -> List[SimpleNamespace]:
+    """`count` tweets, newest first like the search API, with string ids."""
+    rng = random.Random(seed)
+    tweets = []
+    for i in range(count):
+        # A few authors post most of the tweets, as on the real timeline
+        author = int(rng.paretovariate(1.2)) % authors
+        tweets.append(
+            SimpleNamespace(
+                id=str(first_id - i),
+                text=make_text(rng, rng.random() < spam_ratio),
+                author_id=str(author),
+            )
+        )
+    return tweets
@@ -1,7 +1,15 @@
 import pytest
 import os
+import tempfile
 from unittest.mock import patch, MagicMock
 
+# Keep persistent bot state out of the working tree during tests
+os.environ.setdefault("STATE_DIR", tempfile.mkdtemp(prefix="x-bot-test-state-"))
+# Tests that need warm state open their own store
+os.environ.setdefault("WARM_STATE_DB", "")
+# Exchange price sources are only used by tests that set them up
+os.environ.setdefault("PRICE_SOURCES", "coingecko")
+
 
 @pytest.fixture(autouse=True)
 def mock_google_cloud():
@@ -41,3 +49,12 @@ def test_env():
     # Restore original value
     if old_value:
         os.environ["GOOGLE_CLOUD_PROJECT"] = old_value
+
+
+@pytest.fixture(autouse=True)
+def reset_circuit_breakers():
+    """Give every test closed circuit breakers"""
+    from src.resilience import circuit_breakers
+
+    circuit_breakers.reset()
+    yield
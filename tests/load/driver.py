@@ -0,0 +1,210 @@
+"""
+Load driver: runs the real EngagementBot, over real HTTP, against the local fake
+X API and CoinGecko server, then reports throughput, tail latency and wasted
+calls (429s, server errors, stalls and duplicate-content rejections).
+
+    python -m tests.load.driver --runs 5 --mode async --latency 0.05,0.5 \\
+        --error-rate 0.02 --limits "create_tweet=40/60,search=20/60"
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from tests.load.fake_api import FakeApi, FakeApiServer, add_arguments, config_from_args
+
+# Client-side budgets generous enough that the fake server's limits decide
+UNLIMITED = "create_tweet=100000/1,like=100000/1,retweet=100000/1,search=100000/1"
+
+
+def configure_environment(server: FakeApiServer, args: argparse.Namespace) -> None:
+    """Point the bot at the fake server; must run before `src` is imported"""
+    os.environ.update(
+        X_API_BASE_URL=server.url,
+        COINGECKO_BASE_URL=f"{server.url}/api/v3",
+        PRICE_SOURCES="coingecko",
+        STATE_DIR=tempfile.mkdtemp(prefix="x-bot-load-"),
+        WARMUP_URLS="",
+        RATE_LIMITS=args.client_limits,
+        RATE_LIMIT_PER_MINUTE=str(args.bot_limit),
+        RATE_LIMIT_WAIT_SECONDS=str(args.wait),
+        ENGAGEMENT_MAX_TWEETS=str(args.max_tweets),
+        ENGAGEMENT_CONCURRENCY=str(args.concurrency),
+    )
+    os.environ.pop("GOOGLE_CLOUD_PROJECT", None)
+
+
+def histogram_quantile(buckets: List[Tuple[float, float]], q: float) -> float:
+    """Prometheus-style quantile from cumulative (upper bound, count) buckets"""
+    total = buckets[-1][1]
+    if not total:
+        return math.nan
+    rank = q * total
+    lower, below = 0.0, 0.0
+    for upper, count in buckets:
+        if count >= rank:
+            if math.isinf(upper):
+                return lower
+            return lower + (upper - lower) * (rank - below) / max(count - below, 1)
+        lower, below = upper, count
+    return lower
+
+
+def call_latencies() -> Dict[str, Dict[str, Any]]:
+    """Per external endpoint: calls by outcome and p50/p95/p99 latency"""
+    from prometheus_client import REGISTRY
+
+    buckets: Dict[str, Dict[float, float]] = {}
+    outcomes: Dict[str, Dict[str, int]] = {}
+    for metric in REGISTRY.collect():
+        if metric.name != "external_call_seconds":
+            continue
+        for sample in metric.samples:
+            key = f"{sample.labels['service']}:{sample.labels['endpoint']}"
+            if sample.name.endswith("_bucket"):
+                bound = float(sample.labels["le"])
+                per_key = buckets.setdefault(key, {})
+                per_key[bound] = per_key.get(bound, 0) + sample.value
+            elif sample.name.endswith("_count"):
+                counts = outcomes.setdefault(key, {})
+                counts[sample.labels["outcome"]] = int(sample.value)
+    report = {}
+    for key, by_bound in sorted(buckets.items()):
+        cumulative = sorted(by_bound.items())
+        report[key] = {
+            "calls": outcomes.get(key, {}),
+            **{f"p{q}": histogram_quantile(cumulative, q / 100) for q in (50, 95, 99)},
+        }
+    return report
+
+
+async def run_async(bot: Any, runs: int, interval: float) -> None:
+    from src.http_session import close_session
+
+    try:
+        for run in range(runs):
+            if run:
+                await asyncio.sleep(interval)
+            await bot.engage_with_tweets_async()
+            if bot.market is not None:
+                await asyncio.to_thread(bot.post_market_update)
+    finally:
+        await close_session()
+
+
+def run_sync(bot: Any, runs: int, interval: float) -> None:
+    for run in range(runs):
+        if run:
+            time.sleep(interval)
+        bot.engage_with_tweets()
+        if bot.market is not None:
+            bot.post_market_update()
+
+
+def drive(args: argparse.Namespace) -> Dict[str, Any]:
+    server = FakeApiServer(FakeApi(config_from_args(args))).start()
+    try:
+        configure_environment(server, args)
+        from loguru import logger
+        from src.engagement import EngagementBot
+        from src.telemetry import telemetry
+
+        logger.remove()
+        logger.add(sys.stderr, level=args.log_level)
+
+        bot = EngagementBot()
+        if not args.market:
+            bot.market = None
+        start = time.perf_counter()
+        if args.mode == "async":
+            asyncio.run(run_async(bot, args.runs, args.interval))
+        else:
+            run_sync(bot, args.runs, args.interval)
+        elapsed = time.perf_counter() - start
+
+        jobs = telemetry.summary()
+        server_stats = server.api.stats_dict()
+    finally:
+        server.stop()
+
+    actions: Dict[str, int] = {}
+    for job in jobs.values():
+        for action, count in job["actions"].items():
+            actions[action] = actions.get(action, 0) + count
+    wasted = {
+        f"{endpoint}:{status}": count
+        for endpoint, statuses in server_stats.items()
+        for status, count in statuses.items()
+        if not status.startswith("2")
+    }
+    return {
+        "mode": args.mode,
+        "runs": args.runs,
+        "seconds": elapsed,
+        "actions": actions,
+        "actions_per_second": sum(actions.values()) / elapsed if elapsed else 0.0,
+        "jobs": jobs,
+        "calls": call_latencies(),
+        "server": server_stats,
+        "wasted_calls": sum(wasted.values()),
+        "wasted": wasted,
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(
+        f"\n{report['runs']} {report['mode']} runs in {report['seconds']:.2f}s: "
+        f"{report['actions_per_second']:.1f} actions/s {report['actions']}"
+    )
+    for name, job in report["jobs"].items():
+        print(
+            f"  job {name:<16} p50 {fmt(job['duration_p50'])} "
+            f"p95 {fmt(job['duration_p95'])} p99 {fmt(job['duration_p99'])} "
+            f"errors {job['errors']}"
+        )
+    print(f"\n{'endpoint':<28} {'p50':>8} {'p95':>8} {'p99':>8}  calls by outcome")
+    for key, call in report["calls"].items():
+        print(
+            f"{key:<28} {fmt(call['p50'])} {fmt(call['p95'])} {fmt(call['p99'])}  "
+            f"{call['calls']}"
+        )
+    print(f"\nwasted calls: {report['wasted_calls']} {report['wasted']}")
+
+
+def fmt(seconds: Optional[float]) -> str:
+    if seconds is None or math.isnan(seconds):
+        return f"{'-':>8}"
+    return f"{seconds * 1000:>6.0f}ms"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--mode", choices=["sync", "async"], default="async")
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--market", action="store_true", help="post market updates")
+    parser.add_argument("--max-tweets", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--client-limits", default=UNLIMITED)
+    parser.add_argument("--bot-limit", type=int, default=100000)
+    parser.add_argument("--wait", type=float, default=5.0)
+    parser.add_argument("--log-level", default="CRITICAL")
+    parser.add_argument("--json", metavar="PATH", help="also write the report here")
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    report = drive(args)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
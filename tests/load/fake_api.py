@@ -0,0 +1,394 @@
+"""
+Local stand-in for the X API v2 and CoinGecko endpoints the bot calls, for load
+and fault testing over real HTTP. Latency, error and stall rates, per-endpoint
+rate limits (429 with x-rate-limit-* headers) and duplicate-content rejections
+are configurable; every response is counted by endpoint and status.
+
+    python -m tests.load.fake_api --port 8765 --latency 0.05,0.4 --error-rate 0.02
+
+then run the bot with X_API_BASE_URL=http://127.0.0.1:8765 and
+COINGECKO_BASE_URL=http://127.0.0.1:8765/api/v3.
+"""
+
+import argparse
+import asyncio
+import math
+import random
+import socket
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+from aiohttp import web
+from tests.benchmarks.corpus import make_tweets
+
+CREATE_TWEET, LIKE, RETWEET, SEARCH = "create_tweet", "like", "retweet", "search"
+TRENDING, SIMPLE_PRICE = "trending", "simple_price"
+FIRST_TWEET_ID = 1_970_000_000_000_000_000
+# Z score of the 99th percentile, to turn (median, p99) into a lognormal
+Z99 = 2.326
+
+
+@dataclass
+class Behavior:
+    """How one endpoint misbehaves. Latency is lognormal from (median, p99)."""
+
+    latency: Tuple[float, float] = (0.0, 0.0)
+    error_rate: float = 0.0
+    # Share of requests that hang for `stall_seconds`, to trip client timeouts
+    stall_rate: float = 0.0
+    stall_seconds: float = 30.0
+    # (requests, window seconds); exceeding it answers 429 until the reset
+    limit: Optional[Tuple[int, float]] = None
+
+    def delay(self, rng: random.Random) -> float:
+        median, p99 = self.latency
+        if median <= 0:
+            return 0.0
+        sigma = math.log(max(p99, median) / median) / Z99
+        return rng.lognormvariate(math.log(median), sigma)
+
+
+@dataclass
+class FakeApiConfig:
+    default: Behavior = field(default_factory=Behavior)
+    endpoints: Dict[str, Behavior] = field(default_factory=dict)
+    # X rejects a tweet whose text matches one the account posted recently
+    reject_duplicates: bool = True
+    duplicate_window: float = 86400.0
+    # Search timeline: tweets available at start and new tweets per second
+    backlog: int = 500
+    tweet_rate: float = 5.0
+    seed: int = 0
+
+    def behavior(self, endpoint: str) -> Behavior:
+        return self.endpoints.get(endpoint, self.default)
+
+
+class Window:
+    """Fixed-window request counter mirroring X's x-rate-limit-* headers."""
+
+    def __init__(self, requests: int, period: float) -> None:
+        self.requests = requests
+        self.period = period
+        self.reset = time.time() + period
+        self.used = 0
+
+    def take(self) -> Tuple[bool, Dict[str, str]]:
+        now = time.time()
+        if now >= self.reset:
+            self.reset, self.used = now + self.period, 0
+        allowed = self.used < self.requests
+        if allowed:
+            self.used += 1
+        headers = {
+            "x-rate-limit-limit": str(self.requests),
+            "x-rate-limit-remaining": str(self.requests - self.used),
+            "x-rate-limit-reset": str(int(math.ceil(self.reset))),
+        }
+        return allowed, headers
+
+
+class Timeline:
+    """A growing stream of synthetic tweets, newest first, with X-style ids."""
+
+    def __init__(self, backlog: int, rate: float, seed: int) -> None:
+        self.pool = make_tweets(max(backlog, 1000), seed=seed)
+        self.backlog = backlog
+        self.rate = rate
+        self.started = time.monotonic()
+
+    def count(self) -> int:
+        return self.backlog + int((time.monotonic() - self.started) * self.rate)
+
+    def tweet(self, index: int) -> Dict[str, Any]:
+        source = self.pool[index % len(self.pool)]
+        tweet_id = str(FIRST_TWEET_ID + index)
+        return {
+            "id": tweet_id,
+            "text": source.text,
+            "author_id": source.author_id,
+            "edit_history_tweet_ids": [tweet_id],
+        }
+
+    def page(
+        self, max_results: int, since_id: Optional[str], next_token: Optional[str]
+    ) -> Dict[str, Any]:
+        top = int(next_token) if next_token else self.count() - 1
+        floor = int(since_id) - FIRST_TWEET_ID + 1 if since_id else 0
+        bottom = max(floor, top - max_results + 1)
+        data = [self.tweet(i) for i in range(top, bottom - 1, -1)]
+        meta: Dict[str, Any] = {"result_count": len(data)}
+        if data:
+            meta.update(newest_id=data[0]["id"], oldest_id=data[-1]["id"])
+        if bottom > floor:
+            meta["next_token"] = str(bottom - 1)
+        body: Dict[str, Any] = {"meta": meta}
+        if data:
+            body["data"] = data
+        return body
+
+
+class FakeApi:
+    """aiohttp application state: behaviour, rate windows and response counts."""
+
+    def __init__(self, config: Optional[FakeApiConfig] = None) -> None:
+        self.config = config or FakeApiConfig()
+        self.rng = random.Random(self.config.seed)
+        self.timeline = Timeline(
+            self.config.backlog, self.config.tweet_rate, self.config.seed
+        )
+        self.windows: Dict[str, Window] = {}
+        self.posted: Dict[str, float] = {}
+        self.next_id = FIRST_TWEET_ID * 2
+        # (endpoint, status or "duplicate"/"stalled") -> responses
+        self.stats: Counter = Counter()
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.add_routes(
+            [
+                web.post("/2/tweets", self.create_tweet),
+                web.post("/2/users/{user_id}/likes", self.like),
+                web.post("/2/users/{user_id}/retweets", self.retweet),
+                web.get("/2/tweets/search/recent", self.search),
+                web.get("/api/v3/search/trending", self.trending),
+                web.get("/api/v3/simple/price", self.simple_price),
+                web.get("/stats", self.stats_view),
+            ]
+        )
+        return app
+
+    async def _admit(self, endpoint: str) -> Tuple[Optional[web.Response], Dict]:
+        """Apply latency, stalls, errors and rate limits; a response means refused"""
+        behavior = self.config.behavior(endpoint)
+        delay = behavior.delay(self.rng)
+        if behavior.stall_rate and self.rng.random() < behavior.stall_rate:
+            self.stats[endpoint, "stalled"] += 1
+            delay = behavior.stall_seconds
+        if delay:
+            await asyncio.sleep(delay)
+        headers: Dict[str, str] = {}
+        if behavior.limit is not None:
+            window = self.windows.get(endpoint)
+            if window is None:
+                window = self.windows[endpoint] = Window(*behavior.limit)
+            allowed, headers = window.take()
+            if not allowed:
+                return self._error(endpoint, 429, "Too Many Requests", headers), {}
+        if behavior.error_rate and self.rng.random() < behavior.error_rate:
+            return self._error(endpoint, 503, "Service Unavailable", headers), {}
+        return None, headers
+
+    def _error(
+        self, endpoint: str, status: int, title: str, headers: Dict[str, str]
+    ) -> web.Response:
+        self.stats[endpoint, status] += 1
+        body = {"title": title, "detail": title, "status": status}
+        return web.json_response(body, status=status, headers=headers)
+
+    def _ok(
+        self, endpoint: str, body: Any, headers: Dict[str, str], status: int = 200
+    ) -> web.Response:
+        self.stats[endpoint, status] += 1
+        return web.json_response(body, status=status, headers=headers)
+
+    async def create_tweet(self, request: web.Request) -> web.Response:
+        refused, headers = await self._admit(CREATE_TWEET)
+        if refused is not None:
+            return refused
+        text = (await request.json()).get("text", "")
+        now = time.monotonic()
+        posted = self.posted.get(text)
+        if (
+            self.config.reject_duplicates
+            and posted is not None
+            and now - posted < self.config.duplicate_window
+        ):
+            self.stats[CREATE_TWEET, "duplicate"] += 1
+            body = {
+                "title": "Forbidden",
+                "detail": "You are not allowed to create a Tweet with duplicate "
+                "content.",
+                "status": 403,
+            }
+            return web.json_response(body, status=403, headers=headers)
+        self.posted[text] = now
+        self.next_id += 1
+        body = {"data": {"id": str(self.next_id), "text": text}}
+        return self._ok(CREATE_TWEET, body, headers, status=201)
+
+    async def like(self, request: web.Request) -> web.Response:
+        refused, headers = await self._admit(LIKE)
+        if refused is not None:
+            return refused
+        return self._ok(LIKE, {"data": {"liked": True}}, headers)
+
+    async def retweet(self, request: web.Request) -> web.Response:
+        refused, headers = await self._admit(RETWEET)
+        if refused is not None:
+            return refused
+        return self._ok(RETWEET, {"data": {"retweeted": True}}, headers)
+
+    async def search(self, request: web.Request) -> web.Response:
+        refused, headers = await self._admit(SEARCH)
+        if refused is not None:
+            return refused
+        query = request.query
+        max_results = min(100, max(10, int(query.get("max_results", 10))))
+        body = self.timeline.page(
+            max_results, query.get("since_id"), query.get("next_token")
+        )
+        return self._ok(SEARCH, body, headers)
+
+    async def trending(self, request: web.Request) -> web.Response:
+        refused, headers = await self._admit(TRENDING)
+        if refused is not None:
+            return refused
+        coins = ["dogwifhat", "bonk", "pepe", "floki", "shiba-inu", "wif-dog"]
+        body = {"coins": [{"item": {"id": coin}} for coin in coins]}
+        return self._ok(TRENDING, body, headers)
+
+    async def simple_price(self, request: web.Request) -> web.Response:
+        refused, headers = await self._admit(SIMPLE_PRICE)
+        if refused is not None:
+            return refused
+        ids = [coin for coin in request.query.get("ids", "").split(",") if coin]
+        currencies = request.query.get("vs_currencies", "usd").split(",")
+        body = {
+            coin: {
+                currency: round(self.rng.uniform(0.0001, 5), 6)
+                for currency in currencies
+            }
+            for coin in ids
+        }
+        return self._ok(SIMPLE_PRICE, body, headers)
+
+    async def stats_view(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats_dict())
+
+    def stats_dict(self) -> Dict[str, Dict[str, int]]:
+        stats: Dict[str, Dict[str, int]] = {}
+        for (endpoint, status), count in sorted(self.stats.items(), key=str):
+            stats.setdefault(endpoint, {})[str(status)] = count
+        return stats
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class FakeApiServer:
+    """Runs a FakeApi on 127.0.0.1 in a background thread with its own loop."""
+
+    def __init__(self, api: Optional[FakeApi] = None, port: int = 0) -> None:
+        self.api = api or FakeApi()
+        self.port = port or free_port()
+        self._loop = asyncio.new_event_loop()
+        self._runner: Optional[web.AppRunner] = None
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="fake-api", daemon=True
+        )
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    async def _start(self) -> None:
+        self._runner = web.AppRunner(self.api.app(), access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, "127.0.0.1", self.port).start()
+
+    def start(self) -> "FakeApiServer":
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result(10)
+        return self
+
+    def stop(self) -> None:
+        if self._runner is not None:
+            asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(
+                10
+            )
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(10)
+
+    def __enter__(self) -> "FakeApiServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+def parse_pair(spec: str) -> Tuple[float, float]:
+    first, _, second = spec.partition(",")
+    return float(first), float(second or first)
+
+
+def parse_limits(spec: str) -> Dict[str, Tuple[int, float]]:
+    """ "search=180/900,like=50/900" -> {"search": (180, 900.0), ...}"""
+    limits = {}
+    for item in spec.split(","):
+        name, _, budget = item.partition("=")
+        if not budget:
+            continue
+        requests, _, period = budget.partition("/")
+        limits[name.strip()] = (int(requests), float(period))
+    return limits
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency", default="0,0", help="median,p99 seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--stall-rate", type=float, default=0.0)
+    parser.add_argument("--stall-seconds", type=float, default=30.0)
+    parser.add_argument(
+        "--limits", default="", help='server budgets, e.g. "search=180/900"'
+    )
+    parser.add_argument("--allow-duplicates", action="store_true")
+    parser.add_argument("--backlog", type=int, default=500)
+    parser.add_argument("--tweet-rate", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def config_from_args(args: argparse.Namespace) -> FakeApiConfig:
+    default = Behavior(
+        latency=parse_pair(args.latency),
+        error_rate=args.error_rate,
+        stall_rate=args.stall_rate,
+        stall_seconds=args.stall_seconds,
+    )
+    endpoints = {
+        name: Behavior(
+            latency=default.latency,
+            error_rate=default.error_rate,
+            stall_rate=default.stall_rate,
+            stall_seconds=default.stall_seconds,
+            limit=limit,
+        )
+        for name, limit in parse_limits(args.limits).items()
+    }
+    return FakeApiConfig(
+        default=default,
+        endpoints=endpoints,
+        reject_duplicates=not args.allow_duplicates,
+        backlog=args.backlog,
+        tweet_rate=args.tweet_rate,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8765)
+    add_arguments(parser)
+    args = parser.parse_args()
+    api = FakeApi(config_from_args(args))
+    print(f"Fake X API and CoinGecko on http://127.0.0.1:{args.port}")
+    web.run_app(api.app(), host="127.0.0.1", port=args.port, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,26 @@
+import asyncio
+import time
 import pytest
-from unittest.mock import Mock, patch
-from src.engagement import EngagementBot
-from src.twitter_client import TwitterClient
+from unittest.mock import AsyncMock, Mock, patch
+from src.engagement import ENGAGEMENT_QUERY, EngagementBot
+from src.twitter_client import AsyncTwitterClient, TwitterClient
 from src.market_data import MarketData
-from src.rate_limiter import RateLimiter
+from src.rate_limiter import RateLimiter, RateLimiterRegistry
+from src.seen_store import SeenTweetStore
 from src.spam_detector import SpamDetector
 
 
+def not_spam(texts, author_ids):
+    return [False] * len(texts)
+
+
 class TestEngagementBot:
     @pytest.fixture
     def mock_components(self):
         """Create mocked components for testing"""
         mock_twitter = Mock(spec=TwitterClient)
         mock_market = Mock(spec=MarketData)
+        mock_market.get_price_changes.return_value = {}
         mock_rate_limiter = Mock(spec=RateLimiter)
         mock_spam_detector = Mock(spec=SpamDetector)
 
@@ -39,6 +47,10 @@ class TestEngagementBot:
                 "src.engagement.SpamDetector",
                 return_value=mock_components["spam_detector"],
             ),
+            patch(
+                "src.engagement.SeenTweetStore",
+                return_value=SeenTweetStore(":memory:"),
+            ),
         ):
             return EngagementBot()
 
@@ -47,7 +59,9 @@ class TestEngagementBot:
         # Setup mocks
         mock_components["rate_limiter"].can_request.return_value = True
         mock_components["market"].get_trending_coins.return_value = ["bitcoin"]
-        mock_components["market"].get_coin_price.return_value = 50000
+        mock_components["market"].get_coin_prices.return_value = {
+            "bitcoin": {"usd": 50000}
+        }
         mock_components["twitter"].post_tweet.return_value = "tweet_id_123"
 
         # Execute
@@ -58,6 +72,23 @@ class TestEngagementBot:
         assert "Bitcoin" in mock_components["twitter"].post_tweet.call_args[0][0]
         assert "$50000" in mock_components["twitter"].post_tweet.call_args[0][0]
 
+    def test_post_market_update_includes_price_changes(self, bot, mock_components):
+        """Test recorded price history adds 1h/24h changes to the post"""
+        mock_components["rate_limiter"].can_request.return_value = True
+        mock_components["market"].get_trending_coins.return_value = ["bitcoin"]
+        mock_components["market"].get_coin_prices.return_value = {
+            "bitcoin": {"usd": 50000}
+        }
+        mock_components["market"].get_price_changes.return_value = {
+            3600: 2.54,
+            86400: -1.0,
+        }
+
+        bot.post_market_update()
+
+        text = mock_components["twitter"].post_tweet.call_args[0][0]
+        assert "$50000 USD (+2.5% 1h, -1.0% 24h)." in text
+
     def test_post_market_update_rate_limited(self, bot, mock_components):
         """Test market update when rate limited"""
         mock_components["rate_limiter"].can_request.return_value = False
@@ -82,22 +113,37 @@ class TestEngagementBot:
         """Test market update when price fetch fails"""
         mock_components["rate_limiter"].can_request.return_value = True
         mock_components["market"].get_trending_coins.return_value = ["bitcoin"]
-        mock_components["market"].get_coin_price.return_value = None
+        mock_components["market"].get_coin_prices.return_value = {}
 
         bot.post_market_update()
 
-        mock_components["market"].get_coin_price.assert_called_once_with("bitcoin")
+        mock_components["market"].get_coin_prices.assert_called_once_with(
+            ["bitcoin"], ["usd"]
+        )
         mock_components["twitter"].post_tweet.assert_not_called()
 
+    def test_post_market_update_prices_trending_set_once(self, bot, mock_components):
+        """Test the trending set is priced in one call and the first priced coin wins"""
+        mock_components["rate_limiter"].can_request.return_value = True
+        mock_components["market"].get_trending_coins.return_value = ["foo", "bar"]
+        mock_components["market"].get_coin_prices.return_value = {"bar": {"usd": 2}}
+        mock_components["twitter"].post_tweet.return_value = "tweet_id_123"
+
+        bot.post_market_update()
+
+        mock_components["market"].get_coin_prices.assert_called_once()
+        mock_components["market"].get_coin_price.assert_not_called()
+        assert "Bar" in mock_components["twitter"].post_tweet.call_args[0][0]
+
     def test_engage_with_tweets_success(self, bot, mock_components):
         """Test successful tweet engagement"""
         # Setup mocks
         mock_components["rate_limiter"].can_request.return_value = True
-        mock_components["spam_detector"].is_spam.return_value = False
+        mock_components["spam_detector"].is_spam_batch.side_effect = not_spam
         mock_tweet = Mock()
         mock_tweet.id = "tweet_123"
         mock_tweet.text = "Great crypto project!"
-        mock_components["twitter"].search_tweets.return_value = [mock_tweet]
+        mock_components["twitter"].iter_search_pages.return_value = iter([[mock_tweet]])
         mock_components["twitter"].like_tweet.return_value = True
         mock_components["twitter"].reply_to_tweet.return_value = "reply_456"
 
@@ -105,18 +151,18 @@ class TestEngagementBot:
         bot.engage_with_tweets()
 
         # Verify
-        mock_components["twitter"].search_tweets.assert_called_once()
+        mock_components["twitter"].iter_search_pages.assert_called_once()
         mock_components["twitter"].like_tweet.assert_called_once_with("tweet_123")
         mock_components["twitter"].reply_to_tweet.assert_called_once()
 
     def test_engage_with_tweets_spam_filtered(self, bot, mock_components):
         """Test that spam tweets are filtered out"""
         mock_components["rate_limiter"].can_request.return_value = True
-        mock_components["spam_detector"].is_spam.return_value = True
+        mock_components["spam_detector"].is_spam_batch.return_value = [True]
         mock_tweet = Mock()
         mock_tweet.id = "tweet_123"
         mock_tweet.text = "SPAM CONTENT"
-        mock_components["twitter"].search_tweets.return_value = [mock_tweet]
+        mock_components["twitter"].iter_search_pages.return_value = iter([[mock_tweet]])
 
         bot.engage_with_tweets()
 
@@ -124,6 +170,63 @@ class TestEngagementBot:
         mock_components["twitter"].like_tweet.assert_not_called()
         mock_components["twitter"].reply_to_tweet.assert_not_called()
 
+    def test_engage_with_tweets_skips_handled_tweets(self, bot, mock_components):
+        """Test a second run resumes from since_id and skips handled tweets"""
+        mock_components["rate_limiter"].can_request.return_value = True
+        mock_components["spam_detector"].is_spam_batch.side_effect = not_spam
+        mock_tweet = Mock()
+        mock_tweet.id = "1001"
+        mock_tweet.text = "Great crypto project!"
+        mock_components["twitter"].iter_search_pages.return_value = iter([[mock_tweet]])
+        mock_components["twitter"].reply_to_tweet.return_value = "reply_456"
+
+        bot.engage_with_tweets()
+        mock_components["twitter"].iter_search_pages.return_value = iter([[mock_tweet]])
+        bot.engage_with_tweets()
+
+        mock_components["twitter"].like_tweet.assert_called_once_with("1001")
+        second_call = mock_components["twitter"].iter_search_pages.call_args_list[1]
+        assert second_call[1]["since_id"] == "1001"
+
+    def test_engage_with_tweets_stops_consuming_stream(self, bot, mock_components):
+        """Test a rate-limited run stops pulling tweets from the search stream"""
+        mock_components["rate_limiter"].can_request.side_effect = [True, False]
+        mock_components["spam_detector"].is_spam_batch.side_effect = not_spam
+        mock_components["twitter"].reply_to_tweet.return_value = "reply"
+        pulled = []
+
+        def stream(*args, **kwargs):
+            for i in range(100):
+                tweet = Mock(id=str(2000 + i), text="crypto")
+                pulled.append(tweet.id)
+                yield [tweet]
+
+        mock_components["twitter"].iter_search_pages.side_effect = stream
+
+        bot.engage_with_tweets()
+
+        assert pulled == ["2000", "2001"]
+        # 2001 was fetched but rate limited, so the next run must see it again
+        assert bot.seen.get_since_id(ENGAGEMENT_QUERY) == "2000"
+        assert "2001" not in bot.seen
+
+    def test_engage_with_tweets_scores_page_as_batch(self, bot, mock_components):
+        """Test each search page is spam-checked in one call"""
+        mock_components["rate_limiter"].can_request.return_value = True
+        mock_components["spam_detector"].is_spam_batch.return_value = [True, False]
+        mock_components["twitter"].reply_to_tweet.return_value = "reply"
+        page = [Mock(id="3000", text="scam"), Mock(id="3001", text="gm")]
+        mock_components["twitter"].iter_search_pages.return_value = iter([page])
+
+        bot.engage_with_tweets()
+
+        mock_components["spam_detector"].is_spam_batch.assert_called_once()
+        assert mock_components["spam_detector"].is_spam_batch.call_args[0][0] == [
+            "scam",
+            "gm",
+        ]
+        mock_components["twitter"].like_tweet.assert_called_once_with("3001")
+
     def test_promote_community_success(self, bot, mock_components):
         """Test successful community promotion"""
         mock_components["rate_limiter"].can_request.return_value = True
@@ -138,3 +241,144 @@ class TestEngagementBot:
 
 def test_engage_with_tweets():
     assert True
+
+
+class TestAsyncEngagement:
+    @pytest.fixture
+    def components(self):
+        """Mocked components with an async Twitter client on a private registry"""
+        async_twitter = Mock(spec=AsyncTwitterClient)
+        async_twitter.limits = RateLimiterRegistry()
+        rate_limiter = Mock(spec=RateLimiter)
+        rate_limiter.acquire = AsyncMock(return_value=True)
+        spam_detector = Mock(spec=SpamDetector)
+        spam_detector.is_spam_batch.side_effect = not_spam
+        return {
+            "async_twitter": async_twitter,
+            "rate_limiter": rate_limiter,
+            "spam_detector": spam_detector,
+        }
+
+    @pytest.fixture
+    def bot(self, components):
+        return EngagementBot(
+            twitter=Mock(spec=TwitterClient),
+            market=Mock(spec=MarketData),
+            seen=SeenTweetStore(":memory:"),
+            **components,
+        )
+
+    @staticmethod
+    def make_tweets(count):
+        """Stand-in for iter_search_pages streaming `count` tweets in one page"""
+
+        async def stream(*args, **kwargs):
+            page = []
+            for i in range(count):
+                tweet = Mock()
+                tweet.id = f"tweet_{i}"
+                tweet.text = "Great crypto project!"
+                page.append(tweet)
+            yield page
+
+        return stream
+
+    @pytest.mark.asyncio
+    async def test_actions_run_concurrently(self, bot, components):
+        """Test a batch takes about one round trip instead of 2 x N"""
+        async_twitter = components["async_twitter"]
+
+        async def slow_like(tweet_id):
+            await asyncio.sleep(0.05)
+            return True
+
+        async def slow_reply(tweet_id, text):
+            await asyncio.sleep(0.05)
+            return f"reply_{tweet_id}"
+
+        async_twitter.iter_search_pages = self.make_tweets(5)
+        async_twitter.like_tweet = AsyncMock(side_effect=slow_like)
+        async_twitter.reply_to_tweet = AsyncMock(side_effect=slow_reply)
+
+        start = time.perf_counter()
+        await bot.engage_with_tweets_async()
+        elapsed = time.perf_counter() - start
+
+        assert async_twitter.like_tweet.await_count == 5
+        assert async_twitter.reply_to_tweet.await_count == 5
+        assert elapsed < 0.25
+
+    @pytest.mark.asyncio
+    async def test_concurrency_bounded_by_budget(self, bot, components):
+        """Test in-flight tweets never exceed the remaining like budget"""
+        async_twitter = components["async_twitter"]
+        async_twitter.limits.configure("like", 2, 900)
+        in_flight, peak = 0, 0
+
+        async def like(tweet_id):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return True
+
+        async_twitter.iter_search_pages = self.make_tweets(6)
+        async_twitter.like_tweet = AsyncMock(side_effect=like)
+        async_twitter.reply_to_tweet = AsyncMock(return_value="reply")
+
+        await bot.engage_with_tweets_async()
+
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_tweets_skipped(self, bot, components):
+        """Test tweets without a bot-wide token are not engaged"""
+        async_twitter = components["async_twitter"]
+        components["rate_limiter"].acquire = AsyncMock(return_value=False)
+        async_twitter.iter_search_pages = self.make_tweets(2)
+        async_twitter.like_tweet = AsyncMock()
+        async_twitter.reply_to_tweet = AsyncMock()
+
+        await bot.engage_with_tweets_async()
+
+        async_twitter.like_tweet.assert_not_called()
+        async_twitter.reply_to_tweet.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_seen_ids_written_in_one_batch(self, bot, components):
+        """Test handled tweets are marked seen in one write, not one per tweet"""
+        async_twitter = components["async_twitter"]
+        async_twitter.iter_search_pages = self.make_tweets(5)
+        async_twitter.like_tweet = AsyncMock(return_value=True)
+        async_twitter.reply_to_tweet = AsyncMock(return_value="reply")
+
+        with patch.object(bot.seen, "mark_seen", wraps=bot.seen.mark_seen) as mark:
+            await bot.engage_with_tweets_async()
+
+        mark.assert_called_once()
+        assert all(f"tweet_{i}" in bot.seen for i in range(5))
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_tweet_fetched_next_run(self, bot, components):
+        """Test since_id stops below a tweet left unhandled for lack of budget"""
+        async_twitter = components["async_twitter"]
+        components["rate_limiter"].acquire = AsyncMock(
+            side_effect=[True, False, True, True]
+        )
+        async_twitter.like_tweet = AsyncMock(return_value=True)
+        async_twitter.reply_to_tweet = AsyncMock(return_value="reply")
+        since_ids = []
+
+        async def search(query, since_id=None, **kwargs):
+            since_ids.append(since_id)
+            yield [Mock(id=str(i), text="gm") for i in (3003, 3002, 3001)]
+
+        async_twitter.iter_search_pages = search
+
+        await bot.engage_with_tweets_async()
+        await bot.engage_with_tweets_async()
+
+        engaged = [c.args[0] for c in async_twitter.like_tweet.await_args_list]
+        assert sorted(engaged) == ["3001", "3002", "3003"]
+        assert since_ids[1] == "3001"
@@ -0,0 +1,74 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from src.cache import TTLCache
+
+
+class TestTTLCache:
+    @pytest.fixture
+    def cache(self):
+        """Create a small cache instance"""
+        return TTLCache("test", max_entries=2)
+
+    @pytest.mark.asyncio
+    async def test_miss_then_hit(self, cache):
+        """Test a second lookup is served without calling fetch"""
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            return "value"
+
+        assert await cache.get_or_fetch("k", fetch, ttl=60) == "value"
+        assert await cache.get_or_fetch("k", fetch, ttl=60) == "value"
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cached(self, cache):
+        """Test a failing fetch propagates and leaves no entry"""
+
+        async def fetch():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            await cache.get_or_fetch("k", fetch, ttl=60)
+        assert len(cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_stale_value_served_while_refreshing(self, cache):
+        """Test stale entries are returned immediately and refreshed in background"""
+        values = iter(["old", "new"])
+
+        async def fetch():
+            return next(values)
+
+        with patch("src.cache.time.monotonic", return_value=0):
+            await cache.get_or_fetch("k", fetch, ttl=10, stale_ttl=100)
+        with patch("src.cache.time.monotonic", return_value=50):
+            assert await cache.get_or_fetch("k", fetch, ttl=10, stale_ttl=100) == "old"
+            await asyncio.sleep(0)
+            assert cache.get("k") == "new"
+
+    @pytest.mark.asyncio
+    async def test_expired_past_stale_window_refetches(self, cache):
+        """Test entries past the stale window are treated as misses"""
+        values = iter(["old", "new"])
+
+        async def fetch():
+            return next(values)
+
+        with patch("src.cache.time.monotonic", return_value=0):
+            await cache.get_or_fetch("k", fetch, ttl=10, stale_ttl=10)
+        with patch("src.cache.time.monotonic", return_value=50):
+            assert await cache.get_or_fetch("k", fetch, ttl=10, stale_ttl=10) == "new"
+
+    def test_lru_eviction(self, cache):
+        """Test the least recently used entry is evicted when full"""
+        cache.set("a", 1, ttl=60)
+        cache.set("b", 2, ttl=60)
+        cache.get("a")
+        cache.set("c", 3, ttl=60)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
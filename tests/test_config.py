@@ -0,0 +1,69 @@
+import os
+import pytest
+from unittest.mock import MagicMock, patch
+from src.config import SecretStore
+
+
+class TestSecretStore:
+    @pytest.fixture
+    def secret_client(self):
+        """Mock Secret Manager client that echoes the secret name"""
+        client = MagicMock()
+
+        def access_secret_version(request):
+            response = MagicMock()
+            name = request["name"].split("/")[3]
+            response.payload.data.decode.return_value = f"value-{name}"
+            return response
+
+        client.access_secret_version.side_effect = access_secret_version
+        with patch("src.config.get_secret_client", return_value=client):
+            yield client
+
+    def test_prefetch_loads_all_secrets(self, secret_client):
+        """Test prefetch fetches every secret once and reads hit memory"""
+        store = SecretStore(["a", "b", "c"])
+
+        store.prefetch()
+        assert secret_client.access_secret_version.call_count == 3
+
+        assert store.get("a") == "value-a"
+        assert store.get("b") == "value-b"
+        assert secret_client.access_secret_version.call_count == 3
+        store.close()
+
+    def test_unknown_secret_fetched_on_demand(self, secret_client):
+        """Test a secret not prefetched is fetched once and then cached"""
+        store = SecretStore(["a"])
+
+        assert store.get("z") == "value-z"
+        assert store.get("z") == "value-z"
+        assert secret_client.access_secret_version.call_count == 1
+        store.close()
+
+    def test_expired_secret_served_while_refreshing(self, secret_client):
+        """Test an expired value is returned and refreshed in the background"""
+        store = SecretStore(["a"], ttl=0)
+        store.prefetch()
+
+        assert store.get("a") == "value-a"
+        store.close()  # waits for the background refresh
+        assert secret_client.access_secret_version.call_count == 2
+
+    def test_failed_refresh_keeps_last_value(self, secret_client):
+        """Test a failing refresh does not drop a known secret"""
+        store = SecretStore(["a"], ttl=0)
+        store.prefetch()
+        secret_client.access_secret_version.side_effect = Exception("boom")
+
+        store._fetch("a")
+
+        assert store.get("a") == "value-a"
+        store.close()
+
+    def test_development_reads_environment(self):
+        """Test without Secret Manager values come from the environment"""
+        store = SecretStore(["a"])
+
+        with patch.dict(os.environ, {"a": "env-value"}):
+            assert store.get("a") == "env-value"
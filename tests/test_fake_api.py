@@ -0,0 +1,102 @@
+import pytest
+from unittest.mock import patch
+from src.http_session import close_session
+from src.market_data import MarketData
+from src.rate_limiter import CREATE_TWEET, SEARCH, RateLimiterRegistry
+from src.resilience import CircuitBreaker, Resilience
+from src.twitter_client import AsyncTwitterClient, TwitterClient
+from tests.load.fake_api import (
+    Behavior,
+    FakeApi,
+    FakeApiConfig,
+    FakeApiServer,
+)
+
+
+@pytest.fixture
+def fake_api():
+    """Fake X API and CoinGecko server the clients are pointed at"""
+    config = FakeApiConfig(
+        endpoints={
+            CREATE_TWEET: Behavior(limit=(2, 60)),
+            SEARCH: Behavior(limit=(1, 60)),
+        },
+        backlog=150,
+    )
+    with FakeApiServer(FakeApi(config)) as server:
+        with (
+            patch("src.config.Config.X_API_BASE_URL", server.url),
+            patch.object(MarketData, "BASE_URL", f"{server.url}/api/v3"),
+        ):
+            yield server
+
+
+class TestTwitterClientOverHttp:
+    def test_duplicate_content_is_rejected(self, fake_api):
+        """Test a repeated tweet text is refused like on X"""
+        client = TwitterClient(limits=RateLimiterRegistry())
+
+        assert client.post_tweet("gm $wifDOG")
+        assert client.post_tweet("gm $wifDOG") is None
+        assert fake_api.api.stats_dict()["create_tweet"] == {"201": 1, "duplicate": 1}
+
+    def test_429_reset_headers_pause_the_limiter(self, fake_api):
+        """Test a real 429 drains the local budget; later posts are not sent"""
+        other = TwitterClient(limits=RateLimiterRegistry())
+        other.post_tweet("first")
+        other.post_tweet("second")
+        limits = RateLimiterRegistry()
+        client = TwitterClient(limits=limits)
+
+        assert client.post_tweet("third") is None
+        assert not limits.get(CREATE_TWEET).try_acquire()
+        assert fake_api.api.stats_dict()["create_tweet"] == {"201": 2, "429": 1}
+
+    def test_learned_budget_avoids_429(self, fake_api):
+        """Test x-rate-limit headers stop the client before the server refuses"""
+        client = TwitterClient(limits=RateLimiterRegistry())
+
+        with patch("src.twitter_client.Config.RATE_LIMIT_WAIT_SECONDS", 0.01):
+            results = [client.post_tweet(f"update {n}") for n in range(3)]
+
+        assert results[2] is None
+        assert fake_api.api.stats_dict()["create_tweet"] == {"201": 2}
+
+    def test_search_pages_and_learns_budget(self, fake_api):
+        """Test search reads real pages and stops at the server's budget"""
+        limits = RateLimiterRegistry()
+        client = TwitterClient(limits=limits)
+
+        tweets = client.search_tweets("wifDOG", max_results=100)
+
+        assert len(tweets) == 100
+        assert all(tweet.author_id for tweet in tweets)
+        assert not limits.get(SEARCH).try_acquire()
+
+
+@pytest.mark.asyncio
+async def test_async_clients_over_shared_session(fake_api):
+    """Test the async X client and CoinGecko client reach the fake server"""
+    client = AsyncTwitterClient(limits=RateLimiterRegistry())
+    try:
+        assert await client.like_tweet("1")
+        trending = await MarketData()._fetch_trending()
+    finally:
+        await close_session()
+
+    assert fake_api.api.stats_dict()["like"] == {"200": 1}
+    assert "dogwifhat" in trending
+
+
+def test_breaker_stops_calls_to_failing_upstream(fake_api):
+    """Test 5xx responses are retried, then the open circuit stops calls"""
+    fake_api.api.config.endpoints["like"] = Behavior(error_rate=1.0)
+    breaker = CircuitBreaker("x-test", failure_threshold=3, reset_timeout=60)
+    resilience = Resilience(breaker, attempts=2, base_delay=0.001)
+    client = TwitterClient(limits=RateLimiterRegistry(), resilience=resilience)
+
+    for _ in range(5):
+        client.like_tweet("1")
+
+    assert fake_api.api.stats_dict()["like"] == {"503": 3}
+    assert breaker.state == "open"
@@ -0,0 +1,94 @@
+import asyncio
+import pytest
+from unittest.mock import Mock
+from prometheus_client import REGISTRY
+from src.instrumentation import (
+    ERROR,
+    OK,
+    TIMEOUT,
+    TOO_MANY_REQUESTS,
+    instrumented,
+    outcome_of,
+    timed_action,
+)
+
+
+def call_count(service, endpoint, outcome):
+    return (
+        REGISTRY.get_sample_value(
+            "external_call_seconds_count",
+            {"service": service, "endpoint": endpoint, "outcome": outcome},
+        )
+        or 0
+    )
+
+
+def in_flight(service):
+    return REGISTRY.get_sample_value("external_calls_in_flight", {"service": service})
+
+
+class TestOutcome:
+    def test_maps_errors_to_outcomes(self):
+        """Test exceptions map to the fixed set of outcome labels"""
+        throttled = Exception("Too Many Requests")
+        throttled.response = Mock(status_code=429)
+
+        assert outcome_of(None) == OK
+        assert outcome_of(throttled) == TOO_MANY_REQUESTS
+        assert outcome_of(asyncio.TimeoutError()) == TIMEOUT
+        assert outcome_of(type("ReadTimeout", (Exception,), {})()) == TIMEOUT
+        assert outcome_of(ValueError("boom")) == ERROR
+
+
+class TestInstrumented:
+    def test_sync_call_recorded_by_outcome(self):
+        """Test a sync call is timed under its endpoint and outcome"""
+
+        @instrumented("test", lambda method, route: route)
+        def request(method, route):
+            if route == "fail":
+                raise ValueError("boom")
+            return "ok"
+
+        ok_before = call_count("test", "ok-route", OK)
+        error_before = call_count("test", "fail", ERROR)
+
+        assert request("GET", "ok-route") == "ok"
+        with pytest.raises(ValueError):
+            request("GET", "fail")
+
+        assert call_count("test", "ok-route", OK) == ok_before + 1
+        assert call_count("test", "fail", ERROR) == error_before + 1
+
+    @pytest.mark.asyncio
+    async def test_async_call_tracked_in_flight(self):
+        """Test an async call counts as in flight until it completes"""
+        release = asyncio.Event()
+
+        @instrumented("test-async", "search")
+        async def request():
+            await release.wait()
+
+        task = asyncio.ensure_future(request())
+        await asyncio.sleep(0)
+        assert in_flight("test-async") == 1
+
+        release.set()
+        await task
+        assert in_flight("test-async") == 0
+        assert call_count("test-async", "search", OK) == 1
+
+
+@pytest.mark.asyncio
+async def test_timed_action_keeps_coroutine_function():
+    """Test timed actions stay awaitable and record their duration"""
+
+    @timed_action("test_action")
+    async def action():
+        return True
+
+    assert asyncio.iscoroutinefunction(action)
+    assert await action()
+    assert REGISTRY.get_sample_value(
+        "bot_action_seconds_count", {"action": "test_action", "outcome": OK}
+    )
@@ -0,0 +1,132 @@
+import io
+import json
+import threading
+import time
+import pytest
+from unittest.mock import Mock
+from loguru import logger
+from src.logger import (
+    BackgroundSink,
+    CloudLoggingBatcher,
+    LogSampler,
+    parse_sample_rates,
+    structured_writer,
+)
+
+
+def capture(sink, **kwargs):
+    """Route records to `sink` for the duration of a test"""
+    return logger.add(sink, format="{message}", **kwargs)
+
+
+def test_parse_sample_rates():
+    """Test sample rates parse, clamp to [0, 1] and skip bad entries"""
+    assert parse_sample_rates("engage_tweets=0.1, noisy=2,bad") == {
+        "engage_tweets": 0.1,
+        "noisy": 1.0,
+    }
+
+
+def test_default_handler_removed():
+    """Test loguru's stderr handler is gone, so records aren't printed twice"""
+    with pytest.raises(ValueError):
+        logger.remove(0)
+
+
+class TestLogSampler:
+    def test_samples_only_configured_info_records(self):
+        """Test dropped actions still pass warnings and unrelated records"""
+        messages = []
+        handler_id = capture(messages.append, filter=LogSampler({"engage_tweets": 0.0}))
+        try:
+            logger.info("sampled", extra={"action": "engage_tweets"})
+            logger.warning("kept", extra={"action": "engage_tweets"})
+            logger.info("other", extra={"action": "market_update"})
+        finally:
+            logger.remove(handler_id)
+
+        assert [str(m).strip() for m in messages] == ["kept", "other"]
+
+    def test_keeps_roughly_the_rate(self):
+        """Test about `rate` of the matching records are kept"""
+        messages = []
+        handler_id = capture(messages.append, filter=LogSampler({"busy": 0.25}))
+        try:
+            for i in range(2000):
+                logger.info(f"record {i}", extra={"action": "busy"})
+        finally:
+            logger.remove(handler_id)
+
+        assert 350 < len(messages) < 650
+
+
+class TestBackgroundSink:
+    def test_writes_on_writer_thread(self):
+        """Test loguru hands records to the writer thread instead of writing inline"""
+        threads = []
+        sink = BackgroundSink(lambda m: threads.append(threading.current_thread()))
+        handler_id = capture(sink)
+        try:
+            logger.info("message")
+        finally:
+            logger.remove(handler_id)
+        sink.join()
+        sink.stop()
+
+        assert threads[0].name == "log-writer"
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        """Test a stalled writer costs the caller nothing but dropped records"""
+        release = threading.Event()
+        sink = BackgroundSink(lambda m: release.wait(), max_queue=1)
+
+        start = time.perf_counter()
+        for _ in range(5):
+            sink("message")
+        elapsed = time.perf_counter() - start
+        release.set()
+        sink.stop()
+
+        assert elapsed < 0.1
+        assert sink.dropped >= 3
+
+    def test_idle_flush(self):
+        """Test flush runs once the queue has been idle for the interval"""
+        flushed = threading.Event()
+        sink = BackgroundSink(Mock(), flush=flushed.set, flush_interval=0.01)
+
+        assert flushed.wait(1)
+        sink.stop()
+
+
+class TestCloudLoggingBatcher:
+    def test_uploads_in_batches(self):
+        """Test entries are committed in one batch per batch_size"""
+        cloud_logger = Mock()
+        batcher = CloudLoggingBatcher(lambda: cloud_logger, batch_size=3, interval=60)
+
+        for i in range(7):
+            batcher.add({"message": str(i), "severity": "INFO"})
+        batcher.flush()
+
+        assert cloud_logger.batch.call_count == 3
+        batch = cloud_logger.batch.return_value
+        assert batch.log_struct.call_count == 7
+        assert batch.commit.call_count == 3
+
+
+def test_structured_writer_serializes_once():
+    """Test one JSON line per record, with the extra fields flattened"""
+    stream = io.StringIO()
+    cloud = Mock()
+    handler_id = capture(structured_writer(stream, cloud))
+    try:
+        logger.info("posted", extra={"action": "market_update", "coin": "wif"})
+    finally:
+        logger.remove(handler_id)
+
+    entry = json.loads(stream.getvalue())
+    assert entry["message"] == "posted"
+    assert entry["severity"] == "INFO"
+    assert entry["coin"] == "wif"
+    assert cloud.add.call_args[0][0]["action"] == "market_update"
@@ -0,0 +1,163 @@
+import asyncio
+import threading
+import pytest
+from datetime import datetime
+from fastapi import HTTPException
+from unittest.mock import AsyncMock, Mock, patch
+from src import main
+from src.engagement import EngagementBot
+from src.market_data import MarketData
+from src.rate_limiter import RateLimiter
+from src.scheduler import Scheduler
+from src.telemetry import JobRun, JobTelemetry
+from src.twitter_client import TwitterClient
+
+
+@pytest.fixture
+def components():
+    """Mocked bot components handed to the container"""
+    bot = Mock(spec=EngagementBot)
+    bot.twitter = Mock(spec=TwitterClient)
+    bot.rate_limiter = Mock(spec=RateLimiter)
+    bot.market = Mock(spec=MarketData)
+    scheduler = Mock(spec=Scheduler)
+    with (
+        patch("src.engagement.EngagementBot", return_value=bot),
+        patch("src.scheduler.Scheduler", return_value=scheduler),
+        patch(
+            "src.http_session.close_session", new_callable=AsyncMock
+        ) as close_session,
+        patch("src.main.Config.WARMUP_URLS", []),
+    ):
+        yield {"bot": bot, "scheduler": scheduler, "close_session": close_session}
+
+
+class TestLifespan:
+    @pytest.mark.asyncio
+    async def test_container_built_once_and_torn_down(self, components):
+        """Test lifespan creates shared instances and closes them on shutdown"""
+        async with main.lifespan(main.app):
+            container = await main.app.state.warmup
+            assert main.app.state.container is container
+            assert container.bot is components["bot"]
+            assert container.twitter is components["bot"].twitter
+            assert container.rate_limiter is components["bot"].rate_limiter
+            components["scheduler"].start.assert_called_once()
+
+        components["scheduler"].stop.assert_called_once()
+        components["close_session"].assert_awaited_once()
+        assert main.app.state.container is None
+
+    @pytest.mark.asyncio
+    async def test_endpoints_share_container_instances(self, components):
+        """Test repeated requests reuse the same client and limiter"""
+        async with main.lifespan(main.app):
+            container = await main.app.state.warmup
+            container.rate_limiter.can_request.return_value = True
+            container.twitter.post_tweet.return_value = "123"
+
+            for _ in range(2):
+                result = await main.test_post(
+                    client=main.get_twitter(container),
+                    limiter=main.get_rate_limiter(container),
+                )
+                assert result["status"] == "success"
+
+            assert container.twitter.post_tweet.call_count == 2
+            assert container.rate_limiter.can_request.call_count == 2
+
+
+class TestWarmUp:
+    @pytest.mark.asyncio
+    async def test_health_answers_before_bot_is_ready(self, components):
+        """Test /health is served while the bot is still warming up"""
+        request = Mock()
+        request.app = main.app
+        release = threading.Event()
+
+        with patch(
+            "src.main.secret_store.prefetch", side_effect=lambda: release.wait(5)
+        ):
+            async with main.lifespan(main.app):
+                assert await main.health(request) == {
+                    "status": "healthy",
+                    "ready": False,
+                }
+                with pytest.raises(HTTPException) as error:
+                    main.get_container(request)
+                assert error.value.status_code == 503
+
+                release.set()
+                await main.app.state.warmup
+                assert (await main.health(request))["ready"]
+
+    @pytest.mark.asyncio
+    async def test_failed_warm_up_reported_immediately(self, components):
+        """Test a failed warm-up is logged right away and fails /health"""
+        request = Mock()
+        request.app = main.app
+
+        with (
+            patch(
+                "src.main.secret_store.prefetch", side_effect=RuntimeError("no secrets")
+            ),
+            patch("src.main.logger") as logger,
+        ):
+            async with main.lifespan(main.app):
+                with pytest.raises(RuntimeError):
+                    await main.app.state.warmup
+                await asyncio.sleep(0)
+                logger.error.assert_called_once()
+                assert "no secrets" in logger.error.call_args[0][0]
+                with pytest.raises(HTTPException) as error:
+                    await main.health(request)
+                assert error.value.status_code == 503
+
+            logger.error.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_warm_connections_prewarms_configured_hosts(self, components):
+        """Test the warm-up touches every configured URL through the shared pool"""
+        container = main.BotContainer()
+        urls = ["https://api.twitter.com", "https://api.coingecko.com"]
+
+        with (
+            patch("src.main.Config.WARMUP_URLS", urls),
+            patch("src.http_session.prewarm", new_callable=AsyncMock) as prewarm,
+        ):
+            await container.warm_connections()
+
+        prewarm.assert_awaited_once_with(urls)
+
+
+@pytest.mark.asyncio
+async def test_test_post_rate_limited():
+    """Test the shared limiter can reject a test post"""
+    client = Mock(spec=TwitterClient)
+    limiter = Mock(spec=RateLimiter)
+    limiter.can_request.return_value = False
+
+    result = await main.test_post_get(client=client, limiter=limiter)
+
+    assert result["status"] == "rate_limited"
+    client.post_tweet.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_status_reports_live_state():
+    """Test /status sees bot_status updates made after import and job telemetry"""
+    now = datetime(2025, 9, 16, 10, 30)
+    registry = JobTelemetry(size=5)
+    registry.history("engagement").add(
+        JobRun(1.0, 3.0, 2.0, "ok", {"likes": 2, "replies": 1})
+    )
+
+    with (
+        patch("src.bot_status.last_engagement", now),
+        patch("src.main.telemetry", registry),
+    ):
+        result = await main.status()
+
+    assert result["last_engagement"] == now.isoformat()
+    assert result["jobs"]["engagement"]["duration_p50"] == 2.0
+    assert result["jobs"]["engagement"]["actions"] == {"likes": 2, "replies": 1}
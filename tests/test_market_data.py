@@ -1,7 +1,39 @@
+import asyncio
 import os
 import pytest
-from unittest.mock import patch
-from src.market_data import MarketData
+from unittest.mock import MagicMock, patch
+from src.market_data import MarketData, chunk_ids
+
+
+class FakeResponse:
+    def __init__(self, payload=None, error=None):
+        self.payload = payload
+        self.error = error
+
+    async def __aenter__(self):
+        if self.error:
+            raise self.error
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    async def json(self):
+        return self.payload
+
+
+def fake_session(payload=None, error=None):
+    """Build a stand-in for the shared aiohttp session"""
+    session = MagicMock()
+    session.get.return_value = FakeResponse(payload, error)
+
+    async def get_session():
+        return session
+
+    return session, get_session
 
 
 class TestMarketData:
@@ -19,63 +51,140 @@ class TestMarketData:
                 {"item": {"id": "cardano"}},
             ]
         }
+        session, get_session = fake_session(mock_response)
 
-        with patch("requests.get") as mock_get:
-            mock_get.return_value.json.return_value = mock_response
-
+        with patch("src.market_data.get_session", get_session):
             result = market_data.get_trending_coins()
 
-            assert result == ["bitcoin", "ethereum", "cardano"]
-            mock_get.assert_called_once()
+        assert result == ["bitcoin", "ethereum", "cardano"]
+        session.get.assert_called_once()
 
     def test_get_trending_coins_failure(self, market_data):
         """Test trending coins fetch failure"""
-        with patch("requests.get") as mock_get:
-            mock_get.side_effect = Exception("API Error")
+        _, get_session = fake_session(error=Exception("API Error"))
 
+        with patch("src.market_data.get_session", get_session):
             result = market_data.get_trending_coins()
 
-            assert result == []
+        assert result == []
 
     def test_get_coin_price_success(self, market_data):
         """Test successful coin price fetch"""
-        mock_response = {"bitcoin": {"usd": 45000.50}}
+        session, get_session = fake_session({"bitcoin": {"usd": 45000.50}})
 
         with (
-            patch("requests.get") as mock_get,
+            patch("src.market_data.get_session", get_session),
             patch.dict(os.environ, {"coingecko-api-key": "test_key"}),
         ):
-            mock_get.return_value.json.return_value = mock_response
-
             result = market_data.get_coin_price("bitcoin")
 
-            assert result == 45000.50
-            # Verify API key is included in request
-            call_args = mock_get.call_args
-            assert "x-cg-demo-api-key" in call_args[1]["headers"]
+        assert result == 45000.50
+        # Verify API key is included in request
+        call_args = session.get.call_args
+        assert "x-cg-demo-api-key" in call_args[1]["headers"]
+        assert call_args[1]["params"] == {"ids": "bitcoin", "vs_currencies": "usd"}
 
     def test_get_coin_price_without_api_key(self, market_data):
         """Test coin price fetch without API key"""
-        mock_response = {"bitcoin": {"usd": 45000.50}}
+        session, get_session = fake_session({"bitcoin": {"usd": 45000.50}})
 
         with (
-            patch("requests.get") as mock_get,
+            patch("src.market_data.get_session", get_session),
             patch.dict(os.environ, {}, clear=True),
         ):
-            mock_get.return_value.json.return_value = mock_response
-
             result = market_data.get_coin_price("bitcoin")
 
-            assert result == 45000.50
-            # Verify no API key header when None
-            call_args = mock_get.call_args
-            assert "x-cg-demo-api-key" not in call_args[1]["headers"]
+        assert result == 45000.50
+        # Verify no API key header when None
+        call_args = session.get.call_args
+        assert "x-cg-demo-api-key" not in call_args[1]["headers"]
 
     def test_get_coin_price_failure(self, market_data):
         """Test coin price fetch failure"""
-        with patch("requests.get") as mock_get:
-            mock_get.side_effect = Exception("API Error")
+        _, get_session = fake_session(error=Exception("API Error"))
 
+        with patch("src.market_data.get_session", get_session):
             result = market_data.get_coin_price("bitcoin")
 
-            assert result is None
+        assert result is None
+
+    @pytest.mark.asyncio
+    async def test_get_coin_price_async(self, market_data):
+        """Test the async API can be awaited directly"""
+        _, get_session = fake_session({"bitcoin": {"usd": 1.5}})
+
+        with patch("src.market_data.get_session", get_session):
+            result = await market_data.get_coin_price_async("bitcoin")
+
+        assert result == 1.5
+
+
+@pytest.mark.asyncio
+async def test_shared_session_is_reused():
+    """Test the pooled session is opened once and closed on shutdown"""
+    from src import http_session
+
+    first = await http_session.get_session()
+    second = await http_session.get_session()
+    assert first is second
+
+    await http_session.close_session()
+    assert first.closed
+
+
+def test_trending_coins_are_cached():
+    """Test repeated trending lookups only hit CoinGecko once"""
+    market_data = MarketData()
+    session, get_session = fake_session({"coins": [{"item": {"id": "bitcoin"}}]})
+
+    with patch("src.market_data.get_session", get_session):
+        assert market_data.get_trending_coins() == ["bitcoin"]
+        assert market_data.get_trending_coins() == ["bitcoin"]
+
+    session.get.assert_called_once()
+
+
+def test_get_coin_prices_bulk_single_request():
+    """Test several coins and currencies are priced in one request"""
+    market_data = MarketData()
+    session, get_session = fake_session(
+        {"bitcoin": {"usd": 1.0, "eur": 0.9}, "ethereum": {"usd": 2.0, "eur": 1.8}}
+    )
+
+    with patch("src.market_data.get_session", get_session):
+        result = market_data.get_coin_prices(["bitcoin", "ethereum"], ["usd", "eur"])
+        again = market_data.get_coin_prices(["bitcoin"], ["usd"])
+
+    assert result == {
+        "bitcoin": {"usd": 1.0, "eur": 0.9},
+        "ethereum": {"usd": 2.0, "eur": 1.8},
+    }
+    assert again == {"bitcoin": {"usd": 1.0}}
+    session.get.assert_called_once()
+    assert session.get.call_args[1]["params"] == {
+        "ids": "bitcoin,ethereum",
+        "vs_currencies": "usd,eur",
+    }
+
+
+def test_chunk_ids_respects_limits():
+    """Test id lists are split by count and by URL length"""
+    assert chunk_ids(["a", "b", "c"], max_ids=2) == [["a", "b"], ["c"]]
+    assert chunk_ids(["aaaa", "bbbb", "cc"], max_chars=9) == [["aaaa", "bbbb"], ["cc"]]
+    assert chunk_ids([]) == []
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_requests_are_coalesced():
+    """Test overlapping callers share one /simple/price request"""
+    market_data = MarketData()
+    session, get_session = fake_session({"bitcoin": {"usd": 1.0}})
+
+    with patch("src.market_data.get_session", get_session):
+        first, second = await asyncio.gather(
+            market_data.get_coin_prices_async(["bitcoin", "ethereum"]),
+            market_data.get_coin_prices_async(["ethereum", "bitcoin"]),
+        )
+
+    assert first == second == {"bitcoin": {"usd": 1.0}}
+    session.get.assert_called_once()
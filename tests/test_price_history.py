@@ -0,0 +1,104 @@
+import time
+import pytest
+from unittest.mock import patch
+from src.market_data import MarketData
+from src.price_history import DAY, HOUR, PriceHistory, PriceSeries
+from tests.test_market_data import fake_session
+
+NOW = 1_700_000_000.0
+
+
+def filled(prices, step=600, capacity=100):
+    """Series with one sample every `step` seconds, the last one at NOW"""
+    series = PriceSeries(capacity)
+    start = NOW - step * (len(prices) - 1)
+    for i, price in enumerate(prices):
+        series.append(start + i * step, price)
+    return series
+
+
+class TestPriceSeries:
+    def test_ring_buffer_keeps_newest_samples(self):
+        """Test a full series overwrites the oldest samples in order"""
+        series = filled(range(1, 8), capacity=5)
+
+        times, prices = series.samples()
+
+        assert len(series) == 5
+        assert prices.tolist() == [3, 4, 5, 6, 7]
+        assert times[-1] == NOW and (times[1:] > times[:-1]).all()
+
+    def test_bursts_share_one_slot(self):
+        """Test samples closer than min_interval replace the newest one"""
+        series = PriceSeries(10, min_interval=60)
+        series.append(NOW, 1.0)
+        series.append(NOW + 30, 2.0)
+        series.append(NOW - 10, 9.0)  # out of order, ignored
+        series.append(NOW + 90, 3.0)
+
+        assert series.samples()[1].tolist() == [2.0, 3.0]
+
+    def test_window_queries(self):
+        """Test change, low, high and moving average over a window"""
+        series = filled([100, 80, 120, 110, 90, 110], step=600)
+
+        assert series.change(HOUR, now=NOW) is None  # history too short
+        assert series.change(1800, now=NOW) == pytest.approx(100 * (110 / 120 - 1))
+        assert series.change(1200, now=NOW) == 0
+        assert series.low(1800, now=NOW) == 90
+        assert series.high(1800, now=NOW) == 120
+        assert series.moving_average(1200, now=NOW) == pytest.approx(310 / 3)
+        assert PriceSeries(4).low(HOUR) is None
+
+    def test_change_ignores_stale_reference(self):
+        """Test a gap in the history gives no change rather than a stale one"""
+        series = PriceSeries(10, min_interval=0)
+        series.append(NOW - 3 * DAY, 50.0)  # before a 3 day outage
+        series.append(NOW - HOUR, 100.0)
+        series.append(NOW, 110.0)
+
+        assert series.change(DAY, now=NOW) is None
+        assert series.change(HOUR, now=NOW) == pytest.approx(10)
+
+
+class TestPriceHistory:
+    def test_memory_is_bounded(self):
+        """Test series are capped in points and in number of coins"""
+        history = PriceHistory(points=10, max_coins=2, min_interval=0)
+        for i in range(50):
+            history.record({"a": {"usd": i}, "b": {"usd": i}}, at=NOW + i)
+        history.record({"c": {"usd": 1.0}}, at=NOW + 60)
+
+        assert len(history) == 2
+        assert history.series("a") is None
+        assert history.nbytes == 2 * 10 * 16
+
+    def test_snapshot_round_trip(self, tmp_path):
+        """Test a saved history loads back into a new instance"""
+        history = PriceHistory(points=10, min_interval=0)
+        history.record({"bitcoin": {"usd": 100.0, "eur": 90.0}}, at=NOW - DAY)
+        history.record({"bitcoin": {"usd": 110.0, "eur": 99.0}}, at=NOW)
+        path = str(tmp_path / "history.npz")
+        history.save(path)
+
+        restored = PriceHistory(points=10, min_interval=0)
+
+        assert restored.load(path) == 2
+        assert restored.series("bitcoin", "eur").samples()[1].tolist() == [90, 99]
+        assert restored.series("bitcoin").change(DAY, now=NOW) == pytest.approx(10)
+
+
+def test_price_fetches_feed_history():
+    """Test every price fetch is recorded, so changes need no extra calls"""
+    history = PriceHistory(min_interval=0)
+    history.record({"bitcoin": {"usd": 100.0}}, at=time.time() - 1.5 * HOUR)
+    market_data = MarketData(history=history)
+    session, get_session = fake_session({"bitcoin": {"usd": 105.0}})
+
+    with patch("src.market_data.get_session", get_session):
+        market_data.get_coin_prices(["bitcoin"])
+
+    changes = market_data.get_price_changes("bitcoin")
+    assert list(changes) == [HOUR]
+    assert changes[HOUR] == pytest.approx(5.0)
+    session.get.assert_called_once()
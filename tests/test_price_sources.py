@@ -0,0 +1,186 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from prometheus_client import REGISTRY
+from src.market_data import MarketData
+from src.price_sources import CcxtSource, PriceEngine, PriceSource
+from src.resilience import HALF_OPEN, OPEN, CircuitBreaker
+from tests.test_market_data import fake_session
+
+
+class FakeSource(PriceSource):
+    def __init__(self, name, prices=None, delay=0.0, error=None, healthy=True):
+        self.name = name
+        self.prices = prices or {}
+        self.delay = delay
+        self.error = error
+        self._healthy = healthy
+        self.calls = 0
+        self.cancelled = False
+
+    def healthy(self):
+        return self._healthy
+
+    async def fetch(self, ids, currencies):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error:
+            raise self.error
+        return {i: self.prices[i] for i in ids if i in self.prices}
+
+
+BTC = {"bitcoin": {"usd": 100.0}}
+
+
+class TestPriceEngine:
+    @pytest.mark.asyncio
+    async def test_fastest_healthy_source_is_preferred(self):
+        """Test sources are ranked by measured latency, unhealthy ones last"""
+        slow = FakeSource("slow", BTC, delay=0.02)
+        fast = FakeSource("fast", BTC)
+        down = FakeSource("down", BTC, healthy=False)
+        engine = PriceEngine([down, slow, fast], hedge_after=0)
+
+        await engine.fetch(["bitcoin"], ["usd"])  # measures slow
+
+        # An unmeasured source's score of 0 does not put it ahead
+        assert [s.name for s in engine.ranked(["usd"])] == ["slow", "fast", "down"]
+
+        engine.stats["fast"].record_success(0.001, 1.0)
+
+        assert [s.name for s in engine.ranked(["usd"])] == ["fast", "slow", "down"]
+        assert down.calls == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_source_falls_back(self):
+        """Test an error moves on to the next source and counts against the first"""
+        broken = FakeSource("broken", error=RuntimeError("boom"))
+        backup = FakeSource("backup", BTC)
+        engine = PriceEngine([broken, backup], hedge_after=0)
+
+        assert await engine.fetch(["bitcoin"], ["usd"]) == BTC
+        assert engine.stats["broken"].error_rate > 0
+        assert [s.name for s in engine.ranked(["usd"])][0] == "backup"
+
+    @pytest.mark.asyncio
+    async def test_slow_source_is_hedged(self):
+        """Test a slow source gets a backup request and the first answer wins"""
+        slow = FakeSource("slow", BTC, delay=5)
+        backup = FakeSource("backup", {"bitcoin": {"usd": 101.0}})
+        engine = PriceEngine([slow, backup], hedge_after=0.02)
+
+        result = await asyncio.wait_for(engine.fetch(["bitcoin"], ["usd"]), 1)
+
+        assert result == {"bitcoin": {"usd": 101.0}}
+        await asyncio.sleep(0)
+        assert slow.cancelled
+        assert REGISTRY.get_sample_value(
+            "price_hedged_requests_total", {"source": "backup"}
+        )
+
+    @pytest.mark.asyncio
+    async def test_uncovered_coins_are_asked_elsewhere(self):
+        """Test coins the first source cannot price come from the next one"""
+        partial = FakeSource("partial", BTC)
+        full = FakeSource("full", {"doge": {"usd": 0.1}, "bitcoin": {"usd": 1.0}})
+        engine = PriceEngine([partial, full], hedge_after=0)
+
+        result = await engine.fetch(["bitcoin", "doge", "unknown"], ["usd"])
+
+        assert result == {"bitcoin": {"usd": 100.0}, "doge": {"usd": 0.1}}
+        assert engine.stats["partial"].coverage < 1
+
+    @pytest.mark.asyncio
+    async def test_error_raised_when_no_source_answers(self):
+        """Test the last error surfaces when every source fails"""
+        engine = PriceEngine(
+            [FakeSource("a", error=RuntimeError("a down"))], hedge_after=0
+        )
+
+        with pytest.raises(RuntimeError, match="a down"):
+            await engine.fetch(["bitcoin"], ["usd"])
+
+
+class TestCcxtSource:
+    def make(self, exchange, symbols=None):
+        source = CcxtSource(
+            "fakex",
+            (symbols or {"bitcoin": "btc", "dogwifcoin": "WIF"}).get,
+            quote="usdt",
+            breaker=CircuitBreaker("ccxt_fakex", failure_threshold=1),
+        )
+        source._get_exchange = AsyncMock(return_value=exchange)
+        return source
+
+    def exchange(self):
+        exchange = Mock()
+        exchange.has = {"fetchTickers": True}
+        exchange.load_markets = AsyncMock(return_value={"BTC/USDT": {}})
+        exchange.fetch_tickers = AsyncMock(
+            return_value={"BTC/USDT": {"last": 65000.5, "close": 65000}}
+        )
+        return exchange
+
+    @pytest.mark.asyncio
+    async def test_bulk_tickers_map_back_to_coin_ids(self):
+        """Test one fetch_tickers call prices every listed coin"""
+        exchange = self.exchange()
+        source = self.make(exchange)
+
+        prices = await source.fetch(["bitcoin", "dogwifcoin", "nosymbol"], ["usd"])
+
+        assert prices == {"bitcoin": {"usd": 65000.5}}
+        exchange.fetch_tickers.assert_awaited_once_with(["BTC/USDT"])
+        assert source.coverable(["bitcoin", "nosymbol"]) == ["bitcoin"]
+        assert not source.supports(["eur"])
+
+    @pytest.mark.asyncio
+    async def test_exchange_errors_open_the_breaker(self):
+        """Test a failing exchange is marked unhealthy"""
+        exchange = self.exchange()
+        exchange.fetch_tickers.side_effect = RuntimeError("exchange down")
+        source = self.make(exchange)
+
+        with pytest.raises(RuntimeError):
+            await source.fetch(["bitcoin"], ["usd"])
+
+        assert source.breaker.state == OPEN
+        assert not source.healthy()
+
+    @pytest.mark.asyncio
+    async def test_hedge_loser_probe_releases_breaker(self):
+        """Test a half-open probe cancelled as a hedge loser does not jam the circuit"""
+        exchange = self.exchange()
+
+        async def hang(symbols):
+            await asyncio.sleep(10)
+
+        exchange.fetch_tickers.side_effect = hang
+        source = self.make(exchange)
+        source.breaker = CircuitBreaker("ccxt_fakex", 1, reset_timeout=0)
+        source.breaker.record_failure()
+        engine = PriceEngine([source, FakeSource("backup", BTC)], hedge_after=0.02)
+
+        assert await asyncio.wait_for(engine.fetch(["bitcoin"], ["usd"]), 1) == BTC
+        await asyncio.sleep(0)
+
+        assert source.breaker.state == HALF_OPEN
+        assert source.healthy()
+
+
+def test_trending_symbols_feed_exchange_sources():
+    """Test trending coins' ticker symbols are remembered for exchange quotes"""
+    market_data = MarketData()
+    session, get_session = fake_session(
+        {"coins": [{"item": {"id": "dogwifcoin", "symbol": "WIF"}}]}
+    )
+
+    with patch("src.market_data.get_session", get_session):
+        market_data.get_trending_coins()
+
+    assert market_data.symbol_for("dogwifcoin") == "WIF"
+    assert market_data.symbol_for("bitcoin") is None
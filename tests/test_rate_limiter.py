@@ -0,0 +1,118 @@
+import pytest
+from unittest.mock import patch
+from src.metrics import rate_limit_rejections_counter
+from src.rate_limiter import (
+    RateLimiter,
+    RateLimiterRegistry,
+    TokenBucket,
+    parse_limits,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """Patch the limiter clock so refills are deterministic"""
+    fake = FakeClock()
+    with patch("src.rate_limiter.time.monotonic", fake):
+        yield fake
+
+
+class TestTokenBucket:
+    def test_try_acquire_until_empty(self, clock):
+        """Test a full bucket allows a burst up to capacity"""
+        bucket = TokenBucket("test", capacity=3, period=60)
+
+        assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+    def test_refills_over_time(self, clock):
+        """Test tokens come back at capacity / period per second"""
+        bucket = TokenBucket("test", capacity=2, period=60)
+        bucket.try_acquire()
+        bucket.try_acquire()
+
+        clock.now += 30
+        assert bucket.try_acquire()
+        assert not bucket.try_acquire()
+
+    @pytest.mark.asyncio
+    async def test_acquire_waits_for_token(self):
+        """Test acquire() sleeps until a token is refilled"""
+        bucket = TokenBucket("test", capacity=1, period=0.05)
+        bucket.try_acquire()
+
+        assert await bucket.acquire(timeout=1)
+
+    @pytest.mark.asyncio
+    async def test_acquire_times_out(self, clock):
+        """Test acquire() gives up when the wait exceeds the timeout"""
+        bucket = TokenBucket("test", capacity=1, period=60)
+        bucket.try_acquire()
+
+        assert not await bucket.acquire(timeout=1)
+
+    def test_acquire_blocking_times_out(self, clock):
+        """Test the thread-blocking variant honours its timeout"""
+        bucket = TokenBucket("test", capacity=1, period=60)
+        bucket.try_acquire()
+
+        assert not bucket.acquire_blocking(timeout=1)
+
+    def test_rejections_are_counted(self, clock):
+        """Test refused requests are exported per endpoint"""
+        bucket = TokenBucket("rejections", capacity=1, period=60)
+        counter = rate_limit_rejections_counter.labels(endpoint="rejections")
+        before = counter._value.get()
+
+        bucket.try_acquire()
+        bucket.try_acquire()
+        bucket.acquire_blocking(timeout=1)
+
+        assert counter._value.get() == before + 2
+
+
+class TestRegistry:
+    def test_named_buckets_are_shared_and_independent(self, clock):
+        """Test each endpoint gets one shared bucket with its own budget"""
+        registry = RateLimiterRegistry({"like": (1, 900), "search": (2, 900)})
+
+        assert registry.get("like") is registry.get("like")
+        assert registry.try_acquire("like")
+        assert not registry.try_acquire("like")
+        assert registry.try_acquire("search")
+
+    def test_rate_limiters_share_registry_bucket(self, clock):
+        """Test separate RateLimiter instances draw from the same budget"""
+        registry = RateLimiterRegistry({"bot": (1, 60)})
+
+        assert RateLimiter(registry=registry).can_request()
+        assert not RateLimiter(registry=registry).can_request()
+
+
+def test_parse_limits():
+    """Test RATE_LIMITS parsing skips malformed entries"""
+    assert parse_limits("like=50/900, search=180/900,bad") == {
+        "like": (50, 900.0),
+        "search": (180, 900.0),
+    }
+
+
+def test_update_from_server_blocks_until_reset(clock):
+    """Test an exhausted server budget pauses the bucket until the reset time"""
+    bucket = TokenBucket("test", capacity=10, period=60)
+
+    with patch("src.rate_limiter.time.time", return_value=5000.0):
+        bucket.update_from_server(remaining=0, reset_at=5100.0)
+
+    assert not bucket.try_acquire()
+    clock.now += 99
+    assert not bucket.try_acquire()
+    clock.now += 2
+    assert bucket.try_acquire()
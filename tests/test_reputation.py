@@ -0,0 +1,75 @@
+from unittest.mock import Mock
+from src.metrics import reputation_lookups_counter
+from src.reputation import BAD, GOOD, UNKNOWN, AuthorReputation
+from src.spam_detector import SpamDetector
+
+
+class TestAuthorReputation:
+    def test_spam_verdict_marks_author_bad(self):
+        """Test a single spam verdict makes the author known bad"""
+        reputation = AuthorReputation()
+
+        reputation.record("42", True)
+
+        assert reputation.lookup("42") == BAD
+        assert reputation.lookup("43") == UNKNOWN
+
+    def test_good_after_clean_verdicts(self):
+        """Test an author is trusted only after enough clean verdicts"""
+        reputation = AuthorReputation(good_after=2)
+
+        reputation.record("42", False)
+        assert reputation.lookup("42") == UNKNOWN
+        reputation.record("42", False)
+        assert reputation.lookup("42") == GOOD
+
+    def test_entries_expire_and_are_bounded(self):
+        """Test verdicts honour the TTL and the LRU size bound"""
+        expiring = AuthorReputation(ttl=0)
+        expiring.record("42", True)
+        assert expiring.lookup("42") == UNKNOWN
+
+        bounded = AuthorReputation(max_entries=2)
+        for author_id in ("1", "2", "3"):
+            bounded.record(author_id, True)
+        assert len(bounded) == 2
+        assert bounded.lookup("1") == UNKNOWN
+
+    def test_persisted_across_instances(self, tmp_path):
+        """Test reputations written to disk are reloaded on open"""
+        path = str(tmp_path / "reputation.db")
+        first = AuthorReputation(path)
+        first.record("42", True)
+        first.close()
+
+        assert AuthorReputation(path).lookup("42") == BAD
+
+    def test_lookups_counted(self):
+        """Test lookups are exported by result"""
+        reputation = AuthorReputation()
+        reputation.record("42", True)
+        before = reputation_lookups_counter.labels(result=BAD)._value.get()
+
+        reputation.lookup("42")
+
+        assert reputation_lookups_counter.labels(result=BAD)._value.get() == before + 1
+
+
+class TestReputationShortCircuit:
+    def test_known_authors_skip_scoring(self):
+        """Test known bad and known good authors are decided without scoring"""
+        detector = SpamDetector(threshold=1, reputation=AuthorReputation(good_after=1))
+        detector.is_spam_batch(["scam", "gm"], ["bad", "good"])
+        detector.score = Mock(side_effect=AssertionError("scored"))
+
+        assert detector.is_spam_batch(["gm", "scam"], ["bad", "good"]) == [
+            True,
+            False,
+        ]
+
+    def test_unknown_authors_still_scored(self):
+        """Test tweets without an author fall through to text scoring"""
+        detector = SpamDetector(threshold=1, reputation=AuthorReputation())
+
+        assert detector.is_spam("scam", None)
+        assert not detector.is_spam("gm", None)
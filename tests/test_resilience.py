@@ -0,0 +1,194 @@
+import asyncio
+import pytest
+import requests
+from unittest.mock import Mock
+from prometheus_client import REGISTRY
+from src.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    Resilience,
+    is_retryable,
+    remaining_time,
+)
+
+
+def http_error(status):
+    error = Exception(f"{status} error")
+    error.response = Mock(status_code=status)
+    return error
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_only_transient_errors_are_retryable():
+    """Test 5xx, timeouts and connection errors retry; 4xx and 429 do not"""
+    assert is_retryable(http_error(503))
+    assert is_retryable(asyncio.TimeoutError())
+    assert is_retryable(ConnectionResetError())
+    assert not is_retryable(http_error(403))
+    assert not is_retryable(http_error(429))
+    assert not is_retryable(ValueError("bad data"))
+
+
+def test_writes_retry_only_unsent_requests():
+    """Test a non-idempotent call retries connect failures, not timeouts or 5xx"""
+    assert is_retryable(ConnectionRefusedError(), idempotent=False)
+    assert is_retryable(requests.ConnectTimeout(), idempotent=False)
+    assert not is_retryable(http_error(503), idempotent=False)
+    assert not is_retryable(asyncio.TimeoutError(), idempotent=False)
+    assert not is_retryable(ConnectionResetError(), idempotent=False)
+
+
+class TestCircuitBreaker:
+    def test_opens_after_threshold_and_probes_when_half_open(self):
+        """Test the closed -> open -> half-open -> closed cycle"""
+        clock = FakeClock()
+        breaker = CircuitBreaker(
+            "test-cycle", failure_threshold=2, reset_timeout=30, clock=clock
+        )
+
+        breaker.record_failure()
+        assert breaker.state == CLOSED
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        assert not breaker.available() and not breaker.acquire()
+
+        clock.now += 30
+        assert breaker.acquire()
+        assert breaker.state == HALF_OPEN
+        assert not breaker.acquire()  # one probe at a time
+
+        breaker.record_success()
+        assert breaker.state == CLOSED
+        assert breaker.acquire()
+
+    def test_failed_probe_reopens(self):
+        """Test a failing half-open probe opens the circuit for another period"""
+        clock = FakeClock()
+        breaker = CircuitBreaker(
+            "test-probe", failure_threshold=1, reset_timeout=10, clock=clock
+        )
+        breaker.record_failure()
+        clock.now += 10
+        breaker.acquire()
+
+        breaker.record_failure()
+
+        assert breaker.state == OPEN
+        assert breaker.retry_in() == 10
+        assert (
+            REGISTRY.get_sample_value(
+                "circuit_breaker_state", {"upstream": "test-probe"}
+            )
+            == 2
+        )
+
+
+class TestResilience:
+    def make(self, name, **kwargs):
+        breaker = CircuitBreaker(name, failure_threshold=kwargs.pop("threshold", 5))
+        return Resilience(breaker, base_delay=0.001, rng=lambda: 1.0, **kwargs)
+
+    def test_retries_transient_errors(self):
+        """Test a 5xx is retried with backoff until the call succeeds"""
+        resilience = self.make("test-retry", attempts=3)
+        func = Mock(side_effect=[http_error(503), http_error(502), "ok"])
+
+        assert resilience.call(func, 1, key="v") == "ok"
+        assert func.call_count == 3
+        func.assert_called_with(1, key="v")
+
+    def test_client_errors_are_not_retried(self):
+        """Test a 4xx is raised at once and does not count against the circuit"""
+        resilience = self.make("test-4xx", threshold=1)
+        func = Mock(side_effect=http_error(403))
+
+        with pytest.raises(Exception, match="403"):
+            resilience.call(func)
+        assert func.call_count == 1
+        assert resilience.breaker.state == CLOSED
+
+    def test_open_circuit_fails_fast(self):
+        """Test calls are not attempted while the circuit is open"""
+        resilience = self.make("test-open", attempts=5, threshold=2)
+        func = Mock(side_effect=http_error(503))
+
+        with pytest.raises(Exception, match="503"):
+            resilience.call(func)
+        assert func.call_count == 2  # gave up once the circuit opened
+        with pytest.raises(CircuitOpenError):
+            resilience.call(func)
+        assert func.call_count == 2
+
+    def test_deadline_bounds_attempt_timeouts(self):
+        """Test blocking calls see the remaining deadline as their timeout cap"""
+        resilience = self.make("test-deadline", deadline=5)
+
+        assert resilience.call(lambda: remaining_time(10)) <= 5
+        assert remaining_time(10) == 10
+
+    @pytest.mark.asyncio
+    async def test_async_deadline_cancels_slow_attempts(self):
+        """Test an async call stuck past its deadline is cancelled"""
+        resilience = self.make("test-async-deadline", deadline=0.05, attempts=3)
+
+        async def hang():
+            await asyncio.sleep(10)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await resilience.acall(hang)
+
+    def test_writes_not_retried_after_5xx(self):
+        """Test a write that may have taken effect is not sent twice"""
+        resilience = self.make("test-write", attempts=3)
+        func = Mock(side_effect=[http_error(503), "ok"])
+
+        with pytest.raises(Exception, match="503"):
+            resilience.call(func, idempotent=False)
+        assert func.call_count == 1
+        func.assert_called_with()
+
+    def test_failed_writes_open_the_breaker(self):
+        """Test write timeouts and 5xx count against the circuit without retries"""
+        resilience = self.make("test-write-outage", attempts=3, threshold=3)
+        func = Mock(side_effect=[asyncio.TimeoutError(), http_error(503)] * 2)
+
+        for _ in range(3):
+            with pytest.raises(Exception):
+                resilience.call(func, idempotent=False)
+
+        assert func.call_count == 3
+        assert resilience.breaker.state == OPEN
+        with pytest.raises(CircuitOpenError):
+            resilience.call(func, idempotent=False)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_probe_is_released(self):
+        """Test a probe cancelled mid-call does not leave the circuit stuck"""
+        clock = FakeClock()
+        breaker = CircuitBreaker(
+            "test-cancel", failure_threshold=1, reset_timeout=10, clock=clock
+        )
+        resilience = Resilience(breaker, rng=lambda: 0.0)
+        breaker.record_failure()
+        clock.now += 10
+
+        task = asyncio.ensure_future(resilience.acall(asyncio.sleep, 10))
+        await asyncio.sleep(0)
+        assert breaker.state == HALF_OPEN and not breaker.available()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert breaker.available()
+        assert await resilience.acall(asyncio.sleep, 0, result="ok") == "ok"
+        assert breaker.state == CLOSED
@@ -0,0 +1,92 @@
+import asyncio
+import threading
+import time
+import pytest
+from unittest.mock import Mock
+from src.engagement import EngagementBot
+from src.metrics import job_overruns_counter
+from src.scheduler import Scheduler
+
+
+@pytest.fixture
+def scheduler():
+    """Scheduler around a mocked bot"""
+    scheduler = Scheduler(Mock(spec=EngagementBot), max_workers=2)
+    yield scheduler
+    scheduler.executor.shutdown(wait=True)
+
+
+class TestScheduler:
+    @pytest.mark.asyncio
+    async def test_sync_job_runs_off_the_event_loop(self, scheduler):
+        """Test blocking jobs run on the bounded executor, not the loop thread"""
+        threads = []
+        job = scheduler.wrap(
+            "job", lambda: threads.append(threading.current_thread().name), 60
+        )
+
+        await job()
+
+        assert threads[0].startswith("bot-job")
+        assert threads[0] != threading.current_thread().name
+
+    @pytest.mark.asyncio
+    async def test_loop_stays_responsive_during_blocking_job(self, scheduler):
+        """Test the loop keeps serving while a blocking job sleeps"""
+        job = asyncio.ensure_future(
+            scheduler.wrap("slow", lambda: time.sleep(0.2), 60)()
+        )
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+
+        assert time.perf_counter() - start < 0.1
+        await job
+
+    @pytest.mark.asyncio
+    async def test_async_job_awaited_directly(self, scheduler):
+        """Test coroutine jobs are awaited on the loop"""
+        calls = []
+
+        async def job():
+            calls.append(1)
+
+        await scheduler.wrap("async_job", job, 60)()
+
+        assert calls == [1]
+
+    @pytest.mark.asyncio
+    async def test_overrun_recorded(self, scheduler):
+        """Test a run longer than its interval is counted as an overrun"""
+        before = job_overruns_counter.labels(job="overrun")._value.get()
+
+        await scheduler.wrap("overrun", lambda: time.sleep(0.02), 0.01)()
+
+        assert job_overruns_counter.labels(job="overrun")._value.get() == before + 1
+
+    @pytest.mark.asyncio
+    async def test_failing_job_does_not_raise(self, scheduler):
+        """Test job exceptions are logged instead of escaping the scheduler"""
+
+        def boom():
+            raise RuntimeError("boom")
+
+        await scheduler.wrap("boom", boom, 60)()
+
+    @pytest.mark.asyncio
+    async def test_jobs_registered_without_overlap(self, scheduler):
+        """Test every job is scheduled with overlap control and jitter"""
+        scheduler.start()
+        try:
+            jobs = {job.id: job for job in scheduler.scheduler.get_jobs()}
+            assert set(jobs) == {
+                "market_update",
+                "engagement",
+                "promote_community",
+                "promote_specific_post",
+            }
+            for job in jobs.values():
+                assert job.max_instances == 1
+                assert job.coalesce is True
+                assert job.trigger.jitter
+        finally:
+            scheduler.stop()
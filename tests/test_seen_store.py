@@ -0,0 +1,51 @@
+import pytest
+from unittest.mock import patch
+from src.seen_store import SeenTweetStore, max_tweet_id
+
+
+class TestSeenTweetStore:
+    @pytest.fixture
+    def db_path(self, tmp_path):
+        return str(tmp_path / "seen.db")
+
+    def test_seen_ids_persist_across_instances(self, db_path):
+        """Test handled ids survive a restart"""
+        store = SeenTweetStore(db_path)
+        store.mark_seen(["1", "2"])
+        store.close()
+
+        reopened = SeenTweetStore(db_path)
+        assert "1" in reopened
+        assert 2 in reopened
+        assert "3" not in reopened
+
+    def test_since_id_only_moves_forward(self, db_path):
+        """Test the high-water mark never goes backwards"""
+        store = SeenTweetStore(db_path)
+
+        store.advance_since_id("q", ["10", "30", "20"])
+        store.advance_since_id("q", ["25"])
+
+        assert store.get_since_id("q") == "30"
+        assert store.get_since_id("other") is None
+
+    def test_old_entries_pruned_on_open(self, db_path):
+        """Test ids older than the retention window are dropped"""
+        with patch("src.seen_store.time.time", return_value=0):
+            SeenTweetStore(db_path).mark_seen(["1"])
+
+        assert "1" not in SeenTweetStore(db_path, retention_days=1)
+
+    def test_stale_since_id_ignored(self, db_path):
+        """Test a cursor outside the recent search window is not reused"""
+        store = SeenTweetStore(db_path)
+        with patch("src.seen_store.time.time", return_value=0):
+            store.advance_since_id("q", ["10"])
+
+        assert store.get_since_id("q") is None
+
+
+def test_max_tweet_id_ignores_non_numeric():
+    """Test snowflake comparison is numeric, not lexicographic"""
+    assert max_tweet_id(["9", "10", "abc"]) == "10"
+    assert max_tweet_id(["abc"]) is None
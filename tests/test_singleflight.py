@@ -0,0 +1,106 @@
+import asyncio
+import threading
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from src.singleflight import AsyncSingleFlight, SingleFlight, request_key
+
+
+def test_request_key_normalizes_params():
+    """Test parameter order, list order and None values do not change the key"""
+    first = request_key("/simple/price", params={"ids": "eth,btc", "vs": "usd"})
+    second = request_key(
+        "/simple/price", params={"vs": "usd", "ids": "btc,eth", "page": None}
+    )
+
+    assert first == second
+    assert request_key("search", params={"tweet_fields": ["b", "a"]}) == request_key(
+        "search", params={"tweet_fields": ("a", "b")}
+    )
+    assert first != request_key("/simple/price", params={"ids": "btc", "vs": "usd"})
+
+
+def test_request_key_keeps_free_text_verbatim():
+    """Test commas in a query or page token are not treated as a set"""
+    assert request_key("search", params={"query": "a,b"}) != request_key(
+        "search", params={"query": "b,a"}
+    )
+    assert request_key("search", params={"query": "a,a"}) != request_key(
+        "search", params={"query": "a"}
+    )
+
+
+class TestSingleFlight:
+    def run_concurrently(self, flight, func, callers=4):
+        """Start `callers` threads on the same key; release them once all wait"""
+        with ThreadPoolExecutor(callers) as pool:
+            futures = [pool.submit(flight.do, "key", func) for _ in range(callers)]
+            return [f.exception() or f.result() for f in futures]
+
+    def test_concurrent_callers_share_one_call(self):
+        """Test threads asking for the same key while it is in flight share it"""
+        flight = SingleFlight("test")
+        calls = []
+        release = threading.Event()
+
+        def fetch():
+            calls.append(1)
+            release.wait(5)
+            return "result"
+
+        threading.Timer(0.2, release.set).start()
+        assert self.run_concurrently(flight, fetch) == ["result"] * 4
+        assert len(calls) == 1
+
+    def test_error_is_shared_and_not_remembered(self):
+        """Test waiters get the leader's error and the next call runs afresh"""
+        flight = SingleFlight("test")
+        release = threading.Event()
+
+        def fail():
+            release.wait(5)
+            raise ValueError("upstream down")
+
+        threading.Timer(0.2, release.set).start()
+        results = self.run_concurrently(flight, fail)
+
+        assert all(isinstance(r, ValueError) for r in results)
+        assert flight.do("key", lambda: "recovered") == "recovered"
+
+
+class TestAsyncSingleFlight:
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_call(self):
+        """Test coroutines asking for the same key share one call"""
+        flight = AsyncSingleFlight("test")
+        calls = []
+
+        async def fetch(value):
+            calls.append(value)
+            await asyncio.sleep(0.01)
+            return value
+
+        results = await asyncio.gather(
+            *(flight.do("key", fetch, "shared") for _ in range(3)),
+            flight.do("other", fetch, "own"),
+        )
+
+        assert results == ["shared", "shared", "shared", "own"]
+        assert sorted(calls) == ["own", "shared"]
+        assert await flight.do("key", fetch, "again") == "again"
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        """Test cancelling one waiter leaves the shared call running"""
+        flight = AsyncSingleFlight("test")
+
+        async def fetch():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        first = asyncio.ensure_future(flight.do("key", fetch))
+        second = asyncio.ensure_future(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await second == "done"
+        assert first.cancelled()
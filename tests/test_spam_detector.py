@@ -0,0 +1,53 @@
+from src.spam_detector import KeywordMatcher, SpamDetector
+
+
+class TestKeywordMatcher:
+    def test_counts_every_occurrence(self):
+        """Test repeated keywords are counted, case-insensitively"""
+        matcher = KeywordMatcher(["pump", "scam"])
+
+        assert matcher.count("PUMP it, pump it, total Scam") == 3
+
+    def test_keywords_match_inside_words(self):
+        """Test plain keywords keep the original substring semantics"""
+        assert KeywordMatcher(["pump"]).count("pumped") == 1
+
+    def test_words_and_phrases_respect_boundaries(self):
+        """Test word and phrase rules only match whole words"""
+        matcher = KeywordMatcher(words=["rug"], phrases=["free  airdrop"])
+
+        assert matcher.count("rugged drugs") == 0
+        assert matcher.count("Rug pull! FREE\nairdrop now") == 2
+        assert matcher.count("freeairdrop") == 0
+
+    def test_phrase_preferred_over_contained_keyword(self):
+        """Test a phrase is counted once rather than as its keywords"""
+        matcher = KeywordMatcher(["pump"], phrases=["pump and dump"])
+
+        assert matcher.count("pump and dump") == 1
+
+    def test_longest_keyword_wins(self):
+        """Test a keyword that prefixes another does not split its match"""
+        assert KeywordMatcher(["pump", "pumpkin"]).count("pumpkin pump") == 2
+
+    def test_empty_matcher(self):
+        assert KeywordMatcher().count("anything") == 0
+
+
+class TestSpamDetector:
+    def test_threshold(self):
+        """Test texts reaching the threshold are flagged"""
+        detector = SpamDetector(threshold=2)
+
+        assert detector.is_spam("scam scam")
+        assert not detector.is_spam("Great crypto project!")
+
+    def test_is_spam_batch(self):
+        """Test batch results line up with the input order"""
+        detector = SpamDetector(threshold=2)
+
+        assert detector.is_spam_batch(["fake pump", "gm", "dump it"]) == [
+            True,
+            False,
+            False,
+        ]
@@ -0,0 +1,97 @@
+import zlib
+import numpy as np
+from unittest.mock import patch
+from src.spam_detector import SpamDetector
+from src.spam_model import N_FEATURES, SpamModel, hash_features, tokenize
+from src.train_spam_model import main as train_main
+
+
+def column(token):
+    return zlib.crc32(token.encode()) % N_FEATURES
+
+
+def keyword_model(*tokens):
+    """Model that scores texts containing any of `tokens` as spam"""
+    weights = np.zeros(N_FEATURES, dtype=np.float32)
+    for token in tokens:
+        weights[column(token)] = 20.0
+    return SpamModel(weights, bias=-5.0)
+
+
+def test_tokenize_namespaces():
+    """Test URLs, cashtags, hashtags and words get distinct namespaces"""
+    assert tokenize("Buy $WIF https://scam.io/x #Moon now") == [
+        "w:buy",
+        "c:$wif",
+        "u:",
+        "u:scam.io",
+        "h:#moon",
+        "w:now",
+    ]
+
+
+def test_hash_features_shape_and_counts():
+    """Test one row per text with log-scaled repeat counts"""
+    features = hash_features(["gm gm", "", "#wifdog"])
+
+    assert features.shape == (3, N_FEATURES)
+    assert features.dtype == np.float32
+    assert np.isclose(features[0, column("w:gm")], np.log1p(2))
+    assert not features[1].any()
+    assert features[2, column("h:#wifdog")] > 0
+
+
+class TestSpamModel:
+    def test_score_batch(self):
+        """Test the batch is scored in input order"""
+        model = keyword_model("u:scam.io")
+
+        scores = model.score_batch(["gm", "claim at https://scam.io/now", ""])
+
+        assert scores.shape == (3,)
+        assert scores[1] > 0.9
+        assert scores[0] < 0.1 and scores[2] < 0.1
+
+    def test_save_and_load(self, tmp_path):
+        """Test weights round-trip through the local weights file"""
+        path = str(tmp_path / "model.npz")
+        keyword_model("c:$scam").save(path)
+
+        loaded = SpamModel.load(path)
+
+        assert loaded.score_batch(["buy $SCAM"])[0] > 0.9
+
+    def test_fit_separates_labelled_texts(self):
+        """Test training learns the tokens that mark spam"""
+        texts = ["free airdrop claim now", "gm wifdog fam", "airdrop claim link"] * 5
+        labels = [1, 0, 1] * 5
+
+        model = SpamModel.fit(texts, labels, n_features=256)
+
+        scores = model.score_batch(["claim your airdrop", "gm fam"])
+        assert scores[0] > 0.5 > scores[1]
+
+    def test_training_tool_writes_loadable_model(self, tmp_path):
+        """Test the training tool turns a labelled CSV into a weights file"""
+        data = tmp_path / "labelled.csv"
+        rows = ["free airdrop claim,spam", "gm wifdog fam,ham"] * 10
+        data.write_text("text,label\n" + "\n".join(rows) + "\n")
+        out = str(tmp_path / "model.npz")
+
+        assert train_main([str(data), "--out", out, "--holdout", "0.2"]) == 0
+
+        model = SpamModel.load(out)
+        assert model.score_batch(["airdrop claim"])[0] > 0.5
+
+    def test_load_default_missing_file(self, tmp_path):
+        """Test a missing weights file leaves the keyword rule in charge"""
+        with patch("src.spam_model.Config.SPAM_MODEL_PATH", str(tmp_path / "none")):
+            assert SpamModel.load_default() is None
+            assert SpamDetector(threshold=1).is_spam("scam")
+
+
+def test_detector_prefers_model():
+    """Test the detector uses the model's verdict when one is loaded"""
+    detector = SpamDetector(threshold=1, model=keyword_model("w:airdrop"))
+
+    assert detector.is_spam_batch(["free airdrop", "scam scam"]) == [True, False]
@@ -0,0 +1,122 @@
+import asyncio
+import pytest
+from src.instrumentation import timed_action, track_action
+from src.telemetry import (
+    JobHistory,
+    JobRun,
+    JobTelemetry,
+    count_action,
+    fail_action,
+    percentile,
+)
+
+
+def make_run(started, duration=1.0, error=None):
+    return JobRun(
+        started=started,
+        ended=started + duration,
+        duration=duration,
+        outcome="error" if error else "ok",
+        actions={"likes": 1},
+        error=error,
+    )
+
+
+class TestJobHistory:
+    def test_ring_buffer_keeps_last_runs(self):
+        """Test only the newest `size` runs are kept, oldest first"""
+        history = JobHistory(size=3)
+
+        for started in range(5):
+            history.add(make_run(float(started)))
+
+        assert [run.started for run in history.runs()] == [2.0, 3.0, 4.0]
+
+    def test_last_error_outlives_the_buffer(self):
+        """Test the last error is reported after its run was overwritten"""
+        history = JobHistory(size=2)
+        history.add(make_run(0.0, error="ValueError: boom"))
+        history.add(make_run(1.0))
+        history.add(make_run(2.0))
+
+        summary = history.summary()
+
+        assert summary["errors"] == 0
+        assert summary["last_error"]["message"] == "ValueError: boom"
+
+    def test_summary_percentiles_and_actions(self):
+        """Test the summary reports duration percentiles and action totals"""
+        history = JobHistory(size=100)
+        for i in range(1, 101):
+            history.add(make_run(float(i), duration=float(i)))
+
+        summary = history.summary()
+
+        assert summary["runs"] == 100
+        assert summary["duration_p50"] == 50.0
+        assert summary["duration_p95"] == 95.0
+        assert summary["duration_p99"] == 99.0
+        assert summary["actions"] == {"likes": 100}
+        assert summary["last_outcome"] == "ok"
+
+
+def test_percentile_of_empty_window():
+    assert percentile([], 50) is None
+    assert percentile([3.0], 99) == 3.0
+
+
+class TestTrackedRuns:
+    def test_run_records_outcome_and_actions(self, monkeypatch):
+        """Test a tracked action lands in telemetry with its action counts"""
+        registry = JobTelemetry(size=10)
+        monkeypatch.setattr("src.instrumentation.telemetry", registry)
+
+        with track_action("job"):
+            count_action("likes")
+            count_action("likes")
+        with pytest.raises(ValueError):
+            with track_action("job"):
+                raise ValueError("boom")
+
+        first, second = registry.history("job").runs()
+        assert first.actions == {"likes": 2} and first.outcome == "ok"
+        assert second.outcome == "error"
+        assert registry.summary()["job"]["last_error"]["message"] == (
+            "ValueError: boom"
+        )
+
+    def test_reported_failures_set_outcome(self, monkeypatch):
+        """Test handled failures reach the run; an error outranks a rate limit"""
+        registry = JobTelemetry(size=10)
+        monkeypatch.setattr("src.instrumentation.telemetry", registry)
+
+        with track_action("job"):
+            fail_action("budget exhausted", "rate_limited")
+        with track_action("job"):
+            fail_action("budget exhausted", "rate_limited")
+            fail_action("post failed")
+            fail_action("later failure")
+        fail_action("outside a run")  # ignored
+
+        first, second = registry.history("job").runs()
+        assert (first.outcome, first.error) == ("rate_limited", "budget exhausted")
+        assert (second.outcome, second.error) == ("error", "post failed")
+        assert registry.summary()["job"]["errors"] == 2
+
+    @pytest.mark.asyncio
+    async def test_actions_counted_from_spawned_tasks(self, monkeypatch):
+        """Test tasks started during an async run count towards that run"""
+        registry = JobTelemetry(size=10)
+        monkeypatch.setattr("src.instrumentation.telemetry", registry)
+
+        async def like():
+            count_action("likes")
+
+        @timed_action("engagement")
+        async def engage():
+            await asyncio.gather(*(asyncio.ensure_future(like()) for _ in range(3)))
+
+        await engage()
+        count_action("likes")  # outside a run: ignored
+
+        assert registry.history("engagement").runs()[0].actions == {"likes": 3}
@@ -1,7 +1,14 @@
 import os
+import threading
+import time
 import pytest
-from unittest.mock import Mock, patch
-from src.twitter_client import TwitterClient
+import tweepy
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, Mock, patch
+from src.instrumentation import track_action
+from src.rate_limiter import RateLimiterRegistry
+from src.telemetry import JobTelemetry
+from src.twitter_client import AsyncTwitterClient, TwitterClient, endpoint_for
 
 
 class TestTwitterClient:
@@ -60,6 +67,21 @@ class TestTwitterClient:
 
         assert result is None
 
+    def test_post_tweet_failure_reported_to_run(
+        self, twitter_client, mock_tweepy_api, monkeypatch
+    ):
+        """Test a handled posting error still marks the tracked run as failed"""
+        registry = JobTelemetry(size=10)
+        monkeypatch.setattr("src.instrumentation.telemetry", registry)
+        mock_tweepy_api.create_tweet.side_effect = Exception("API Error")
+
+        with track_action("market_update"):
+            assert twitter_client.post_tweet("Test tweet") is None
+
+        summary = registry.summary()["market_update"]
+        assert summary["last_outcome"] == "error"
+        assert summary["last_error"]["message"] == "Error posting tweet: API Error"
+
     def test_like_tweet_success(self, twitter_client, mock_tweepy_api):
         """Test successful tweet liking"""
         mock_tweepy_api.like.return_value = True
@@ -90,3 +112,185 @@ class TestTwitterClient:
 
         assert len(result) == 2
         mock_tweepy_api.search_recent_tweets.assert_called_once()
+
+    def test_iter_search_tweets_follows_next_token(
+        self, twitter_client, mock_tweepy_api
+    ):
+        """Test pages are chained with next_token until the stream runs out"""
+        mock_tweepy_api.search_recent_tweets.side_effect = [
+            Mock(data=[Mock(), Mock()], meta={"next_token": "page2"}),
+            Mock(data=[Mock()], meta={}),
+        ]
+
+        result = list(twitter_client.iter_search_tweets("crypto", since_id="42"))
+
+        assert len(result) == 3
+        calls = mock_tweepy_api.search_recent_tweets.call_args_list
+        assert "next_token" not in calls[0][1]
+        assert "author_id" in calls[0][1]["tweet_fields"]
+        assert calls[1][1]["next_token"] == "page2"
+        assert calls[1][1]["since_id"] == "42"
+
+    def test_iter_search_tweets_caps_total_and_pages(
+        self, twitter_client, mock_tweepy_api
+    ):
+        """Test max_total trims the last page and max_pages stops paging"""
+        mock_tweepy_api.search_recent_tweets.return_value = Mock(
+            data=[Mock() for _ in range(10)], meta={"next_token": "more"}
+        )
+
+        assert (
+            len(list(twitter_client.iter_search_tweets("crypto", max_total=15))) == 15
+        )
+        assert len(list(twitter_client.iter_search_tweets("crypto", max_pages=3))) == 30
+        assert mock_tweepy_api.search_recent_tweets.call_count == 5
+
+    def test_iter_search_tweets_is_lazy(self, twitter_client, mock_tweepy_api):
+        """Test no further page is requested once the consumer stops"""
+        mock_tweepy_api.search_recent_tweets.return_value = Mock(
+            data=[Mock() for _ in range(10)], meta={"next_token": "more"}
+        )
+
+        for _ in twitter_client.iter_search_tweets("crypto"):
+            break
+
+        mock_tweepy_api.search_recent_tweets.assert_called_once()
+
+    def test_concurrent_identical_searches_share_one_call(
+        self, twitter_client, mock_tweepy_api
+    ):
+        """Test overlapping jobs running the same search send one request"""
+        release = threading.Event()
+
+        def search(**params):
+            release.wait(5)
+            return Mock(data=[Mock(), Mock()], meta={})
+
+        mock_tweepy_api.search_recent_tweets.side_effect = search
+        threading.Timer(0.2, release.set).start()
+        with ThreadPoolExecutor(3) as pool:
+            results = list(
+                pool.map(lambda _: twitter_client.search_tweets("crypto"), range(3))
+            )
+
+        assert [len(r) for r in results] == [2, 2, 2]
+        mock_tweepy_api.search_recent_tweets.assert_called_once()
+
+
+class TestRateLimitHeaders:
+    @pytest.fixture
+    def client_and_limits(self):
+        """TwitterClient on a real tweepy session with a private limiter registry"""
+        limits = RateLimiterRegistry()
+        yield TwitterClient(limits=limits), limits
+
+    def test_response_hook_registered(self, client_and_limits):
+        """Test the tweepy session reports every response to the client"""
+        client, _ = client_and_limits
+
+        assert client._on_response in client.client.session.hooks["response"]
+
+    def test_exhausted_budget_pauses_endpoint(self, client_and_limits):
+        """Test remaining=0 blocks the endpoint until reset instead of calling"""
+        client, limits = client_and_limits
+        response = Mock()
+        response.request.method = "POST"
+        response.url = "https://api.twitter.com/2/tweets"
+        response.headers = {
+            "x-rate-limit-remaining": "0",
+            "x-rate-limit-reset": str(int(time.time()) + 600),
+        }
+        client.client = Mock()
+
+        client._on_response(response)
+
+        assert client.post_tweet("hello") is None
+        client.client.create_tweet.assert_not_called()
+        # Other endpoints keep their own budget
+        assert limits.try_acquire("like")
+
+    def test_remaining_corrects_local_budget(self, client_and_limits):
+        """Test the server-reported remaining count replaces the local estimate"""
+        client, limits = client_and_limits
+
+        client.update_rate_limit(
+            "search",
+            {"x-rate-limit-remaining": "1", "x-rate-limit-reset": str(time.time())},
+        )
+
+        assert limits.try_acquire("search")
+        assert not limits.try_acquire("search")
+
+
+def test_endpoint_for_routes():
+    """Test request URLs map onto limiter endpoint names"""
+    assert endpoint_for("POST", "https://api.twitter.com/2/tweets") == "create_tweet"
+    assert endpoint_for("POST", "https://api.twitter.com/2/users/1/likes") == "like"
+    assert (
+        endpoint_for("GET", "https://api.twitter.com/2/tweets/search/recent?q=x")
+        == "search"
+    )
+    assert endpoint_for("GET", "https://api.twitter.com/2/users/me") is None
+
+
+class TestAsyncTwitterClient:
+    @pytest.fixture
+    def client_and_limits(self):
+        limits = RateLimiterRegistry()
+        return AsyncTwitterClient(limits=limits), limits
+
+    @pytest.mark.asyncio
+    async def test_post_tweet_uses_shared_session(self, client_and_limits):
+        """Test async posting returns the id and reuses the pooled session"""
+        client, _ = client_and_limits
+        session = Mock()
+        client.client.create_tweet = AsyncMock(
+            return_value=Mock(data={"id": "1234567890"})
+        )
+
+        with patch("src.twitter_client.get_session", AsyncMock(return_value=session)):
+            result = await client.post_tweet("Test tweet")
+
+        assert result == "1234567890"
+        assert client.client.session is session
+
+    @pytest.mark.asyncio
+    async def test_iter_search_tweets_pages(self, client_and_limits):
+        """Test the async stream follows next_token and honours start_time"""
+        client, _ = client_and_limits
+        client.client.search_recent_tweets = AsyncMock(
+            side_effect=[
+                Mock(data=[Mock(), Mock()], meta={"next_token": "page2"}),
+                Mock(data=[Mock()], meta={}),
+            ]
+        )
+
+        with patch("src.twitter_client.get_session", AsyncMock()):
+            result = [
+                tweet
+                async for tweet in client.iter_search_tweets(
+                    "crypto", start_time="2024-01-01T00:00:00Z"
+                )
+            ]
+
+        assert len(result) == 3
+        calls = client.client.search_recent_tweets.await_args_list
+        assert calls[1][1]["next_token"] == "page2"
+        assert calls[1][1]["start_time"] == "2024-01-01T00:00:00Z"
+
+    @pytest.mark.asyncio
+    async def test_429_headers_feed_limiter(self, client_and_limits):
+        """Test rate limit headers on a 429 still pause the endpoint"""
+        client, limits = client_and_limits
+        response = Mock(status=429, reason="Too Many Requests")
+        response.headers = {
+            "x-rate-limit-remaining": "0",
+            "x-rate-limit-reset": str(int(time.time()) + 600),
+        }
+        error = tweepy.TooManyRequests(response, response_json={})
+
+        with patch("tweepy.asynchronous.AsyncClient.request", side_effect=error):
+            with pytest.raises(tweepy.TooManyRequests):
+                await client.client.request("GET", "/2/tweets/search/recent")
+
+        assert not limits.try_acquire("search")
@@ -0,0 +1,88 @@
+import time
+import pytest
+from unittest.mock import patch
+from src.cache import HIT, MISS, TTLCache
+from src.market_data import MarketData
+from src.rate_limiter import RateLimiterRegistry
+from src.warm_state import WarmStateStore
+from tests.test_market_data import fake_session
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "warm_state.db")
+
+
+def test_cache_entries_survive_restart(db_path):
+    """Test a new process serves entries written back by the previous one"""
+    store = WarmStateStore(db_path, flush_interval=60)
+    cache = TTLCache("market_data", store=store)
+    cache.set(("price", "bitcoin", "usd"), 42.0, ttl=60, stale_ttl=60)
+    cache.set("trending", ["bitcoin"], ttl=60)
+    store.close()
+
+    restored = TTLCache("market_data", store=WarmStateStore(db_path))
+
+    assert restored.lookup(("price", "bitcoin", "usd")) == (HIT, 42.0)
+    assert restored.lookup("trending") == (HIT, ["bitcoin"])
+
+
+def test_writes_are_queued_until_flush(db_path):
+    """Test set() never touches disk; the writer flushes in the background"""
+    store = WarmStateStore(db_path, flush_interval=60)
+    reader = WarmStateStore(db_path)
+    TTLCache("market_data", store=store).set("trending", ["bitcoin"], ttl=60)
+
+    assert reader.load("market_data") == []
+    store.flush()
+    assert [row[:2] for row in reader.load("market_data")] == [
+        ("trending", ["bitcoin"])
+    ]
+    store.close()
+    reader.close()
+
+
+def test_expired_entries_are_not_restored(db_path):
+    """Test entries past their stale window are dropped on load"""
+    store = WarmStateStore(db_path)
+    now = time.time()
+    store.put("market_data", "old", 1, now - 20, now - 10)
+    store.put("market_data", "stale", 2, now - 10, now + 60)
+    store.close()
+
+    cache = TTLCache("market_data", store=WarmStateStore(db_path))
+
+    assert cache.lookup("old") == (MISS, None)
+    assert cache.lookup("stale")[1] == 2
+
+
+def test_rate_limit_budgets_survive_restart(db_path):
+    """Test a restarted instance resumes spent and paused budgets"""
+    limits = RateLimiterRegistry({"search": (10, 900), "like": (5, 900)})
+    store = WarmStateStore(db_path)
+    store.track_limits(limits)
+    for _ in range(8):
+        limits.try_acquire("search")
+    limits.get("like").update_from_server(0, time.time() + 300)
+    store.close()
+
+    restarted = RateLimiterRegistry({"search": (10, 900), "like": (5, 900)})
+    assert WarmStateStore(db_path).track_limits(restarted) == 2
+
+    assert restarted.get("search").available == pytest.approx(2, abs=0.1)
+    assert not restarted.try_acquire("like")
+
+
+def test_market_data_restarts_warm(db_path):
+    """Test trending coins fetched before a restart are served without a call"""
+    session, get_session = fake_session({"coins": [{"item": {"id": "bitcoin"}}]})
+    store = WarmStateStore(db_path)
+    with patch("src.market_data.get_session", get_session):
+        MarketData(cache=TTLCache("market_data", store=store)).get_trending_coins()
+    store.close()
+
+    restarted = MarketData(cache=TTLCache("market_data", store=WarmStateStore(db_path)))
+    with patch("src.market_data.get_session", get_session):
+        assert restarted.get_trending_coins() == ["bitcoin"]
+
+    session.get.assert_called_once()